@@ -1,10 +1,23 @@
 import { NextRequest, NextResponse } from "next/server";
 import { spawn } from "child_process";
 import path from "path";
+import {
+  AnalyticsDaemonError,
+  callAnalyticsDaemon,
+} from "@/lib/services/analyticsDaemon";
 
 export async function POST(request: NextRequest) {
   try {
-    const { time_range, department } = await request.json();
+    const { time_range, department, sections } = await request.json();
+
+    // Served by the warm analytics daemon when it is running
+    const daemonResult = await callAnalyticsDaemon("/commands/run-pipeline", {
+      department: department && department !== "all" ? department : null,
+      sections: Array.isArray(sections) && sections.length > 0 ? sections : null,
+    });
+    if (daemonResult) {
+      return NextResponse.json(daemonResult);
+    }
 
     // Path to the Python analytics orchestrator
     const pythonScript = path.join(
@@ -18,6 +31,10 @@ export async function POST(request: NextRequest) {
     if (department && department !== "all") {
       args.push("--department", department);
     }
+    // Only compute the report panels the dashboard asked for
+    if (Array.isArray(sections) && sections.length > 0) {
+      args.push("--sections", sections.join(","));
+    }
 
     // Execute Python script
     const result = await executeAnalytics(pythonScript, args);
@@ -25,6 +42,12 @@ export async function POST(request: NextRequest) {
     return NextResponse.json(result);
   } catch (error) {
     console.error("Analytics API error:", error);
+    if (error instanceof AnalyticsDaemonError) {
+      return NextResponse.json(
+        { error: error.message },
+        { status: error.status }
+      );
+    }
     return NextResponse.json(
       { error: "Failed to generate analytics insights" },
       { status: 500 }
@@ -35,6 +58,11 @@ export async function POST(request: NextRequest) {
 export async function GET(request: NextRequest) {
   try {
     // Get status of analytics system
+    const daemonResult = await callAnalyticsDaemon("/status");
+    if (daemonResult) {
+      return NextResponse.json(daemonResult);
+    }
+
     const pythonScript = path.join(
       process.cwd(),
       "functions",
@@ -45,6 +73,12 @@ export async function GET(request: NextRequest) {
     return NextResponse.json(result);
   } catch (error) {
     console.error("Analytics status API error:", error);
+    if (error instanceof AnalyticsDaemonError) {
+      return NextResponse.json(
+        { error: error.message },
+        { status: error.status }
+      );
+    }
     return NextResponse.json(
       { error: "Failed to get analytics status" },
       { status: 500 }
@@ -54,48 +88,85 @@ export async function GET(request: NextRequest) {
 
 function executeAnalytics(scriptPath: string, args: string[]): Promise<any> {
   return new Promise((resolve, reject) => {
+    // The result is also written to fd 3, so the response does not wait for
+    // the process to finish draining its write-behind queue before exiting
     const pythonProcess = spawn("python3", [scriptPath, ...args], {
       cwd: path.join(process.cwd(), "functions"),
       env: {
         ...process.env,
         PYTHONPATH: path.join(process.cwd(), "functions"),
+        // Shared across the per-request processes: metric history, spool, fingerprints
+        ANALYTICS_CACHE_DIR:
+          process.env.ANALYTICS_CACHE_DIR ||
+          path.join(process.cwd(), "functions", ".analytics_cache"),
+        ANALYTICS_RESULT_FD: "3",
       },
+      stdio: ["ignore", "pipe", "pipe", "pipe"],
     });
 
     let stdout = "";
     let stderr = "";
+    let result = "";
+    let settled = false;
 
-    pythonProcess.stdout.on("data", (data) => {
+    const finish = (value: any) => {
+      if (!settled) {
+        settled = true;
+        resolve(value);
+      }
+    };
+
+    pythonProcess.stdout?.on("data", (data) => {
       stdout += data.toString();
     });
 
-    pythonProcess.stderr.on("data", (data) => {
+    pythonProcess.stderr?.on("data", (data) => {
       stderr += data.toString();
     });
 
+    const resultStream = pythonProcess.stdio[3] as NodeJS.ReadableStream | null;
+    resultStream?.on("data", (data) => {
+      result += data.toString();
+    });
+    resultStream?.on("end", () => {
+      if (!result) return;
+      try {
+        finish(JSON.parse(result));
+      } catch (parseError) {
+        // Fall back to the exit handler below
+      }
+    });
+
     pythonProcess.on("close", (code) => {
+      if (settled) return;
       if (code === 0) {
         try {
           // Try to parse JSON output
-          const result = JSON.parse(stdout);
-          resolve(result);
+          finish(JSON.parse(result || stdout));
         } catch (parseError) {
           // If JSON parsing fails, return raw output
-          resolve({ raw_output: stdout, success: true });
+          finish({ raw_output: stdout, success: true });
         }
       } else {
+        settled = true;
         reject(new Error(`Python process exited with code ${code}: ${stderr}`));
       }
     });
 
     pythonProcess.on("error", (error) => {
-      reject(error);
+      if (!settled) {
+        settled = true;
+        reject(error);
+      }
     });
 
     // Set timeout for long-running analytics
     setTimeout(() => {
-      pythonProcess.kill();
-      reject(new Error("Analytics process timed out"));
+      if (!settled) {
+        settled = true;
+        pythonProcess.kill();
+        reject(new Error("Analytics process timed out"));
+      }
     }, 300000); // 5 minute timeout
   });
 }
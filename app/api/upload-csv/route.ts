@@ -2,6 +2,10 @@ import { NextRequest, NextResponse } from "next/server";
 import { createClient } from "@supabase/supabase-js";
 import { spawn } from "child_process";
 import path from "path";
+import {
+  AnalyticsDaemonError,
+  callAnalyticsDaemon,
+} from "@/lib/services/analyticsDaemon";
 
 // Initialize Supabase client
 const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL || "your-supabase-url";
@@ -78,6 +82,12 @@ export async function POST(request: NextRequest) {
     });
   } catch (error) {
     console.error("Upload error:", error);
+    if (error instanceof AnalyticsDaemonError) {
+      return NextResponse.json(
+        { error: "Analysis failed", details: error.message },
+        { status: error.status }
+      );
+    }
     return NextResponse.json(
       {
         error: "Internal server error",
@@ -88,7 +98,30 @@ export async function POST(request: NextRequest) {
   }
 }
 
+function parseHandlerResult(result: any): any {
+  if (result.statusCode === 200) {
+    return JSON.parse(result.body);
+  }
+  throw new Error(`Python handler error: ${result.body}`);
+}
+
 async function processWithPythonAnalyzer(csvText: string): Promise<any> {
+  // Create event object for the Python handler
+  const event = {
+    body: csvText,
+    queryStringParameters: {
+      analysis_type: "arrivals_analysis",
+      format: "csv",
+      insights: "true",
+    },
+  };
+
+  // Served by the warm analytics daemon when it is running
+  const daemonResult = await callAnalyticsDaemon("/analyze", event);
+  if (daemonResult) {
+    return parseHandlerResult(daemonResult);
+  }
+
   return new Promise((resolve, reject) => {
     const pythonScript = path.join(
       process.cwd(),
@@ -100,16 +133,6 @@ async function processWithPythonAnalyzer(csvText: string): Promise<any> {
     let outputData = "";
     let errorData = "";
 
-    // Create event object for the Python handler
-    const event = {
-      body: csvText,
-      queryStringParameters: {
-        analysis_type: "arrivals_analysis",
-        format: "csv",
-        insights: "true",
-      },
-    };
-
     // Send event data to Python script
     python.stdin.write(JSON.stringify(event));
     python.stdin.end();
@@ -0,0 +1,20 @@
+"""
+Analytics Cache
+===============
+Local directory for the state analytics processes keep between runs.
+
+Fingerprint memos, the metric history, the write-behind spool, record
+hashes and circuit breaker state live under ``ANALYTICS_CACHE_DIR``, by
+default ``functions/.analytics_cache``. The API route spawns one process
+per request, so without a shared directory each run would start cold.
+"""
+
+import os
+from typing import Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.analytics_cache')
+
+
+def get_cache_dir(cache_dir: Optional[str] = None) -> str:
+    """``cache_dir`` if given, else ANALYTICS_CACHE_DIR, else the default directory"""
+    return cache_dir or os.getenv('ANALYTICS_CACHE_DIR') or DEFAULT_CACHE_DIR
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Analytics Daemon
+================
+Long-running local HTTP server for the orchestrator commands and the CSV
+analyzer, so API routes no longer spawn a Python process per request.
+
+A single warm ``TourismAnalyticsOrchestrator`` serves every request: the
+heavy imports happen once at start-up, and the insights engine keeps its
+data snapshots (``ANALYTICS_SNAPSHOT_TTL``), fingerprinted results and
+models between requests. Requests run on a fixed pool of worker threads
+behind a bounded queue; when the queue is full the daemon answers 503 and
+the caller falls back to spawning the script. Commands that read or write
+orchestrator state run one at a time; ``status`` and ``/analyze`` do not
+wait for them.
+
+Endpoints:
+    GET  /health                   liveness, queue depth
+    GET  /status                   same as the ``status`` command
+    POST /commands/<command>       a RESULT_COMMANDS command; JSON body
+                                   {"department": ..., "sections": [...]}
+    POST /analyze                  data_analyzer.handler; the body is the
+                                   handler event, the response its result
+
+Usage:
+    python analytics_daemon.py --port 8765 --workers 4 --queue-size 32
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+from tourism_analytics_orchestrator import RESULT_COMMANDS, TourismAnalyticsOrchestrator, run_command
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = os.getenv('ANALYTICS_DAEMON_HOST', '127.0.0.1')
+DEFAULT_PORT = int(os.getenv('ANALYTICS_DAEMON_PORT', 8765))
+DEFAULT_WORKERS = int(os.getenv('ANALYTICS_DAEMON_WORKERS', 4))
+# Requests waiting for a worker beyond which new ones are refused with 503
+DEFAULT_QUEUE_SIZE = int(os.getenv('ANALYTICS_DAEMON_QUEUE_SIZE', 32))
+DEFAULT_REQUEST_TIMEOUT = float(os.getenv('ANALYTICS_DAEMON_TIMEOUT', 300))
+# Loaded data is reused this long unless ANALYTICS_SNAPSHOT_TTL says otherwise
+DEFAULT_SNAPSHOT_TTL = 300
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+# Commands that only read in-memory state and need not wait for a running pipeline
+CONCURRENT_COMMANDS = {'status'}
+
+
+class QueueFull(Exception):
+    pass
+
+
+class AnalyticsDaemon:
+    """Warm orchestrator plus the worker pool and queue the HTTP handler submits to"""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+                 orchestrator: Optional[TourismAnalyticsOrchestrator] = None):
+        os.environ.setdefault('ANALYTICS_SNAPSHOT_TTL', str(DEFAULT_SNAPSHOT_TTL))
+        self.orchestrator = orchestrator or TourismAnalyticsOrchestrator()
+        self.workers = max(1, workers)
+        self.request_timeout = request_timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='analytics-worker')
+        # Running plus queued requests
+        self._slots = threading.BoundedSemaphore(self.workers + max(0, queue_size))
+        self._command_lock = threading.Lock()
+        self._in_flight = 0
+        self._counter_lock = threading.Lock()
+        self.started_at = time.time()
+        self.requests_served = 0
+
+    def warm(self):
+        """Import the analytics stack and build the engine before the first request"""
+        started = time.time()
+        self.orchestrator.insights_engine
+        self.orchestrator.sync_manager
+        import data_analyzer  # noqa: F401
+        logger.info(f"Analytics daemon warmed up in {time.time() - started:.2f}s")
+
+    def submit(self, job: Callable[[], Any]) -> Any:
+        """Run ``job`` on the worker pool and wait for it; QueueFull when no slot is free"""
+        if not self._slots.acquire(blocking=False):
+            raise QueueFull()
+        with self._counter_lock:
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(job)
+        except Exception:
+            self._finished()
+            raise
+        # The slot is held until the job ends, even if the caller stops waiting for it
+        future.add_done_callback(lambda _: self._finished())
+        return future.result(timeout=self.request_timeout)
+
+    def _finished(self):
+        with self._counter_lock:
+            self._in_flight -= 1
+            self.requests_served += 1
+        self._slots.release()
+
+    def run_command(self, command: str, department: Optional[str] = None,
+                    sections: Optional[list] = None) -> Dict[str, Any]:
+        if command in CONCURRENT_COMMANDS:
+            return run_command(self.orchestrator, command, department, sections)
+        with self._command_lock:
+            return run_command(self.orchestrator, command, department, sections)
+
+    def analyze(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        from data_analyzer import handler
+        return handler(event, None)
+
+    def health(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            in_flight = self._in_flight
+        return {
+            'status': 'ok',
+            'pid': os.getpid(),
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'workers': self.workers,
+            'in_flight': in_flight,
+            'requests_served': self.requests_served,
+            'snapshot_ttl': self.orchestrator.insights_engine.snapshot_ttl
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+class AnalyticsRequestHandler(BaseHTTPRequestHandler):
+    daemon: AnalyticsDaemon = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._respond(200, self.daemon.health())
+        elif self.path == '/status':
+            self._dispatch(lambda: self.daemon.run_command('status'))
+        else:
+            self._respond(404, {'error': f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        try:
+            body = self._read_json()
+        except ValueError as e:
+            # The body may be partly unread, so the connection cannot be reused
+            self.close_connection = True
+            self._respond(400, {'error': str(e)})
+            return
+
+        if self.path.startswith('/commands/'):
+            command = self.path[len('/commands/'):]
+            if command not in RESULT_COMMANDS:
+                self._respond(404, {'error': f"Unknown command: {command}", 'commands': RESULT_COMMANDS})
+                return
+            sections = body.get('sections')
+            if isinstance(sections, str):
+                sections = [name for name in sections.split(',') if name.strip()]
+            department = body.get('department')
+            self._dispatch(lambda: self.daemon.run_command(command, department, sections or None))
+        elif self.path == '/analyze':
+            self._dispatch(lambda: self.daemon.analyze(body))
+        else:
+            self._respond(404, {'error': f"Unknown path: {self.path}"})
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError(f"Request body over {MAX_BODY_BYTES} bytes")
+        raw = self.rfile.read(length) if length else b''
+        if not raw:
+            return {}
+        try:
+            body = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON body: {str(e)}")
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object")
+        return body
+
+    def _dispatch(self, job: Callable[[], Dict[str, Any]]):
+        try:
+            self._respond(200, self.daemon.submit(job))
+        except QueueFull:
+            self._respond(503, {'error': 'Analytics daemon queue is full'})
+        except FutureTimeout:
+            self._respond(504, {'error': f"Request did not finish within {self.daemon.request_timeout:.0f}s"})
+        except Exception as e:
+            logger.error(f"Analytics daemon request failed: {str(e)}")
+            self._respond(500, {'success': False, 'error': str(e)})
+
+    def _respond(self, status: int, payload: Dict[str, Any]):
+        data = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if status == 503:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = DEFAULT_WORKERS,
+          queue_size: int = DEFAULT_QUEUE_SIZE, request_timeout: float = DEFAULT_REQUEST_TIMEOUT):
+    """Start the daemon and serve until interrupted"""
+    daemon = AnalyticsDaemon(workers, queue_size, request_timeout)
+    daemon.warm()
+
+    handler = type('BoundAnalyticsRequestHandler', (AnalyticsRequestHandler,), {'daemon': daemon})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    logger.info(f"Analytics daemon listening on http://{host}:{server.server_port} "
+                f"({daemon.workers} workers, queue {queue_size})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Analytics daemon stopped by user")
+    finally:
+        server.server_close()
+        daemon.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the analytics commands from a long-running process')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Worker threads')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help='Requests allowed to wait for a worker before new ones get 503')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_REQUEST_TIMEOUT, help='Seconds per request')
+    parser.add_argument('--config', type=str, help='Config file path')
+    args = parser.parse_args()
+
+    if args.config:
+        os.environ['CONFIG_FILE'] = args.config
+    serve(args.host, args.port, args.workers, args.queue_size, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
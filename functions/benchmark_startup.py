@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+=================
+Import-time and start-up benchmark for the analytics CLI commands.
+
+Each command is measured in fresh interpreters:
+
+- ``import``: ``python -X importtime`` over the modules the command's code
+  path loads, summed over the top-level imports;
+- ``wall``: median wall time of running the command itself, for commands
+  that need neither the network nor a database (``--help``, ``status``,
+  the analyzer on its built-in sample).
+
+Heavy libraries that must stay lazy (see lazy_imports.py) are reported
+when a command imports them at start-up. With ``--baseline`` the run is
+compared with saved results and exits non-zero on a regression, so it can
+guard CI.
+
+Usage:
+    python benchmark_startup.py
+    python benchmark_startup.py --repeat 5 --save startup_baseline.json
+    python benchmark_startup.py --baseline startup_baseline.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+FUNCTIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules each command's code path imports
+COMMAND_IMPORTS = {
+    'status': ['tourism_analytics_orchestrator'],
+    'run-pipeline': ['tourism_analytics_orchestrator', 'tourism_insights_engine'],
+    'run-insights': ['tourism_analytics_orchestrator', 'tourism_insights_engine'],
+    'run-forecasts': ['tourism_analytics_orchestrator', 'tourism_insights_engine', 'daily_series'],
+    'run-quality-check': ['tourism_analytics_orchestrator', 'tourism_insights_engine'],
+    'cleanup': ['tourism_analytics_orchestrator', 'supabase_sync_simple'],
+    'analyze': ['data_analyzer'],
+    'daemon': ['analytics_daemon'],
+}
+
+# Commands that run offline end to end, timed as a whole
+COMMAND_RUNS = {
+    'status': ['tourism_analytics_orchestrator.py', 'status'],
+    'orchestrator --help': ['tourism_analytics_orchestrator.py', '--help'],
+    'daemon --help': ['analytics_daemon.py', '--help'],
+    'analyze': ['data_analyzer.py', 'sample'],
+}
+
+# Libraries that cost seconds to import and must only load on the code paths that use them
+HEAVY_MODULES = ['prophet', 'xgboost', 'sklearn', 'supabase', 'postgrest', 'schedule']
+
+# Differences below this many seconds are treated as noise
+NOISE_FLOOR_SECONDS = 0.05
+
+
+def _environment() -> Dict[str, str]:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [FUNCTIONS_DIR, env.get('PYTHONPATH')]))
+    # Offline: no command may reach Supabase while being timed
+    for name in ('SUPABASE_URL', 'SUPABASE_KEY', 'SUPABASE_ANON_KEY', 'SUPABASE_SERVICE_KEY', 'SUPABASE_DB_URL'):
+        env.pop(name, None)
+    return env
+
+
+def measure_imports(modules: List[str]) -> Dict[str, Any]:
+    """Import time of ``modules`` in a fresh interpreter, and the heavy libraries they pulled in"""
+    code = '; '.join(f'import {name}' for name in modules)
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=FUNCTIONS_DIR,
+                               env=_environment(), capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {', '.join(modules)} failed: {completed.stderr.strip().splitlines()[-1:]}")
+
+    total_us = 0
+    top_level: Dict[str, int] = {}
+    imported = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue  # Header line
+        imported.add(name.strip())
+        if name[1:] == name.lstrip():
+            total_us += int(cumulative)
+            top_level[name.strip()] = int(cumulative)
+
+    # Interpreter start-up modules (site, encodings) take a few milliseconds and are left out
+    slowest = sorted(((name, us) for name, us in top_level.items() if us >= 10_000),
+                     key=lambda item: item[1], reverse=True)[:5]
+    return {
+        'import_seconds': round(total_us / 1e6, 4),
+        'slowest_imports': [{'module': name, 'seconds': round(us / 1e6, 4)} for name, us in slowest],
+        'heavy_imports': sorted(name for name in HEAVY_MODULES
+                                if name in imported or any(m.startswith(f'{name}.') for m in imported))
+    }
+
+
+def measure_run(args: List[str], repeat: int) -> float:
+    """Median wall time of running ``args`` in a fresh interpreter"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        completed = subprocess.run([sys.executable] + args, cwd=FUNCTIONS_DIR, env=_environment(),
+                                   stdin=subprocess.DEVNULL, capture_output=True, text=True)
+        timings.append(time.perf_counter() - started)
+        if completed.returncode != 0:
+            raise RuntimeError(f"{' '.join(args)} exited with {completed.returncode}: "
+                               f"{completed.stderr.strip().splitlines()[-1:]}")
+    return round(statistics.median(timings), 4)
+
+
+def run_benchmark(repeat: int = 3) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for command, modules in COMMAND_IMPORTS.items():
+        # The first import of a run also pays for .pyc compilation and a cold disk cache
+        runs = [measure_imports(modules) for _ in range(repeat)]
+        result = min(runs, key=lambda run: run['import_seconds'])
+        results[command] = result
+    for command, args in COMMAND_RUNS.items():
+        results.setdefault(command, {})['wall_seconds'] = measure_run(args, repeat)
+    return results
+
+
+def find_regressions(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+                     tolerance: float) -> List[str]:
+    """Commands slower than the baseline by more than ``tolerance``, or importing new heavy libraries"""
+    regressions = []
+    for command, result in results.items():
+        previous = baseline.get(command)
+        if not previous:
+            continue
+        for key in ('import_seconds', 'wall_seconds'):
+            if key in result and key in previous:
+                limit = previous[key] * (1 + tolerance) + NOISE_FLOOR_SECONDS
+                if result[key] > limit:
+                    regressions.append(f"{command}: {key} {result[key]:.3f}s > {limit:.3f}s "
+                                       f"(baseline {previous[key]:.3f}s)")
+        added = set(result.get('heavy_imports', [])) - set(previous.get('heavy_imports', []))
+        if added:
+            regressions.append(f"{command}: now imports {', '.join(sorted(added))} at start-up")
+    return regressions
+
+
+def print_results(results: Dict[str, Dict[str, Any]]):
+    print(f"{'command':<22} {'import':>9} {'wall':>9}  heavy imports / slowest")
+    for command, result in results.items():
+        import_time = f"{result['import_seconds']:.3f}s" if 'import_seconds' in result else '-'
+        wall_time = f"{result['wall_seconds']:.3f}s" if 'wall_seconds' in result else '-'
+        if result.get('heavy_imports'):
+            detail = '⚠️  ' + ', '.join(result['heavy_imports'])
+        else:
+            detail = ', '.join(f"{entry['module']} {entry['seconds']:.2f}s"
+                               for entry in result.get('slowest_imports', [])[:3])
+        print(f"{command:<22} {import_time:>9} {wall_time:>9}  {detail}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark import and start-up time of the analytics CLI commands')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement')
+    parser.add_argument('--save', help='Write the results as JSON (e.g. a new baseline)')
+    parser.add_argument('--baseline', help='Compare with results saved by --save; exit 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown over the baseline as a fraction (default 0.25)')
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(max(1, args.repeat))
+    print_results(results)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results saved to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print("❌ Start-up regressions:")
+            for regression in regressions:
+                print(f"   {regression}")
+            return 1
+        print("✅ No start-up regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
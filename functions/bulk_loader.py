@@ -0,0 +1,190 @@
+"""
+Bulk Loader
+===========
+Resumable, parallel loading of a DataFrame into a Supabase table.
+
+The frame is sliced into ``batch_rows`` batches that are converted to JSON
+records only when they are about to be sent, so at most ``max_in_flight``
+batches exist as Python objects at any time. Batches are upserted by a pool
+of ``concurrency`` workers, each retried with exponential backoff. Finished
+batches are checkpointed (keyed by the frame's content fingerprint and the
+batch size), so re-running an interrupted load of the same frame only sends
+the batches that were not committed.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from bulk_writer import NON_RETRYABLE_CODE_PREFIXES
+from data_fingerprint import fingerprint_frame
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_ROWS = int(os.getenv('BULK_LOAD_BATCH_ROWS', 5000))
+DEFAULT_CONCURRENCY = int(os.getenv('BULK_LOAD_CONCURRENCY', 4))
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_SECONDS = 1.0
+
+
+def frame_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """JSON-ready records of a frame slice (NaN/inf as null, NumPy types as plain values)"""
+    frame = frame.replace([np.inf, -np.inf], np.nan)
+    return json.loads(frame.to_json(orient='records', date_format='iso'))
+
+
+class BulkLoader:
+    """Upserts a DataFrame into one table in concurrent, checkpointed batches"""
+
+    def __init__(self, client, table: str, batch_rows: int = DEFAULT_BATCH_ROWS,
+                 concurrency: int = DEFAULT_CONCURRENCY, max_in_flight: Optional[int] = None,
+                 checkpoint_path: Optional[str] = None, on_conflict: Optional[str] = None,
+                 max_retries: int = DEFAULT_MAX_RETRIES, backoff_seconds: float = DEFAULT_BACKOFF_SECONDS):
+        self.client = client
+        self.table = table
+        self.batch_rows = max(1, batch_rows)
+        self.concurrency = max(1, concurrency)
+        # Backpressure: batches converted but not yet committed
+        self.max_in_flight = max(self.concurrency, max_in_flight or 2 * self.concurrency)
+        self.checkpoint_path = checkpoint_path
+        self.on_conflict = on_conflict
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._lock = threading.Lock()
+        self._checkpoint: Dict[str, Any] = {}
+
+    def load(self, df: pd.DataFrame, progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """
+        Upsert every row of ``df``. ``progress(rows_done, total_rows)`` is
+        called after each committed batch.
+
+        Returns counts of loaded, resumed and failed batches; failed batches
+        stay uncommitted in the checkpoint so the next ``load`` retries them.
+        """
+        start_time = time.time()
+        total_batches = (len(df) + self.batch_rows - 1) // self.batch_rows
+        load_key = f"{fingerprint_frame(df).digest}|{self.batch_rows}"
+        self._checkpoint = self._load_checkpoint(load_key, total_batches)
+        committed: Set[int] = set(self._checkpoint['committed'])
+        if committed:
+            logger.info(f"Resuming load into {self.table}: {len(committed)}/{total_batches} batches already committed")
+
+        pending = [index for index in range(total_batches) if index not in committed]
+        failed: Dict[int, str] = {}
+        rows_done = sum(self._batch_size(index, len(df)) for index in committed)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f"load-{self.table}") as executor:
+            in_flight: Dict[Future, int] = {}
+            batches = iter(pending)
+            exhausted = False
+            while in_flight or not exhausted:
+                while not exhausted and len(in_flight) < self.max_in_flight:
+                    index = next(batches, None)
+                    if index is None:
+                        exhausted = True
+                        break
+                    batch = df.iloc[index * self.batch_rows:(index + 1) * self.batch_rows]
+                    in_flight[executor.submit(self._send, index, frame_records(batch))] = index
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = in_flight.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        failed[index] = str(e)
+                        logger.error(f"Batch {index} of {self.table} load failed: {str(e)}")
+                        continue
+                    self._commit(index)
+                    rows_done += self._batch_size(index, len(df))
+                    if progress:
+                        progress(rows_done, len(df))
+
+        if not failed:
+            self._clear_checkpoint()
+
+        elapsed = time.time() - start_time
+        loaded = len(pending) - len(failed)
+        logger.info(f"Loaded {loaded} batches ({rows_done}/{len(df)} rows) into {self.table} "
+                    f"in {elapsed:.1f}s, {len(failed)} failed")
+        return {
+            'success': not failed,
+            'table': self.table,
+            'total_rows': len(df),
+            'rows_committed': rows_done,
+            'batches': total_batches,
+            'batches_loaded': loaded,
+            'batches_resumed': total_batches - len(pending),
+            'failed_batches': failed,
+            'execution_time': elapsed
+        }
+
+    def _batch_size(self, index: int, total_rows: int) -> int:
+        return min(self.batch_rows, total_rows - index * self.batch_rows)
+
+    def _send(self, index: int, records: List[Dict[str, Any]]):
+        kwargs = {'on_conflict': self.on_conflict} if self.on_conflict else {}
+        attempt = 0
+        while True:
+            try:
+                self.client.table(self.table).upsert(records, returning='minimal', **kwargs).execute()
+                return
+            except Exception as e:
+                attempt += 1
+                code = str(getattr(e, 'code', '') or '')
+                if attempt > self.max_retries or code.startswith(NON_RETRYABLE_CODE_PREFIXES):
+                    raise
+                delay = self.backoff_seconds * (2 ** (attempt - 1))
+                logger.warning(f"Batch {index} of {self.table} failed (attempt {attempt}/{self.max_retries}), "
+                               f"retrying in {delay:.1f}s: {str(e)}")
+                time.sleep(delay)
+
+    def _commit(self, index: int):
+        with self._lock:
+            self._checkpoint['committed'].append(index)
+            self._save_checkpoint()
+
+    def _load_checkpoint(self, load_key: str, total_batches: int) -> Dict[str, Any]:
+        fresh = {'table': self.table, 'load_key': load_key, 'batches': total_batches, 'committed': []}
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return fresh
+        try:
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load load checkpoint from {self.checkpoint_path}: {str(e)}")
+            return fresh
+        if checkpoint.get('table') != self.table or checkpoint.get('load_key') != load_key:
+            logger.info(f"Checkpoint {self.checkpoint_path} is for a different load, starting over")
+            return fresh
+        return checkpoint
+
+    def _save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        try:
+            directory = os.path.dirname(self.checkpoint_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._checkpoint, f)
+            os.replace(tmp_path, self.checkpoint_path)
+        except Exception as e:
+            logger.warning(f"Could not save load checkpoint to {self.checkpoint_path}: {str(e)}")
+
+    def _clear_checkpoint(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            try:
+                os.remove(self.checkpoint_path)
+            except OSError as e:
+                logger.warning(f"Could not remove load checkpoint {self.checkpoint_path}: {str(e)}")
@@ -0,0 +1,229 @@
+"""
+Bulk Writer
+===========
+Batched persistence of analytics output rows.
+
+Rows for the analytics output tables are accumulated per table during a run
+and written on ``flush()``: large runs are streamed with COPY over a direct
+Postgres connection when one is configured (see postgres_backend.py), others
+go in one ``persist_analytics_run`` RPC call when the database provides it
+(sql/migrations/004_bulk_persistence.sql), otherwise as size-bounded chunked
+inserts (upserts for tables with a natural key), each retried with
+exponential backoff.
+"""
+
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# In flush order: report blobs before the reports that reference them
+PERSISTED_TABLES = ['report_blobs', 'forecasts', 'department_insights', 'analytics_reports', 'alerts',
+                    'data_quality_assessments']
+
+# Tables upserted on their natural key instead of inserted (sql/migrations/006_record_upserts.sql)
+UPSERT_KEYS = {
+    'report_blobs': ['hash'],
+    'forecasts': ['forecast_type', 'region_id', 'forecast_period_start', 'forecast_period_end'],
+    'department_insights': ['department_name', 'insight_date']
+}
+
+# Content-addressed tables: a stored row never changes, so duplicates are ignored
+IGNORE_DUPLICATES = {'report_blobs'}
+
+# Tables whose rows reference rows of another table; not written if that table failed
+DEPENDS_ON = {'analytics_reports': 'report_blobs'}
+
+PERSIST_RPC = 'persist_analytics_run'
+
+DEFAULT_CHUNK_ROWS = 500
+DEFAULT_CHUNK_BYTES = 1_000_000
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 0.5
+# Below this many rows one RPC round trip beats staging every table for COPY
+DEFAULT_COPY_MIN_ROWS = 1000
+
+# Postgres error classes that retrying cannot fix (data exceptions, constraint
+# violations, syntax/undefined objects) and PostgREST request errors
+NON_RETRYABLE_CODE_PREFIXES = ('22', '23', '42', 'PGRST')
+
+# Whether the connected database exposes the bulk RPC (None until first attempt)
+_rpc_supported: Dict[str, Optional[bool]] = {}
+
+
+def _is_retryable(error: Exception) -> bool:
+    code = getattr(error, 'code', None)
+    return not (code and str(code).startswith(NON_RETRYABLE_CODE_PREFIXES))
+
+
+def json_default(value: Any) -> Any:
+    """JSON fallback for NumPy scalars/arrays and dates in row payloads"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _row_size(row: Dict[str, Any]) -> int:
+    return len(json.dumps(row, default=json_default))
+
+
+class BulkWriter:
+    """
+    Accumulates rows per table and flushes them with as few round trips as possible.
+
+    After ``flush()``, ``failed`` holds the rows that could not be written,
+    per table, so callers can replay them later.
+    """
+
+    def __init__(self, client, chunk_rows: int = DEFAULT_CHUNK_ROWS, chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+                 max_retries: int = DEFAULT_MAX_RETRIES, backoff_seconds: float = DEFAULT_BACKOFF_SECONDS,
+                 use_rpc: bool = True, client_key: str = 'default', copy_backend=None,
+                 copy_min_rows: int = DEFAULT_COPY_MIN_ROWS):
+        self.client = client
+        self.chunk_rows = chunk_rows
+        self.chunk_bytes = chunk_bytes
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.use_rpc = use_rpc
+        self.client_key = client_key
+        self.copy_backend = copy_backend
+        self.copy_min_rows = copy_min_rows
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self.failed: Dict[str, List[Dict[str, Any]]] = {}
+
+    def add(self, table: str, rows: Union[Dict[str, Any], List[Dict[str, Any]]]) -> 'BulkWriter':
+        """Queue one row or a list of rows for ``table``"""
+        if table not in PERSISTED_TABLES:
+            raise ValueError(f"Unsupported table for bulk persistence: {table}")
+        if isinstance(rows, dict):
+            rows = [rows]
+        if rows:
+            self._pending.setdefault(table, []).extend(rows)
+        return self
+
+    @property
+    def pending(self) -> Dict[str, int]:
+        return {table: len(rows) for table, rows in self._pending.items()}
+
+    def flush(self) -> Dict[str, List[Any]]:
+        """
+        Write all queued rows. Returns the inserted ids (or returned rows) per
+        table; tables that failed are listed in ``failed`` instead.
+        """
+        pending, self._pending = self._pending, {}
+        self.failed = {}
+        if not pending:
+            return {}
+
+        total_rows = sum(len(rows) for rows in pending.values())
+        if self.copy_backend is not None and total_rows >= self.copy_min_rows:
+            result = self._flush_copy(pending)
+            if result is not None:
+                logger.info(f"Persisted {total_rows} rows across {len(pending)} tables with COPY")
+                return result
+
+        if self.use_rpc and _rpc_supported.get(self.client_key) is not False:
+            result = self._flush_rpc(pending)
+            if result is not None:
+                logger.info(f"Persisted {total_rows} rows across {len(pending)} tables in one RPC call")
+                return result
+
+        results = {}
+        for table in sorted(pending, key=PERSISTED_TABLES.index):
+            if DEPENDS_ON.get(table) in self.failed:
+                logger.warning(f"Not writing {table}: rows it references in {DEPENDS_ON[table]} failed")
+                self.failed[table] = pending[table]
+                results[table] = []
+                continue
+            results[table] = self._flush_table(table, pending[table])
+        logger.info(f"Persisted {total_rows - sum(len(rows) for rows in self.failed.values())}/{total_rows} "
+                    f"rows across {len(pending)} tables with chunked inserts")
+        return results
+
+    def _flush_copy(self, pending: Dict[str, List[Dict[str, Any]]]) -> Optional[Dict[str, List[Any]]]:
+        """Copy the whole run over a direct Postgres connection in one transaction; None means fall back"""
+        try:
+            results = {}
+            with self.copy_backend.connection() as conn:
+                for table in sorted(pending, key=PERSISTED_TABLES.index):
+                    results[table] = self.copy_backend.copy_records(
+                        table, pending[table],
+                        conflict_columns=UPSERT_KEYS.get(table),
+                        update=table not in IGNORE_DUPLICATES,
+                        returning=UPSERT_KEYS[table][0] if table in IGNORE_DUPLICATES else 'id',
+                        conn=conn
+                    )
+            return results
+        except Exception as e:
+            logger.warning(f"COPY over direct Postgres failed, falling back to PostgREST: {str(e)}")
+            return None
+
+    def _flush_rpc(self, pending: Dict[str, List[Dict[str, Any]]]) -> Optional[Dict[str, List[Any]]]:
+        """Send the whole run in one transactional RPC; None means fall back to chunked inserts"""
+        try:
+            response = self._with_retries(
+                lambda: self.client.rpc(PERSIST_RPC, {'payload': pending}).execute(),
+                f"{PERSIST_RPC} RPC"
+            )
+            _rpc_supported[self.client_key] = True
+            return dict(response.data or {})
+        except Exception as e:
+            code = str(getattr(e, 'code', '') or '')
+            if code.startswith('PGRST') or code == '42883':
+                # Function not deployed on this database; stop trying it
+                _rpc_supported[self.client_key] = False
+                logger.info(f"{PERSIST_RPC} RPC not available, using chunked inserts")
+            else:
+                logger.warning(f"{PERSIST_RPC} RPC failed, falling back to chunked inserts: {str(e)}")
+            return None
+
+    def _flush_table(self, table: str, rows: List[Dict[str, Any]]) -> List[Any]:
+        inserted: List[Any] = []
+        key = UPSERT_KEYS[table][0] if table in IGNORE_DUPLICATES else 'id'
+        for chunk in self._chunks(rows):
+            if table in UPSERT_KEYS:
+                operation = lambda: self.client.table(table).upsert(
+                    chunk, on_conflict=','.join(UPSERT_KEYS[table]), ignore_duplicates=table in IGNORE_DUPLICATES
+                ).execute()
+            else:
+                operation = lambda: self.client.table(table).insert(chunk).execute()
+            try:
+                response = self._with_retries(operation, f"insert of {len(chunk)} rows into {table}")
+                returned = response.data or []
+                inserted.extend(row.get(key, row) if isinstance(row, dict) else row for row in returned)
+            except Exception as e:
+                logger.error(f"Could not persist {len(chunk)} rows into {table}: {str(e)}")
+                self.failed.setdefault(table, []).extend(chunk)
+        return inserted
+
+    def _chunks(self, rows: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        """Split rows into chunks bounded by row count and serialized size"""
+        chunk: List[Dict[str, Any]] = []
+        chunk_size = 0
+        for row in rows:
+            size = _row_size(row)
+            if chunk and (len(chunk) >= self.chunk_rows or chunk_size + size > self.chunk_bytes):
+                yield chunk
+                chunk, chunk_size = [], 0
+            chunk.append(row)
+            chunk_size += size
+        if chunk:
+            yield chunk
+
+    def _with_retries(self, operation: Callable[[], Any], description: str) -> Any:
+        attempt = 0
+        while True:
+            try:
+                return operation()
+            except Exception as e:
+                attempt += 1
+                if attempt > self.max_retries or not _is_retryable(e):
+                    raise
+                delay = self.backoff_seconds * (2 ** (attempt - 1))
+                logger.warning(f"{description} failed (attempt {attempt}/{self.max_retries}), "
+                               f"retrying in {delay:.1f}s: {str(e)}")
+                time.sleep(delay)
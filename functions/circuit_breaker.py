@@ -0,0 +1,177 @@
+"""
+Circuit Breaker
+===============
+Fail-fast guard for remote dependencies such as Supabase.
+
+After ``failure_threshold`` consecutive failures a breaker opens and calls
+fail immediately with ``CircuitOpenError`` for a cool-down period that
+doubles with every failed trial call (up to ``max_cooldown``). When the
+cool-down expires one trial call is let through (half-open); success closes
+the breaker again. Breakers are shared per name within the process and, with
+a state directory, across processes, so an offline CLI run does not wait out
+the same connection timeout that the previous run already hit.
+
+Only errors that ``is_failure`` classifies as outages count towards opening
+the breaker; any other error means the dependency answered, so it counts as
+a success and is re-raised unchanged.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from analytics_cache import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 1))
+DEFAULT_COOLDOWN_SECONDS = float(os.getenv('CIRCUIT_COOLDOWN_SECONDS', 30))
+DEFAULT_MAX_COOLDOWN_SECONDS = float(os.getenv('CIRCUIT_MAX_COOLDOWN_SECONDS', 600))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit '{name}' is open, retrying in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with exponential cool-down"""
+
+    def __init__(self, name: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 cooldown: float = DEFAULT_COOLDOWN_SECONDS, max_cooldown: float = DEFAULT_MAX_COOLDOWN_SECONDS,
+                 state_dir: Optional[str] = None,
+                 is_failure: Optional[Callable[[BaseException], bool]] = None):
+        self.name = name
+        self.is_failure = is_failure or (lambda error: True)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state_path = os.path.join(state_dir, f"circuit_{name}.json") if state_dir else None
+
+        self.failures = 0
+        self.trips = 0  # Consecutive openings; drives the exponential cool-down
+        self.opened_until = 0.0  # Wall-clock time, so the state is meaningful to other processes
+        self.last_error: Optional[str] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._load_state()
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.failure_threshold:
+            return CLOSED
+        return OPEN if time.time() < self.opened_until else HALF_OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (at most one trial call while half-open)"""
+        with self._lock:
+            self._load_state()
+            state = self.state
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_until - time.time())
+
+    def record_success(self):
+        with self._lock:
+            recovered = self.failures >= self.failure_threshold
+            self.failures = 0
+            self.trips = 0
+            self.opened_until = 0.0
+            self.last_error = None
+            self._trial_in_flight = False
+            self._save_state()
+        if recovered:
+            logger.info(f"Circuit '{self.name}' closed, dependency reachable again")
+
+    def record_failure(self, error: Optional[BaseException] = None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error) if error is not None else None
+            self._trial_in_flight = False
+            if self.failures >= self.failure_threshold:
+                cooldown = min(self.max_cooldown, self.cooldown * (2 ** self.trips))
+                self.trips += 1
+                self.opened_until = time.time() + cooldown
+                logger.warning(f"Circuit '{self.name}' open for {cooldown:.0f}s after "
+                               f"{self.failures} failure(s): {self.last_error}")
+            self._save_state()
+
+    def record_error(self, error: BaseException):
+        """Record a failed call: a failure if ``is_failure`` says so, otherwise a success"""
+        if self.is_failure(error):
+            self.record_failure(error)
+        else:
+            self.record_success()
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``func`` through the breaker, raising CircuitOpenError while open"""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in())
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record_error(e)
+            raise
+        self.record_success()
+        return result
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            self.failures = state.get('failures', 0)
+            self.trips = state.get('trips', 0)
+            self.opened_until = state.get('opened_until', 0.0)
+            self.last_error = state.get('last_error')
+        except Exception as e:
+            logger.warning(f"Could not load circuit state from {self.state_path}: {str(e)}")
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'failures': self.failures, 'trips': self.trips,
+                           'opened_until': self.opened_until, 'last_error': self.last_error}, f)
+            os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            logger.warning(f"Could not save circuit state to {self.state_path}: {str(e)}")
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """
+    Process-wide breaker for ``name``. State is shared across processes
+    through CIRCUIT_STATE_DIR (default: the analytics cache directory).
+    """
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            kwargs.setdefault('state_dir', os.getenv('CIRCUIT_STATE_DIR') or get_cache_dir())
+            breaker = CircuitBreaker(name, **kwargs)
+            _breakers[name] = breaker
+        return breaker
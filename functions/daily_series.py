@@ -0,0 +1,68 @@
+"""
+Daily Series
+============
+Per-day aggregates of the source tables, computed in the database.
+
+Forecasting only needs one number per day (and per region for occupancy),
+so instead of shipping every raw row to Python and grouping it there the
+loader asks Postgres for the aggregated series: over the direct connection
+(``PostgresBackend.daily_aggregate``) or through the ``daily_series`` RPC
+(sql/migrations/007_daily_series.sql). Either way the transfer is one row
+per day and group instead of one row per record.
+
+Every series has the same shape (``SERIES_COLUMNS``): the day, the group
+key (None when ungrouped), the number of records, and the sum and mean of
+the series value.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+SERIES_RPC = 'daily_series'
+SERIES_COLUMNS = ['day', 'group_key', 'records', 'total', 'mean']
+
+
+@dataclass(frozen=True)
+class SeriesSpec:
+    """Rows of ``table`` bucketed by the day of ``date_column``"""
+    table: str
+    date_column: str
+    value_column: Optional[str] = None  # None: the series only counts records
+    per_column: Optional[str] = None  # Value is value_column / per_column per row (a rate)
+    dimensions: Tuple[str, ...] = ()  # Columns the series may be grouped by
+
+
+# Keep in sync with daily_series() in sql/migrations/007_daily_series.sql
+DAILY_SERIES = {
+    'arrivals': SeriesSpec('arrivals', 'timestamp', 'passenger_count', dimensions=('destination', 'origin')),
+    'occupancy': SeriesSpec('occupancy', 'date', 'occupied_rooms', 'total_rooms', dimensions=('region_id', 'hotel_id')),
+    'revenue': SeriesSpec('occupancy', 'date', 'revenue', dimensions=('region_id', 'hotel_id')),
+    'visits': SeriesSpec('visits', 'timestamp', 'visitor_count', dimensions=('region_id', 'site_id')),
+    'registrations': SeriesSpec('tourists', 'created_at', dimensions=('nationality', 'purpose_of_visit'))
+}
+
+# Series (and grouping) consumed by TourismInsightsEngine.generate_forecasts
+FORECAST_SERIES: Dict[str, Optional[str]] = {
+    'arrivals': None,
+    'occupancy': 'region_id',
+    'revenue': None
+}
+
+
+def series_frame(rows: List[Any]) -> pd.DataFrame:
+    """Normalize aggregate rows (dicts or tuples in ``SERIES_COLUMNS`` order) into a typed series frame"""
+    frame = pd.DataFrame.from_records(rows, columns=SERIES_COLUMNS) if rows else pd.DataFrame(columns=SERIES_COLUMNS)
+    frame['day'] = pd.to_datetime(frame['day'])
+    frame['group_key'] = frame['group_key'].astype(object).where(frame['group_key'].notna(), None)
+    frame['records'] = pd.to_numeric(frame['records']).fillna(0).astype('int64')
+    frame['total'] = pd.to_numeric(frame['total']).astype('float64')
+    frame['mean'] = pd.to_numeric(frame['mean']).astype('float64')
+    return frame.sort_values(['group_key', 'day'], na_position='first').reset_index(drop=True)
+
+
+def series_values(frame: pd.DataFrame) -> pd.Series:
+    """Daily totals of an ungrouped series, or record counts when the series value is never set"""
+    column = 'total' if frame['total'].notna().any() else 'records'
+    return frame.set_index('day')[column].fillna(0)
@@ -13,6 +13,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import logging
 
+from metric_kernels import grouped_ratio_of_sums, safe_rate
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -117,12 +119,14 @@ class TourismDataAnalyzer:
         
         return results
     
-    def analyze_occupancy(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def analyze_occupancy(self, df: pd.DataFrame, rates_precomputed: bool = False) -> Dict[str, Any]:
         """
         Analyze hotel occupancy data for tourism insights.
         
         Args:
             df: DataFrame with columns: hotel_id, date, total_rooms, occupied_rooms, region
+            rates_precomputed: Reuse an existing occupancy_rate column (set by
+                callers that already derived it for the full frame)
             
         Returns:
             Dict containing occupancy analysis results
@@ -132,15 +136,21 @@ class TourismDataAnalyzer:
         try:
             # Calculate occupancy rate
             if 'occupied_rooms' in df.columns and 'total_rooms' in df.columns:
-                df['occupancy_rate'] = (df['occupied_rooms'] / df['total_rooms']) * 100
+                if not (rates_precomputed and 'occupancy_rate' in df.columns):
+                    df['occupancy_rate'] = safe_rate(df['occupied_rooms'], df['total_rooms']) * 100
                 results['average_occupancy_rate'] = float(df['occupancy_rate'].mean())
                 results['peak_occupancy_rate'] = float(df['occupancy_rate'].max())
                 results['lowest_occupancy_rate'] = float(df['occupancy_rate'].min())
             
             # Regional analysis
-            if 'region' in df.columns:
+            if 'region' in df.columns and 'occupancy_rate' in df.columns:
                 regional_occupancy = df.groupby('region')['occupancy_rate'].mean().to_dict()
                 results['occupancy_by_region'] = {k: float(v) for k, v in regional_occupancy.items()}
+                
+                # Capacity-weighted utilization (occupied / total rooms per region)
+                if 'occupied_rooms' in df.columns and 'total_rooms' in df.columns:
+                    regional_utilization = grouped_ratio_of_sums(df, 'region', 'occupied_rooms', 'total_rooms') * 100
+                    results['utilization_by_region'] = {k: float(v) for k, v in regional_utilization.items()}
             
             # Revenue analysis (if available)
             if 'revenue' in df.columns:
@@ -392,9 +402,11 @@ def handler(event, context):
             # Analyze data by region if region column exists
             if 'region' in df.columns:
                 regional_results = {}
-                for region in df['region'].unique():
-                    region_df = df[df['region'] == region]
-                    regional_results[region] = analyzer.analyze_occupancy(region_df)
+                # Derive row-level rates once, then partition in a single groupby pass
+                if 'occupied_rooms' in df.columns and 'total_rooms' in df.columns:
+                    df['occupancy_rate'] = safe_rate(df['occupied_rooms'], df['total_rooms']) * 100
+                for region, region_df in df.groupby('region', sort=False):
+                    regional_results[region] = analyzer.analyze_occupancy(region_df.copy(), rates_precomputed=True)
                 results['regional_analysis'] = regional_results
             else:
                 results['error'] = 'Regional analysis requires a "region" column in the data'
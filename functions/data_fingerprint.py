@@ -0,0 +1,298 @@
+"""
+Data Fingerprinting
+===================
+Cheap content fingerprints for DataFrames, used as cache keys across the
+analytics pipeline.
+
+Every column is hashed in fixed-size row blocks: numeric and datetime
+columns hash their raw NumPy buffers, other columns hash their Arrow buffers
+(falling back to ``pd.util.hash_pandas_object`` without pyarrow). Block
+digests roll up into per-column digests and a frame digest, so consumers can
+key on just the columns they read. Fingerprints are memoized by source key
+(file path + mtime, or a watermark) and can be persisted, so an unchanged
+source costs a ``stat()`` rather than a rehash.
+
+Frames loaded from a file are fingerprinted from the file's bytes instead
+(``file_digest`` + ``derived_fingerprint``): streaming the raw bytes through
+the hash is several times cheaper than hashing the parsed, mostly string
+columns.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BLOCK_ROWS = 1 << 16
+FILE_CHUNK_BYTES = 1 << 20
+DIGEST_SIZE = 16
+MEMO_ENTRIES = 64
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+@dataclass
+class Fingerprint:
+    """Per-column, per-block content digests of a frame"""
+    rows: int
+    columns: Dict[str, str]
+    blocks: Dict[str, List[str]] = field(default_factory=dict)
+    block_rows: int = BLOCK_ROWS
+
+    @property
+    def digest(self) -> str:
+        """Digest of the whole frame (column names, order-independent)"""
+        return self.subset(self.columns)
+
+    def subset(self, columns: Iterable[str]) -> str:
+        """Digest over the given columns only (columns absent from the frame are ignored)"""
+        hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        hasher.update(str(self.rows).encode())
+        for name in sorted(set(columns) & set(self.columns)):
+            hasher.update(f"|{name}={self.columns[name]}".encode())
+        return hasher.hexdigest()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'rows': self.rows, 'columns': self.columns, 'blocks': self.blocks, 'block_rows': self.block_rows}
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> 'Fingerprint':
+        return cls(rows=payload['rows'], columns=payload['columns'],
+                   blocks=payload.get('blocks', {}), block_rows=payload.get('block_rows', BLOCK_ROWS))
+
+
+def _hash_block(values: pd.Series) -> str:
+    """Digest of one column block"""
+    hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    hasher.update(str(values.dtype).encode())
+
+    array = values.to_numpy() if values.dtype.kind in 'biufcmM' else None
+    if array is not None and array.dtype.kind in 'biufcmM':
+        hasher.update(np.ascontiguousarray(array).view(np.uint8))
+        return hasher.hexdigest()
+
+    if PYARROW_AVAILABLE:
+        try:
+            arrow = pa.array(values, from_pandas=True)
+            chunks = arrow.chunks if isinstance(arrow, pa.ChunkedArray) else [arrow]
+            for chunk in chunks:
+                if chunk.offset:
+                    # Sliced views share their parent's buffers; compact before hashing
+                    chunk = pa.concat_arrays([chunk])
+                buffers = chunk.buffers()
+                if isinstance(chunk, pa.DictionaryArray):
+                    # Categoricals hold only the codes; the categories they point to are the values
+                    buffers += pa.concat_arrays([chunk.dictionary]).buffers()
+                for buffer in buffers:
+                    if buffer is not None:
+                        hasher.update(memoryview(buffer))
+            return hasher.hexdigest()
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            pass  # Mixed-type object column
+
+    hasher.update(pd.util.hash_pandas_object(values, index=False).to_numpy().view(np.uint8))
+    return hasher.hexdigest()
+
+
+def _combine(block_digests: List[str]) -> str:
+    hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    for digest in block_digests:
+        hasher.update(digest.encode())
+    return hasher.hexdigest()
+
+
+def fingerprint_frame(df: pd.DataFrame, previous: Optional[Fingerprint] = None,
+                      block_rows: int = BLOCK_ROWS) -> Fingerprint:
+    """
+    Fingerprint a frame block by block.
+
+    ``previous`` enables incremental hashing of append-only sources: complete
+    blocks already covered by the previous fingerprint are reused and only
+    the tail is hashed. Only pass it when earlier rows cannot have changed.
+    """
+    reusable_blocks = 0
+    if previous is not None and previous.block_rows == block_rows and len(df) >= previous.rows:
+        reusable_blocks = previous.rows // block_rows
+
+    columns: Dict[str, str] = {}
+    blocks: Dict[str, List[str]] = {}
+    for name in df.columns:
+        column = df[name]
+        digests = []
+        if reusable_blocks and str(name) in previous.blocks:
+            digests = previous.blocks[str(name)][:reusable_blocks]
+        for start in range(len(digests) * block_rows, len(df), block_rows):
+            digests.append(_hash_block(column.iloc[start:start + block_rows]))
+        blocks[str(name)] = digests
+        columns[str(name)] = _combine(digests)
+
+    return Fingerprint(rows=len(df), columns=columns, blocks=blocks, block_rows=block_rows)
+
+
+class FingerprintService:
+    """
+    Memoizing fingerprint provider.
+
+    Fingerprints are looked up by a source key - e.g. ``file_source_key()``
+    (path, mtime, size) or ``watermark_source_key()`` (row count and max
+    watermark value) - and rehashed only when the key changes. With a
+    ``cache_dir`` the memo survives across processes.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = MEMO_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._memo: 'OrderedDict[str, Fingerprint]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_memo()
+
+    @property
+    def _memo_path(self) -> Optional[str]:
+        return os.path.join(self.cache_dir, 'fingerprints.json') if self.cache_dir else None
+
+    def _load_memo(self):
+        path = self._memo_path
+        if not path or not os.path.exists(path):
+            return
+        try:
+            with open(path) as f:
+                for key, payload in json.load(f).items():
+                    self._memo[key] = Fingerprint.from_dict(payload)
+        except Exception as e:
+            logger.warning(f"Could not load fingerprint memo from {path}: {str(e)}")
+
+    def _save_memo(self):
+        path = self._memo_path
+        if not path:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({key: fp.to_dict() for key, fp in self._memo.items()}, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not persist fingerprint memo to {path}: {str(e)}")
+
+    def fingerprint(self, df: pd.DataFrame, source_key: Optional[str] = None,
+                    append_only_from: Optional[str] = None) -> Fingerprint:
+        """
+        Fingerprint ``df``, reusing the memoized result for ``source_key``.
+
+        ``append_only_from`` names an earlier source key whose fingerprint
+        covers a prefix of ``df`` (e.g. the previous watermark of an
+        append-only table); its complete blocks are not rehashed.
+        """
+        with self._lock:
+            cached = self._memo.get(source_key) if source_key else None
+            if cached is not None and cached.rows == len(df) and set(cached.columns) == set(map(str, df.columns)):
+                self._memo.move_to_end(source_key)
+                return cached
+            previous = self._memo.get(append_only_from) if append_only_from else None
+
+        fp = fingerprint_frame(df, previous=previous)
+
+        if source_key:
+            with self._lock:
+                self._memo[source_key] = fp
+                while len(self._memo) > self.max_entries:
+                    self._memo.popitem(last=False)
+                self._save_memo()
+        return fp
+
+    def file_digest(self, path: str) -> str:
+        """Digest of a file's bytes, memoized (and persisted) by path, mtime and size"""
+        source_key = f"file:{self.file_source_key(path)}"
+        with self._lock:
+            cached = self._memo.get(source_key)
+            if cached is not None:
+                self._memo.move_to_end(source_key)
+                return cached.columns['bytes']
+
+        hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(FILE_CHUNK_BYTES), b''):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+
+        with self._lock:
+            self._memo[source_key] = Fingerprint(rows=0, columns={'bytes': digest})
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+            self._save_memo()
+        return digest
+
+    @staticmethod
+    def file_source_key(path: str, *qualifiers: Any) -> str:
+        """Source key for data read from a file: path, mtime and size plus load qualifiers"""
+        stat = os.stat(path)
+        parts = [os.path.abspath(path), str(stat.st_mtime_ns), str(stat.st_size)] + [str(q) for q in qualifiers]
+        return '|'.join(parts)
+
+    @staticmethod
+    def watermark_source_key(name: str, df: pd.DataFrame, column: str, *qualifiers: Any) -> Optional[str]:
+        """Source key for an append-only table: row count and max watermark column value"""
+        if column not in df.columns or df.empty:
+            return None
+        parts = [name, str(len(df)), str(df[column].max())] + [str(q) for q in qualifiers]
+        return '|'.join(parts)
+
+
+def derived_fingerprint(df: pd.DataFrame, source_digest: str, *qualifiers: Any) -> Fingerprint:
+    """
+    Fingerprint of a frame fully determined by its source (e.g. a file's
+    ``file_digest``) and the load qualifiers (date range, projection, table).
+    Column digests change together whenever the source does.
+    """
+    base = '|'.join([source_digest] + [str(q) for q in qualifiers])
+    columns = {}
+    for name in map(str, df.columns):
+        hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        hasher.update(f"{base}|{name}".encode())
+        columns[name] = hasher.hexdigest()
+    return Fingerprint(rows=len(df), columns=columns)
+
+
+def attach_fingerprint(df: pd.DataFrame, fp: Fingerprint) -> pd.DataFrame:
+    """Record a fingerprint on the frame it describes"""
+    # Keyed by id(): frames derived from df inherit attrs but must not inherit the fingerprint
+    df.attrs['fingerprint'] = (id(df), fp)
+    return df
+
+
+def get_fingerprint(df: pd.DataFrame) -> Optional[Fingerprint]:
+    """The fingerprint attached to exactly this frame, if any"""
+    entry = df.attrs.get('fingerprint')
+    if not entry or entry[0] != id(df) or entry[1].rows != len(df):
+        return None
+    return entry[1]
+
+
+def frame_fingerprint(df: pd.DataFrame, service: Optional[FingerprintService] = None) -> Fingerprint:
+    """Attached fingerprint of a frame, computing and attaching one if needed"""
+    fp = get_fingerprint(df)
+    if fp is None:
+        fp = service.fingerprint(df) if service is not None else fingerprint_frame(df)
+        attach_fingerprint(df, fp)
+    return fp
+
+
+def combine_digests(digests: Dict[str, str]) -> str:
+    """Stable digest over named digests (e.g. one per table)"""
+    hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    for name in sorted(digests):
+        hasher.update(f"|{name}={digests[name]}".encode())
+    return hasher.hexdigest()
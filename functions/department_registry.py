@@ -0,0 +1,129 @@
+"""
+Department Registry
+===================
+Plugin registry for departmental insight generators.
+
+Each department handler is registered with ``@register_department`` and
+declares the tables and columns it reads, the derived features it relies on
+and the metrics it emits. The insights engine dispatches through the
+registry, skips departments whose input tables hold no data, and uses the
+union of the declared requirements to project only the needed columns when
+loading CSV, Parquet or Supabase data.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Candidate timestamp columns probed by the loaders and handlers
+DATE_COLUMNS = ['timestamp', 'date', 'arrival_date', 'created_at']
+
+# Core arrival record fields (generated CSV and Supabase arrivals) that Data Completeness is measured over
+COMPLETENESS_COLUMNS = ['arrival_date', 'nationality', 'tourist_destination', 'age', 'sex', 'spend_amount',
+                        'visit_duration_days', 'timestamp', 'flight_number', 'origin', 'destination',
+                        'passenger_count']
+
+SPEND_COLUMNS = ['spend_amount', 'flight_spend', 'hotel_spend', 'activity_spend', 'package_spend', 'souvenir_spend']
+
+# Derived feature -> source columns it is computed from during loading
+DERIVED_FEATURES = {
+    'total_spend': SPEND_COLUMNS,
+    'occupancy_rate': ['hotel_nights', 'visit_duration_days'],
+    'year': ['arrival_date'],
+    'month': ['arrival_date'],
+    'day_of_week': ['arrival_date'],
+    'week_of_year': ['arrival_date']
+}
+
+# Columns that decide which records land in a derived table (see _process_csv_data)
+TABLE_KEY_COLUMNS = {
+    'occupancy': ['hotel_nights'],
+    'surveys': ['satisfaction_score']
+}
+
+
+@dataclass
+class DepartmentSpec:
+    """Declared inputs and outputs of one department handler"""
+    name: str
+    handler: str  # Engine method implementing the department
+    focus_metrics: List[str]
+    priority: str
+    tables: List[str] = field(default_factory=list)  # Skipped when none of these has rows
+    columns: List[str] = field(default_factory=list)
+    derived: List[str] = field(default_factory=list)
+    metrics: List[str] = field(default_factory=list)
+
+    def source_columns(self) -> Set[str]:
+        """Raw columns needed, with derived features expanded to their sources"""
+        needed = set(self.columns) | set(self.derived)
+        for feature in self.derived:
+            needed.update(DERIVED_FEATURES.get(feature, []))
+        for table in self.tables:
+            needed.update(TABLE_KEY_COLUMNS.get(table, []))
+        return needed
+
+    def has_inputs(self, data: Dict[str, pd.DataFrame]) -> bool:
+        """Whether at least one of the declared tables holds data"""
+        if not self.tables:
+            return True
+        return any(table in data and not data[table].empty for table in self.tables)
+
+
+DEPARTMENT_REGISTRY: Dict[str, DepartmentSpec] = {}
+
+
+def register_department(name: str, focus_metrics: List[str], priority: str,
+                        tables: Optional[List[str]] = None, columns: Optional[List[str]] = None,
+                        derived: Optional[List[str]] = None,
+                        metrics: Optional[List[str]] = None) -> Callable[[Callable], Callable]:
+    """Decorator registering an engine method as the insight generator for a department"""
+
+    def decorator(func: Callable) -> Callable:
+        if name in DEPARTMENT_REGISTRY and DEPARTMENT_REGISTRY[name].handler != func.__name__:
+            logger.warning(f"Department '{name}' re-registered by {func.__name__}")
+        DEPARTMENT_REGISTRY[name] = DepartmentSpec(
+            name=name,
+            handler=func.__name__,
+            focus_metrics=focus_metrics,
+            priority=priority,
+            tables=tables or [],
+            columns=columns or [],
+            derived=derived or [],
+            metrics=metrics or []
+        )
+        return func
+
+    return decorator
+
+
+def get_department_specs(names: Optional[Iterable[str]] = None) -> List[DepartmentSpec]:
+    """Specs for the given departments (all registered ones when None), in registration order"""
+    if names is None:
+        return list(DEPARTMENT_REGISTRY.values())
+
+    names = list(names)
+    unknown = [name for name in names if name not in DEPARTMENT_REGISTRY]
+    if unknown:
+        raise ValueError(f"Unknown departments: {', '.join(unknown)}")
+    return [spec for spec in DEPARTMENT_REGISTRY.values() if spec.name in names]
+
+
+def department_columns(names: Optional[Iterable[str]] = None) -> Set[str]:
+    """Union of the source columns required by the given departments"""
+    needed: Set[str] = set()
+    for spec in get_department_specs(names):
+        needed |= spec.source_columns()
+    return needed
+
+
+def expand_derived(columns: Iterable[str]) -> Set[str]:
+    """Add the source columns of any derived features in ``columns``"""
+    needed = set(columns)
+    for column in list(needed):
+        needed.update(DERIVED_FEATURES.get(column, []))
+    return needed
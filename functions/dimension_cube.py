@@ -0,0 +1,227 @@
+"""
+Dimension Cube
+==============
+Pre-aggregated OLAP cube over tourism visit records.
+
+The cube is materialized once per data snapshot at
+day x region x destination x nationality x sector x sex x age_group x package_type
+grain and holds count, sum, sum-of-squares, min and max for the spend,
+satisfaction, rating and duration measures. Dimensional and top-N analyses
+roll the (much smaller) cube up instead of rescanning raw rows.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from metric_kernels import safe_rate
+
+logger = logging.getLogger(__name__)
+
+# Cube grain: cube dimension -> source column ('day' and 'age_group' are derived)
+CUBE_DIMENSIONS = {
+    'day': None,
+    'home_region': 'home_region',
+    'tourist_destination': 'tourist_destination',
+    'nationality': 'nationality',
+    'sector': 'sector',
+    'sex': 'sex',
+    'age_group': 'age',
+    'package_type': 'package_type'
+}
+
+CUBE_MEASURES = [
+    'total_spend', 'spend_amount', 'hotel_spend', 'activity_spend', 'flight_spend',
+    'package_spend', 'souvenir_spend', 'local_business_spend',
+    'satisfaction_score', 'hotel_rating', 'infrastructure_rating', 'other_service_rating',
+    'visit_duration_days', 'hotel_nights'
+]
+
+DATE_COLUMNS = ['arrival_date', 'created_at', 'date', 'timestamp']
+
+AGE_BINS = [0, 25, 35, 50, 65, 100]
+AGE_LABELS = ['18-25', '26-35', '36-50', '51-65', '65+']
+
+ROW_COUNT = 'row_count'
+STATISTICS = ['sum', 'sumsq', 'count', 'min', 'max']
+
+
+class DimensionCube:
+    """
+    Aggregate cube with one row per populated dimension cell.
+
+    Cell columns are the dimensions, ``row_count`` and ``<measure>__<stat>``
+    for each statistic in STATISTICS.
+    """
+
+    def __init__(self, cells: pd.DataFrame, dimensions: List[str], measures: List[str],
+                 snapshot_key: Optional[str] = None, source_rows: int = 0):
+        self.cells = cells
+        self.dimensions = dimensions
+        self.measures = measures
+        self.snapshot_key = snapshot_key
+        self.source_rows = source_rows
+        self._rollups: Dict[str, pd.DataFrame] = {}
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, snapshot_key: Optional[str] = None) -> 'DimensionCube':
+        """Materialize the cube from raw visit records"""
+
+        keys = {}
+        for dimension, column in CUBE_DIMENSIONS.items():
+            if dimension == 'day':
+                date_col = next((col for col in DATE_COLUMNS if col in df.columns), None)
+                if date_col:
+                    keys['day'] = pd.to_datetime(df[date_col], errors='coerce').dt.normalize()
+            elif dimension == 'age_group':
+                if column in df.columns:
+                    ages = pd.to_numeric(df[column], errors='coerce')
+                    keys['age_group'] = pd.cut(ages, bins=AGE_BINS, labels=AGE_LABELS).astype(object)
+            elif column in df.columns:
+                keys[dimension] = df[column]
+
+        measures = [col for col in CUBE_MEASURES
+                    if col in df.columns and pd.api.types.is_numeric_dtype(df[col])]
+
+        frame = pd.DataFrame(keys, index=df.index)
+        frame[ROW_COUNT] = 1
+        for measure in measures:
+            values = df[measure].astype('float64')
+            frame[f'{measure}__sum'] = values
+            frame[f'{measure}__sumsq'] = values * values
+            frame[f'{measure}__count'] = values.notna().astype('int64')
+            frame[f'{measure}__min'] = values
+            frame[f'{measure}__max'] = values
+
+        dimensions = list(keys)
+        if not dimensions:
+            cells = frame.agg(_aggregation_spec(measures)).to_frame().T
+        else:
+            cells = frame.groupby(dimensions, dropna=False, sort=False, observed=True)\
+                .agg(_aggregation_spec(measures))\
+                .reset_index()
+
+        logger.info(f"Built dimension cube: {len(df)} rows -> {len(cells)} cells "
+                    f"({len(dimensions)} dimensions, {len(measures)} measures)")
+        return cls(cells, dimensions, measures, snapshot_key=snapshot_key, source_rows=len(df))
+
+    def has_dimension(self, dimension: str) -> bool:
+        return dimension in self.dimensions
+
+    def has_measure(self, measure: str) -> bool:
+        return measure in self.measures
+
+    def rollup(self, dimension: str) -> pd.DataFrame:
+        """Aggregate the cube to a single dimension (missing keys are dropped, like groupby)"""
+        if dimension not in self._rollups:
+            if dimension not in self.dimensions:
+                raise KeyError(f"Dimension not in cube: {dimension}")
+            self._rollups[dimension] = self.cells.groupby(dimension, sort=False)\
+                .agg(_aggregation_spec(self.measures))
+        return self._rollups[dimension]
+
+    def counts(self, dimension: str) -> pd.Series:
+        """Row count per dimension value, largest first (value_counts equivalent)"""
+        return self.rollup(dimension)[ROW_COUNT].sort_values(ascending=False, kind='stable').rename('count')
+
+    def nunique(self, dimension: str) -> int:
+        return len(self.rollup(dimension))
+
+    def sum(self, dimension: str, measure: str) -> pd.Series:
+        return self.rollup(dimension)[f'{measure}__sum'].rename(measure)
+
+    def mean(self, dimension: str, measure: str) -> pd.Series:
+        rolled = self.rollup(dimension)
+        return safe_rate(rolled[f'{measure}__sum'], rolled[f'{measure}__count'], fill=np.nan).rename(measure)
+
+    def total(self, measure: str, stat: str = 'sum') -> float:
+        """Grand total of a measure statistic across the whole cube"""
+        column = self.cells[f'{measure}__{stat}']
+        if stat == 'min':
+            return float(column.min())
+        if stat == 'max':
+            return float(column.max())
+        return float(column.sum())
+
+    def total_mean(self, measure: str) -> float:
+        count = self.total(measure, 'count')
+        return self.total(measure) / count if count > 0 else float('nan')
+
+    def total_std(self, measure: str) -> float:
+        """Sample standard deviation (ddof=1), matching pandas' Series.std()"""
+        count = self.total(measure, 'count')
+        if count < 2:
+            return float('nan')
+        total = self.total(measure)
+        variance = (self.total(measure, 'sumsq') - total * total / count) / (count - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+    @property
+    def rows(self) -> int:
+        return int(self.cells[ROW_COUNT].sum()) if len(self.cells) else 0
+
+    def save(self, path: str) -> bool:
+        """Persist the cube as Parquet with its snapshot key in the schema metadata"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            logger.warning("pyarrow not available, dimension cube not persisted")
+            return False
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            table = pa.Table.from_pandas(self.cells, preserve_index=False)
+            metadata = dict(table.schema.metadata or {})
+            metadata[b'dimension_cube'] = json.dumps({
+                'snapshot_key': self.snapshot_key,
+                'dimensions': self.dimensions,
+                'measures': self.measures,
+                'source_rows': self.source_rows
+            }).encode('utf-8')
+            tmp_path = f"{path}.tmp"
+            pq.write_table(table.replace_schema_metadata(metadata), tmp_path, compression='zstd')
+            os.replace(tmp_path, path)
+            logger.info(f"Saved dimension cube ({len(self.cells)} cells) to {path}")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not persist dimension cube to {path}: {str(e)}")
+            return False
+
+    @classmethod
+    def load(cls, path: str, snapshot_key: Optional[str] = None) -> Optional['DimensionCube']:
+        """Load a persisted cube; returns None if missing or built from a different snapshot"""
+        if not os.path.exists(path):
+            return None
+
+        try:
+            import pyarrow.parquet as pq
+
+            table = pq.read_table(path)
+            info: Dict[str, Any] = json.loads((table.schema.metadata or {}).get(b'dimension_cube', b'{}'))
+            if snapshot_key is not None and info.get('snapshot_key') != snapshot_key:
+                return None
+
+            cells = table.to_pandas()
+            logger.info(f"Loaded dimension cube ({len(cells)} cells) from {path}")
+            return cls(cells, info.get('dimensions', []), info.get('measures', []),
+                       snapshot_key=info.get('snapshot_key'), source_rows=info.get('source_rows', 0))
+        except Exception as e:
+            logger.warning(f"Could not load dimension cube from {path}: {str(e)}")
+            return None
+
+
+def _aggregation_spec(measures: List[str]) -> Dict[str, str]:
+    """Column -> reducer mapping used both to build and to roll up the cube"""
+    spec = {ROW_COUNT: 'sum'}
+    for measure in measures:
+        spec[f'{measure}__sum'] = 'sum'
+        spec[f'{measure}__sumsq'] = 'sum'
+        spec[f'{measure}__count'] = 'sum'
+        spec[f'{measure}__min'] = 'min'
+        spec[f'{measure}__max'] = 'max'
+    return spec
@@ -7,227 +7,167 @@ and upserts records into the 'tourism_data' table on Supabase.
 Prerequisites:
     pip install pandas numpy supabase
 
+The records are drawn column by column (see tourism_data_generator.py), so
+millions of rows take seconds.
+
 Make sure to set environment variables:
     SUPABASE_URL   - your Supabase project URL
     SUPABASE_KEY   - your Supabase service role key (for upserts)
+    SUPABASE_DB_URL - optional Postgres connection string; the upload then
+                      streams the rows with COPY in one transaction
 
 Usage:
     python generate_tourism_dataset.py
+    python generate_tourism_dataset.py --rows 5000000 --seed 42 --sector-mix hotels=2,airlines=1
+    python generate_tourism_dataset.py --resume   # finish an interrupted upload of the existing CSV
+    python generate_tourism_dataset.py --rows 100000000 --parquet-dir tourism_dataset --workers 8
+
+The upload runs in concurrent batches (see bulk_loader.py) and is
+checkpointed next to the CSV, so --resume only sends what is missing.
+With --parquet-dir nothing is uploaded: seeded shards are generated in
+parallel processes into a partitioned Parquet dataset that the insights
+engine reads directly (see partitioned_dataset.py).
 """
 
+import argparse
 import os
+import time
+from datetime import date
+from typing import Optional
+
 import pandas as pd
 import numpy as np
-from supabase import create_client
-
-# --- Configuration ---
-SECTORS = ['airlines','hotels','regional_tourism','travel_agencies','other']
-N_PER_SECTOR = 100000
-TOTAL = len(SECTORS) * N_PER_SECTOR
-
-# Demographic pools
-ages = np.random.randint(18, 80, size=TOTAL)
-sexes = np.random.choice(['Male', 'Female'], size=TOTAL)
-nationalities = np.random.choice([
-     'UK','China','India','Germany','France','Italy','Brazil','Canada',
-    'Australia','Japan','South Korea','Russia','Turkey','Egypt','Morocco','Algeria','Morocco','Algeria','Saudi Arabia','United Kingdom','United States','Canada','Australia','Ethiopia', 'Spain', 'Mexico', 'South Africa', 'Switzerland', 'Netherlands',
-    'Thailand', 'Indonesia', 'Vietnam', 'Malaysia', 'Singapore',
-    'New Zealand', 'Argentina', 'Chile', 'Colombia', 'Peru'],
-    size=TOTAL
-)
-regions = np.random.choice(
-    ['Addis Ababa','Oromia','Amhara','Tigray','Somali','SNNPR','Afar','Harari'],
-    size=TOTAL
+
+from bulk_loader import DEFAULT_BATCH_ROWS, DEFAULT_CONCURRENCY, BulkLoader
+from lazy_imports import get_supabase
+from postgres_backend import get_postgres_backend
+from partitioned_dataset import DEFAULT_SHARD_ROWS, DEFAULT_WORKERS, generate_partitioned
+from tourism_data_generator import (
+    DEFAULT_DAYS, DEFAULT_ROWS, SECTORS, Seasonality, generate_records, parse_seasonality
 )
 
 
-# 2. Define per-region destinations
-region_destinations = {
-    "Addis Ababa": [
-        "National Museum of Ethiopia",
-        "Entoto Hills",
-        "Red Terror Martyrs' Memorial Museum",
-        "Holy Trinity Cathedral",
-        "Friendship Park",
-        "Unity Park",
-        "Adwa Victory Monument",
-    
-    ],
-    "Oromia": [
-        "Bale Mountains",
-        "Awash National Park",
-        "Wonchi",
-        "Sof Omar Caves",
-        "Wenchi Crater Lake",
-        "Lake Langano",
-        "Rift Valley Lakes",
-        "Aba Jifar Palace",
-        "Jimma Museum",
-        "Melka Kunture",
-        "Babugaya"
-
-    ],
-    "Amhara": [
-        "Lalibela Churches",
-        "Blue Nile Gorge",
-        "Gondar & Fasil Ghebbi",
-        "Tiya Stelae Field",
-        "Simien Mountains National Park",
-        "Gorgora",
-        "Lake Tana",
-        "Blue Nile Falls"
-    ],
-    "Tigray": [
-        "Axum Obelisks",
-        "Gheralta Rock-Hewn Churches",
-        "Rock-Hewn Churches of Tigray",
-        "Yeha&apos;s Temple",
-        "Northern Stelae Field",
-        "Monastery of Debre Damo",
-        "Gheralta Rock"
-    ],
-    "Somali": [
-        "Sodore Hot Springs",
-        "Laas Geel",
-        "Gode",
-        "Kebri Dar"
-    ],
-    "SNNPR": [
-        "Omo Valley",
-        "Konso Cultural Landscape",
-        "Lake Abaya",
-        "Lakes Chamo and Abaya",
-        "Nechisar National Park",
-        "Arba Minch",
-        "Dorze Village",
-        "Abijatta-Shalla Lakes National Park",
-        "Koysha"
-    ],
-    "Afar": [
-        "Danakil Depression",
-        "Erta Ale volcano",
-        "Yangudi Rassa National Park"
-    ],
-  
-    "Harari": [
-        "Harar Old City"
-    ]
-}
-tourist_destinations = np.array([
-    np.random.choice(region_destinations[reg])
-    for reg in regions
-])
-
-
-# Sentiment pools
-sentiments = ['positive', 'negative', 'neutral']
-weights = [0.60, 0.25, 0.15]
-positive_comments = ["Excellent experience","Loved it","Highly recommended","Fantastic service","Will return"]
-negative_comments = ["Very disappointed","Not worth it","Terrible service","Would not recommend","Poor experience"]
-neutral_comments = ["It was okay","Average","Nothing special","Mediocre","So-so"]
-
-records = []
-idx = 0
-for sector in SECTORS:
-    for _ in range(N_PER_SECTOR):
-        age = ages[idx]
-        sex = sexes[idx]
-        nationality = nationalities[idx]
-        region = regions[idx]
-        tourist_destination = tourist_destinations[idx]
-        # Core metrics
-        spend = round(np.random.gamma(2, 1000), 2)
-        duration = round(np.random.exponential(3) + 1, 1)
-        satisfaction = int(np.random.randint(1,6))
-        infra = int(np.random.randint(1,6))
-        local_spend = round(spend * np.random.uniform(0.1, 0.5), 2)
-        
-        # Sentiment
-        sentiment = np.random.choice(sentiments, p=weights)
-        if sentiment=='positive':
-            comment = np.random.choice(positive_comments)
-        elif sentiment=='negative':
-            comment = np.random.choice(negative_comments)
-        else:
-            comment = np.random.choice(neutral_comments)
-        
-        rec = {
-            'sector': sector,
-            'age': age,
-            'sex': sex,
-            'nationality': nationality,
-            'home_region': region,
-            'tourist_destination': tourist_destination,
-            'spend_amount': spend,
-            'visit_duration_days': duration,
-            'satisfaction_score': satisfaction,
-            'infrastructure_rating': infra,
-            'local_business_spend': local_spend,
-            'review_sentiment': sentiment,
-            'review_comment': comment
-        }
-        
-        # Sector-specific
-        if sector=='airlines':
-            rec.update({
-                'flight_delay_minutes': int(np.random.poisson(15)),
-                'flight_spend': round(spend * np.random.uniform(0.5,1),2)
-            })
-        elif sector=='hotels':
-            rec.update({
-                'hotel_nights': int(duration),
-                'hotel_rating': int(np.random.randint(1,6)),
-                'hotel_spend': round(spend * np.random.uniform(0.5,1),2)
-            })
-        elif sector=='regional_tourism':
-            rec.update({
-                'activities_count': int(np.random.randint(1,10)),
-                'activity_spend': round(spend * np.random.uniform(0.4,0.9),2)
-            })
-        elif sector=='travel_agencies':
-            rec.update({
-                'package_type': np.random.choice(['budget','standard','premium']),
-                'package_spend': round(spend * np.random.uniform(0.6,1),2)
-            })
-        else:
-            rec.update({
-                'souvenir_spend': round(spend * np.random.uniform(0.2,0.6),2),
-                'other_service_rating': int(np.random.randint(1,6))
-            })
-        
-        records.append(rec)
-        idx += 1
-
-# Create DataFrame
-df = pd.DataFrame(records)
-
-# 1) Write to CSV
-csv_path = 'tourism_dataset.csv'
-df.to_csv(csv_path, index=False)
-print(f"✅ CSV written: {csv_path}")
-
-# 2) Upload to Supabase
-url = os.getenv("SUPABASE_URL")
-key = os.getenv("SUPABASE_KEY")
-if not url or not key:
-    raise RuntimeError("Set SUPABASE_URL and SUPABASE_KEY environment variables")
-
-df.replace([np.inf, -np.inf], np.nan, inplace=True)
-
-# 2) Either fill NaNs (e.g. with 0) or drop them. Here we fill:
-df.fillna(0, inplace=True)
-
-# 3) Cast numeric columns to plain Python floats/ints
-for col in df.select_dtypes(include=['float64','int64']).columns:
-    df[col] = df[col].astype(float)
-
-supabase = create_client(url, key)
-response = supabase.table("tourism_data").upsert(df.to_dict(orient="records")).execute()
-
-if response.error:
-    print("❌ Supabase upsert error:", response.error)
-else:
-    print(f"✅ Upserted {len(df)} records to 'tourism_data' table")
-
-
-   
\ No newline at end of file
+def parse_sector_mix(value: str) -> dict:
+    """'airlines=2,hotels=1' -> {'airlines': 2.0, 'hotels': 1.0}"""
+    mix = {}
+    for part in value.split(','):
+        sector, _, weight = part.partition('=')
+        mix[sector.strip()] = float(weight or 1)
+    return mix
+
+
+def generate_dataset(rows: int = DEFAULT_ROWS, seed: Optional[int] = None, sector_mix: Optional[dict] = None,
+                     start_date: Optional[date] = None, days: int = DEFAULT_DAYS,
+                     seasonality: Optional[Seasonality] = None) -> pd.DataFrame:
+    """Generate ``rows`` mock tourist records (see tourism_data_generator.py)"""
+    return generate_records(rows, np.random.default_rng(seed), sector_mix,
+                            start_date=start_date, days=days, seasonality=seasonality)
+
+
+def prepare_for_upload(df: pd.DataFrame) -> pd.DataFrame:
+    """Replace inf/NaN with 0 and send numeric columns as floats"""
+    # Categorical and datetime columns are sent as the strings the CSV holds, so a generated
+    # frame and its CSV read back with --resume fingerprint alike and share one upload checkpoint
+    df = df.astype({col: str for col in df.select_dtypes(include=['category', 'datetime']).columns})
+    df = df.replace([np.inf, -np.inf], np.nan)
+
+    # Either fill NaNs (e.g. with 0) or drop them. Here we fill:
+    df = df.fillna(0)
+
+    # Cast numeric columns to plain floats
+    for col in df.select_dtypes(include=['float64','int64']).columns:
+        df[col] = df[col].astype(float)
+    return df
+
+
+def upload_dataset(df: pd.DataFrame, csv_path: str, batch_rows: int = DEFAULT_BATCH_ROWS,
+                   concurrency: int = DEFAULT_CONCURRENCY) -> dict:
+    """Load the dataset into 'tourism_data' with COPY, or upsert it in checkpointed batches"""
+    df = prepare_for_upload(df)
+    checkpoint_path = f"{csv_path}.upload.json"
+
+    # COPY is all-or-nothing; a partially uploaded dataset is finished through PostgREST
+    backend = get_postgres_backend()
+    if backend and not os.path.exists(checkpoint_path):
+        try:
+            backend.copy_frame("tourism_data", df)
+            return {'success': True, 'total_rows': len(df), 'rows_committed': len(df), 'failed_batches': {}}
+        except Exception as e:
+            print(f"⚠️ COPY failed, uploading through PostgREST: {e}")
+
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_KEY")
+    if not url or not key:
+        raise RuntimeError("Set SUPABASE_URL and SUPABASE_KEY environment variables")
+
+    # The client library is only needed for uploads, not for --parquet-dir
+    supabase = get_supabase().create_client(url, key)
+    loader = BulkLoader(
+        supabase, "tourism_data",
+        batch_rows=batch_rows,
+        concurrency=concurrency,
+        checkpoint_path=checkpoint_path
+    )
+    progress = lambda done, total: print(f"   {done}/{total} rows committed", end="\r")
+    return loader.load(df, progress=progress)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the mock tourism dataset and upload it to Supabase')
+    parser.add_argument('--csv', default='tourism_dataset.csv', help='CSV output path')
+    parser.add_argument('--resume', action='store_true',
+                        help='Upload the existing CSV instead of generating a new dataset')
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help='Records to generate')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed (reproducible datasets)')
+    parser.add_argument('--sector-mix', type=parse_sector_mix, default=None,
+                        help=f"Relative sector weights, e.g. airlines=2,hotels=1 (sectors: {', '.join(SECTORS)})")
+    parser.add_argument('--start-date', type=date.fromisoformat, default=None,
+                        help='First arrival date (default: --days before today)')
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help='Days of arrivals to generate')
+    parser.add_argument('--seasonality', type=parse_seasonality, default=None,
+                        help="JSON file of seasonality settings, or 'uniform' (default: yearly, weekly, "
+                             "hourly, trend and holiday patterns)")
+    parser.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS, help='Rows per upload request')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Parallel upload requests')
+    parser.add_argument('--parquet-dir', default=None,
+                        help='Write a Parquet dataset partitioned by sector and month here instead of CSV + upload')
+    parser.add_argument('--shard-rows', type=int, default=DEFAULT_SHARD_ROWS, help='Rows generated per shard')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Generator processes')
+    parser.add_argument('--overwrite', action='store_true', help='Replace an existing --parquet-dir')
+    args = parser.parse_args()
+
+    if args.parquet_dir:
+        manifest = generate_partitioned(
+            args.parquet_dir, args.rows, seed=args.seed, sector_mix=args.sector_mix,
+            shard_rows=args.shard_rows, workers=args.workers, start_date=args.start_date, days=args.days,
+            seasonality=args.seasonality, overwrite=args.overwrite
+        )
+        print(f"✅ Wrote {manifest['rows']} records to {args.parquet_dir} "
+              f"({manifest['shards']} shards, {len(manifest['files'])} files)")
+        return
+
+    csv_path = args.csv
+    if args.resume and os.path.exists(csv_path):
+        df = pd.read_csv(csv_path)
+        print(f"✅ CSV loaded: {csv_path}")
+    else:
+        started = time.time()
+        df = generate_dataset(args.rows, args.seed, args.sector_mix, args.start_date, args.days, args.seasonality)
+        print(f"✅ Generated {len(df)} records in {time.time() - started:.1f}s")
+
+        # 1) Write to CSV
+        df.to_csv(csv_path, index=False)
+        print(f"✅ CSV written: {csv_path}")
+
+    # 2) Upload to Supabase
+    result = upload_dataset(df, csv_path, args.batch_rows, args.concurrency)
+    print()
+    if result['success']:
+        print(f"✅ Upserted {result['total_rows']} records to 'tourism_data' table")
+    else:
+        print(f"❌ Supabase upsert error: {len(result['failed_batches'])} batches failed "
+              f"({result['rows_committed']}/{result['total_rows']} rows committed), rerun with --resume")
+
+
+if __name__ == "__main__":
+    main()
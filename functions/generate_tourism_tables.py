@@ -0,0 +1,93 @@
+"""
+    generate_tourism_tables.py
+
+Generates synthetic data for the Supabase source tables (arrivals,
+occupancy, visits, surveys and the regions they reference) and writes it
+to a local SQLite file that stands in for the database.
+
+The tables are drawn column by column (see tourism_tables_generator.py),
+so a year of data for thousands of hotels takes seconds.
+
+Usage:
+    python generate_tourism_tables.py
+    python generate_tourism_tables.py --scale 10 --days 730 --seed 42 --sqlite tourism_tables.sqlite
+    python generate_tourism_tables.py --hotels 2000 --flights-per-day 400 --profile
+
+With --profile the file is read back the way load_tourism_data reads
+Supabase, and the resource mobility and tourism funding insights are
+timed over it.
+"""
+
+import argparse
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+from tourism_data_generator import DEFAULT_DAYS, parse_seasonality
+from tourism_tables_generator import TableVolumes, generate_tables, load_sqlite, write_sqlite
+
+PROFILED_DEPARTMENTS = ['resource_mobility', 'tourism_funding']
+
+
+def profile_insights(sqlite_path: str, days_back: int, end_date: Optional[date] = None):
+    """Time the multi-table load and the insights that read arrivals and occupancy"""
+    from tourism_insights_engine import TourismInsightsEngine
+
+    engine = TourismInsightsEngine(departments=PROFILED_DEPARTMENTS)
+    started = time.time()
+    data = load_sqlite(sqlite_path, days_back, columns=engine.required_columns(['departmental_insights']),
+                       end_date=end_date)
+    print(f"⏱  Loaded {sum(len(df) for df in data.values())} rows in {time.time() - started:.2f}s")
+
+    configs = engine.departments
+    for department in PROFILED_DEPARTMENTS:
+        engine.departments = {department: configs[department]}
+        started = time.time()
+        insights = engine.generate_departmental_insights(data, {})
+        metrics = len(insights[department].key_metrics) if department in insights else 0
+        print(f"⏱  {department}: {metrics} metrics in {time.time() - started:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the Supabase source tables into a local SQLite file')
+    parser.add_argument('--sqlite', default='tourism_tables.sqlite', help='SQLite output path')
+    parser.add_argument('--overwrite', action='store_true', help='Replace an existing --sqlite file')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed (reproducible tables)')
+    parser.add_argument('--start-date', type=date.fromisoformat, default=None,
+                        help='First day of data (default: --days before today)')
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help='Days of data to generate')
+    parser.add_argument('--hotels', type=int, default=TableVolumes.hotels, help='Hotels reporting occupancy daily')
+    parser.add_argument('--sites', type=int, default=TableVolumes.sites, help='Tourist sites recording visits')
+    parser.add_argument('--flights-per-day', type=float, default=TableVolumes.flights_per_day,
+                        help='Average arrivals per day')
+    parser.add_argument('--visits-per-site-day', type=float, default=TableVolumes.visits_per_site_day,
+                        help='Average visit records per site and day')
+    parser.add_argument('--survey-rate', type=float, default=TableVolumes.survey_rate,
+                        help='Share of visits with a survey response')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply hotels, sites and flights')
+    parser.add_argument('--seasonality', type=parse_seasonality, default=None,
+                        help="JSON file of seasonality settings, or 'uniform'")
+    parser.add_argument('--profile', action='store_true',
+                        help='Time loading the file and the resource mobility and funding insights')
+    args = parser.parse_args()
+
+    volumes = TableVolumes(days=args.days, hotels=args.hotels, sites=args.sites,
+                           flights_per_day=args.flights_per_day, visits_per_site_day=args.visits_per_site_day,
+                           survey_rate=args.survey_rate).scaled(args.scale)
+
+    started = time.time()
+    tables = generate_tables(volumes, args.seed, args.start_date, args.seasonality)
+    print(f"✅ Generated {', '.join(f'{len(df)} {name}' for name, df in tables.items())} "
+          f"in {time.time() - started:.1f}s")
+
+    started = time.time()
+    write_sqlite(tables, args.sqlite, overwrite=args.overwrite)
+    print(f"✅ SQLite written: {args.sqlite} ({time.time() - started:.1f}s)")
+
+    if args.profile:
+        end_date = args.start_date + timedelta(days=args.days - 1) if args.start_date else None
+        profile_insights(args.sqlite, args.days, end_date)
+
+
+if __name__ == "__main__":
+    main()
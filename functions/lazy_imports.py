@@ -0,0 +1,57 @@
+"""
+Lazy Imports
+============
+Accessors for the heavy optional library Prophet and the Supabase
+client stack.
+
+Importing these costs seconds, and most CLI commands (``status``,
+cleanup, quality checks) never use them. Modules call the accessors on
+the code path that needs the library instead of importing it at module
+level; the first call imports it, later calls return the cached module.
+A missing optional library yields None, so callers fall back the way the
+old ``*_AVAILABLE`` flags did.
+"""
+
+import importlib
+import logging
+from types import ModuleType
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_modules: Dict[str, Optional[ModuleType]] = {}
+
+
+def optional_import(name: str) -> Optional[ModuleType]:
+    """Module ``name``, imported on first use; None when it is not installed"""
+    # importlib serializes concurrent imports of one module, so no lock is needed here
+    if name not in _modules:
+        try:
+            _modules[name] = importlib.import_module(name)
+        except ImportError as e:
+            logger.info(f"Optional dependency {name} not available: {str(e)}")
+            _modules[name] = None
+    return _modules[name]
+
+
+def get_prophet() -> Optional[Any]:
+    """The Prophet model class, or None without the prophet package"""
+    module = optional_import('prophet')
+    return module.Prophet if module is not None else None
+
+
+def get_supabase() -> ModuleType:
+    """The supabase client package (a required dependency, imported when a client is first built)"""
+    module = optional_import('supabase')
+    if module is None:
+        raise ImportError("supabase is required to connect to Supabase (pip install supabase)")
+    return module
+
+
+def get_sync_manager_class() -> Optional[type]:
+    """Sync manager class, preferring the simplified implementation; None when neither imports"""
+    for name in ('supabase_sync_simple', 'supabase_sync'):
+        module = optional_import(name)
+        if module is not None:
+            return module.SupabaseSyncManager
+    return None
@@ -0,0 +1,116 @@
+"""
+Lazy Report Sections
+====================
+Mapping-based report container whose sections are computed on first access.
+Used by the insights engine so callers that only need one panel (e.g. the
+forecast summary) do not pay for dimensional analysis or departmental insights.
+"""
+
+import logging
+import threading
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LazyReport(Mapping):
+    """
+    Read-only mapping of report sections backed by builder callables.
+
+    Each builder runs at most once; its result is memoized. ``sections``
+    restricts which keys are visible to callers, while ``section()`` lets
+    builders reach any other section they depend on (e.g. the executive
+    summary needs forecasts and departmental insights).
+    """
+
+    def __init__(self, builders: Dict[str, Callable[[], Any]],
+                 default_sections: Optional[Iterable[str]] = None,
+                 sections: Optional[Iterable[str]] = None):
+        self._builders = dict(builders)
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+        if sections is not None:
+            visible = list(sections)
+        elif default_sections is not None:
+            visible = list(default_sections)
+        else:
+            visible = [name for name in self._builders if not name.startswith('_')]
+        # Builders prefixed with an underscore are internal dependencies only
+        unknown = [name for name in visible if name not in self._builders or name.startswith('_')]
+        if unknown:
+            raise ValueError(f"Unknown report sections: {', '.join(unknown)}")
+        self._visible = [name for name in self._builders if name in visible]
+
+    def section(self, name: str) -> Any:
+        """Return a section, computing it if needed, regardless of visibility"""
+        if name not in self._builders:
+            raise KeyError(name)
+
+        with self._lock:
+            if name not in self._values:
+                try:
+                    self._values[name] = self._builders[name]()
+                except Exception as e:
+                    logger.error(f"Error building report section '{name}': {str(e)}")
+                    self._values[name] = {'error': str(e)}
+            return self._values[name]
+
+    def is_computed(self, name: str) -> bool:
+        """Check whether a section has already been evaluated"""
+        return name in self._values
+
+    @property
+    def available_sections(self) -> List[str]:
+        """All sections this report can build"""
+        return list(self._builders)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Evaluate the visible sections into a plain (JSON-serializable) dict"""
+        return {
+            name: value.to_dict() if isinstance(value, LazyReport) else value
+            for name, value in self.items()
+        }
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._visible:
+            raise KeyError(name)
+        return self.section(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._visible)
+
+    def __len__(self) -> int:
+        return len(self._visible)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._visible
+
+    def __repr__(self) -> str:
+        computed = [name for name in self._visible if self.is_computed(name)]
+        return f"LazyReport(sections={self._visible}, computed={computed})"
+
+
+def split_section_names(sections: Optional[Iterable[str]]) -> Optional[Dict[str, Optional[List[str]]]]:
+    """
+    Split requested section names into top-level sections and nested keys.
+
+    ``['forecasts', 'dimensional_analysis.regions']`` becomes
+    ``{'forecasts': None, 'dimensional_analysis': ['regions']}``; ``None`` means
+    the whole section was requested.
+    """
+    if sections is None:
+        return None
+
+    requested: Dict[str, Optional[List[str]]] = {}
+    for name in sections:
+        name = name.strip()
+        if not name:
+            continue
+        top, _, nested = name.partition('.')
+        if not nested:
+            requested[top] = None
+        elif requested.get(top, []) is not None:
+            requested.setdefault(top, []).append(nested)
+    return requested
@@ -0,0 +1,51 @@
+"""
+Metric Kernels
+==============
+Vectorized ratio kernels shared by the analytics modules.
+
+Every grouped kernel runs a single ``groupby(...).sum()`` over plain columns,
+so no Python lambda is evaluated per group. Division is zero-guarded: groups
+or rows with a zero (or missing) denominator get ``fill`` instead of inf.
+"""
+
+from typing import List, Union
+
+import numpy as np
+import pandas as pd
+
+GroupKeys = Union[str, List[str]]
+
+
+def safe_rate(numerator: Union[pd.Series, np.ndarray], denominator: Union[pd.Series, np.ndarray],
+              fill: float = 0.0) -> Union[pd.Series, np.ndarray]:
+    """
+    Element-wise ``numerator / denominator`` with a zero guard.
+
+    Missing numerators stay missing; a zero or missing denominator yields
+    ``fill``. Series inputs return a Series aligned to the numerator's index.
+    """
+    num = np.asarray(numerator, dtype='float64')
+    den = np.asarray(denominator, dtype='float64')
+
+    valid = np.isfinite(den) & (den != 0)
+    out = np.full(np.broadcast(num, den).shape, fill, dtype='float64')
+    np.divide(num, den, out=out, where=valid)
+
+    if isinstance(numerator, pd.Series):
+        return pd.Series(out, index=numerator.index, name=numerator.name)
+    if isinstance(denominator, pd.Series):
+        return pd.Series(out, index=denominator.index)
+    return out
+
+
+def grouped_ratio_of_sums(df: pd.DataFrame, by: GroupKeys, numerator: str, denominator: str,
+                          fill: float = 0.0) -> pd.Series:
+    """
+    Per-group ``sum(numerator) / sum(denominator)`` in one groupby pass.
+
+    Equivalent to ``df.groupby(by).apply(lambda x: x[num].sum() / x[den].sum())``
+    with groups whose denominator sums to zero set to ``fill``.
+    """
+    sums = df.groupby(by, observed=True)[[numerator, denominator]].sum()
+    return safe_rate(sums[numerator], sums[denominator], fill=fill)
+
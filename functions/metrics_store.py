@@ -0,0 +1,221 @@
+"""
+Metrics Store
+=============
+Local columnar time series of every insight metric the engine emits.
+
+Each run is appended as one Parquet part file (run id, timestamp, data
+fingerprint, department, metric, value, predicted value, confidence), with
+the string columns dictionary-encoded. History, run-over-run deltas,
+sparklines and trends are answered with vectorized queries; queries over
+the last N runs read only the newest parts that cover them. Once
+``METRICS_COMPACT_PARTS`` run parts accumulate they are merged into one
+compacted part, so the file count stays bounded.
+"""
+
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Relative change over the trend window below which a metric counts as stable
+TREND_TOLERANCE = 0.02
+TREND_WINDOW = 10
+# Run parts merged into one compacted part once this many accumulate (0 disables)
+COMPACT_PARTS = int(os.getenv('METRICS_COMPACT_PARTS', 50))
+COMPACTED_SUFFIX = '-compacted.parquet'
+
+
+def _schema() -> 'pa.Schema':
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('run_id', dictionary),
+        ('run_at', pa.timestamp('us')),
+        ('fingerprint', dictionary),
+        ('department', dictionary),
+        ('metric', dictionary),
+        ('value', pa.float64()),
+        ('predicted', pa.float64()),
+        ('confidence', pa.float32())
+    ])
+
+
+class MetricsStore:
+    """Append-only Parquet store of per-run metric values"""
+
+    def __init__(self, root: str, compact_parts: int = COMPACT_PARTS):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for the metrics store")
+        self.root = root
+        self.compact_parts = compact_parts
+        os.makedirs(root, exist_ok=True)
+
+    def _part_files(self) -> List[str]:
+        return sorted(
+            os.path.join(self.root, name) for name in os.listdir(self.root)
+            if name.startswith('run-') and name.endswith('.parquet')
+        )
+
+    def append(self, records: List[Dict[str, Any]], run_id: Optional[str] = None,
+               run_at: Optional[datetime] = None, fingerprint: Optional[str] = None) -> Optional[str]:
+        """
+        Append one run's metrics.
+
+        ``records`` hold ``department``, ``metric``, ``value`` and optionally
+        ``predicted`` and ``confidence``. Returns the run id, or None when the
+        run was skipped because the previous run had the same data fingerprint.
+        """
+        if not records:
+            return None
+        if fingerprint is not None and fingerprint == self.last_fingerprint():
+            logger.info("Metrics for this data fingerprint already recorded, skipping append")
+            return None
+
+        run_id = run_id or uuid.uuid4().hex
+        run_at = run_at or datetime.now()
+        frame = pd.DataFrame.from_records(records, columns=['department', 'metric', 'value', 'predicted', 'confidence'])
+        frame.insert(0, 'run_id', run_id)
+        frame.insert(1, 'run_at', pd.Timestamp(run_at))
+        frame.insert(2, 'fingerprint', fingerprint)
+        for column in ['value', 'predicted', 'confidence']:
+            frame[column] = pd.to_numeric(frame[column], errors='coerce')
+
+        table = pa.Table.from_pandas(frame, schema=_schema(), preserve_index=False)
+        path = os.path.join(self.root, f"run-{run_at.strftime('%Y%m%dT%H%M%S%f')}-{run_id[:8]}.parquet")
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
+        logger.info(f"Recorded {len(frame)} metrics for run {run_id}")
+
+        if self.compact_parts and len(self._uncompacted_parts()) >= self.compact_parts:
+            try:
+                self.compact()
+            except Exception as e:
+                logger.warning(f"Could not compact metric parts: {str(e)}")
+        return run_id
+
+    def last_fingerprint(self) -> Optional[str]:
+        parts = self._part_files()
+        if not parts:
+            return None
+        fingerprints = pq.read_table(parts[-1], columns=['fingerprint']).column('fingerprint').to_pylist()
+        return fingerprints[-1] if fingerprints else None
+
+    def history(self, department: Optional[str] = None, metric: Optional[str] = None,
+                last_runs: Optional[int] = None) -> pd.DataFrame:
+        """Metric history ordered by run time (optionally only the most recent runs)"""
+        parts = self._part_files()
+        if not parts:
+            return pd.DataFrame(columns=[field.name for field in _schema()])
+
+        filters = []
+        if department is not None:
+            filters.append(('department', '=', department))
+        if metric is not None:
+            filters.append(('metric', '=', metric))
+
+        # Parts sort by run time, so the newest parts that hold ``last_runs`` runs are enough
+        tables = []
+        run_ids = set()
+        for path in reversed(parts):
+            table = pq.read_table(path, filters=filters or None)
+            tables.append(table)
+            if last_runs is not None:
+                run_ids.update(table.column('run_id').to_pylist())
+                if len(run_ids) >= last_runs:
+                    break
+        table = pa.concat_tables(tables[::-1])
+        history = table.to_pandas().sort_values('run_at', kind='stable').reset_index(drop=True)
+        if last_runs is not None:
+            recent_runs = history.drop_duplicates('run_id')['run_id'].iloc[-last_runs:]
+            history = history[history['run_id'].isin(recent_runs)].reset_index(drop=True)
+        return history
+
+    def trends(self, window: int = TREND_WINDOW, tolerance: float = TREND_TOLERANCE) -> pd.DataFrame:
+        """
+        Per (department, metric): latest value, run-over-run delta, least-squares
+        slope over the last ``window`` runs, trend label and sparkline values.
+        """
+        history = self.history(last_runs=window)
+        if history.empty:
+            return pd.DataFrame(columns=['department', 'metric', 'runs', 'value', 'previous', 'delta',
+                                         'pct_change', 'slope', 'trend', 'sparkline'])
+
+        history['department'] = history['department'].astype(str)
+        history['metric'] = history['metric'].astype(str)
+        keys = ['department', 'metric']
+        grouped = history.groupby(keys, sort=False)
+
+        # Position of each run within its series, for the least-squares slope
+        history['x'] = grouped.cumcount().astype('float64')
+        history['xy'] = history['x'] * history['value']
+        history['xx'] = history['x'] * history['x']
+        sums = history.groupby(keys, sort=False)[['x', 'value', 'xy', 'xx']].sum()
+        counts = grouped.size()
+        denominator = counts * sums['xx'] - sums['x'] ** 2
+        slope = (counts * sums['xy'] - sums['x'] * sums['value']).div(denominator.where(denominator != 0))
+
+        history['previous'] = grouped['value'].shift()
+        latest = history.groupby(keys, sort=False)[['value', 'previous']].last()
+
+        result = pd.DataFrame({'runs': counts, 'value': latest['value'], 'previous': latest['previous'],
+                               'slope': slope.fillna(0.0)})
+        result['delta'] = result['value'] - result['previous']
+        result['pct_change'] = result['delta'] / result['previous'].abs().where(result['previous'] != 0)
+
+        # Total change implied by the slope across the window, relative to the latest level
+        scale = result['value'].abs().where(result['value'] != 0, 1.0)
+        relative = result['slope'] * (result['runs'] - 1) / scale
+        result['trend'] = np.select([relative > tolerance, relative < -tolerance],
+                                    ['increasing', 'decreasing'], 'stable')
+        result.loc[result['runs'] < 2, 'trend'] = 'stable'
+        result['sparkline'] = grouped['value'].agg(list)
+        return result.reset_index()
+
+    def _uncompacted_parts(self) -> List[str]:
+        return [path for path in self._part_files() if not path.endswith(COMPACTED_SUFFIX)]
+
+    def compact(self) -> int:
+        """
+        Merge the run parts written since the last compaction into one part
+        (returns the number of parts merged). Earlier compacted parts are left
+        as they are, so compaction never rewrites the whole history.
+        """
+        parts = self._uncompacted_parts()
+        if len(parts) < 2:
+            return 0
+        table = pa.concat_tables([pq.read_table(path) for path in parts])
+        target = parts[-1].replace('.parquet', COMPACTED_SUFFIX)
+        tmp_path = f"{target}.tmp"
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, target)
+        for path in parts:
+            os.remove(path)
+        logger.info(f"Compacted {len(parts)} metric parts into {target}")
+        return len(parts)
+
+
+def open_metrics_store(root: Optional[str]) -> Optional[MetricsStore]:
+    """Open the store at ``root``; None when unset or pyarrow is unavailable"""
+    if not root:
+        return None
+    if not PYARROW_AVAILABLE:
+        logger.warning("pyarrow not available, metric history disabled")
+        return None
+    try:
+        return MetricsStore(root)
+    except Exception as e:
+        logger.warning(f"Could not open metrics store at {root}: {str(e)}")
+        return None
@@ -0,0 +1,209 @@
+"""
+Partitioned Dataset
+===================
+Sharded generation of synthetic tourism data into a partitioned Parquet
+dataset, and the reader the insights engine uses for it.
+
+The requested rows are split into independent shards, each generated from
+its own seed (spawned from one ``SeedSequence``) in a pool of worker
+processes. A shard writes its rows as compressed Parquet files under
+``sector=<sector>/month=<YYYY-MM>/`` and returns only the file list, so
+no process ever holds more than one shard and the full dataset is never
+materialized. ``manifest.json`` records the generation parameters, the
+schema and every file with its row count.
+
+``read_partitioned`` projects the columns and prunes month partitions
+outside the requested date range before any file is opened. Files are read
+by a pool of threads; when dimension sketches are requested each file is
+summarized by the thread that read it and the partial sketches are merged.
+"""
+
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from sketches import DimensionSketches
+from tourism_data_generator import DEFAULT_DAYS, DEFAULT_ROWS, Seasonality, default_start_date, generate_records
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+MANIFEST_FILE = 'manifest.json'
+PARTITION_COLUMNS = ['sector', 'month']
+DATE_COLUMN = 'arrival_date'
+DEFAULT_SHARD_ROWS = int(os.getenv('DATASET_SHARD_ROWS', 1_000_000))
+DEFAULT_WORKERS = int(os.getenv('DATASET_WORKERS', os.cpu_count() or 1))
+DEFAULT_READ_WORKERS = int(os.getenv('DATASET_READ_WORKERS', min(8, os.cpu_count() or 1)))
+DEFAULT_COMPRESSION = 'zstd'
+
+
+def shard_sizes(rows: int, shard_rows: int = DEFAULT_SHARD_ROWS) -> List[int]:
+    """Rows per shard: ``rows`` split into shards of at most ``shard_rows``"""
+    shards = max(1, -(-rows // max(1, shard_rows)))
+    base, extra = divmod(rows, shards)
+    return [base + (1 if index < extra else 0) for index in range(shards)]
+
+
+def _write_shard(output_dir: str, shard: int, rows: int, seed_sequence: np.random.SeedSequence,
+                 sector_mix: Optional[Dict[str, float]], start_date: date, days: int,
+                 seasonality: Seasonality, compression: str) -> List[Dict[str, Any]]:
+    """Generate one shard and write one file per (sector, month) partition it touches"""
+    df = generate_records(rows, np.random.default_rng(seed_sequence), sector_mix,
+                          start_date=start_date, days=days, seasonality=seasonality)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Categoricals are stored as plain strings (Parquet dictionary-encodes them anyway),
+    # so readers get ordinary columns; dates are stored as dates, not timestamps
+    table = table.cast(pa.schema([
+        field.with_type(pa.string()) if pa.types.is_dictionary(field.type)
+        else field.with_type(pa.date32()) if field.name == DATE_COLUMN
+        else field
+        for field in table.schema
+    ]))
+    stored_columns = [name for name in table.column_names if name not in PARTITION_COLUMNS]
+
+    files = []
+    months = pd.Series(df[DATE_COLUMN].to_numpy().astype('datetime64[M]'), name='month')
+    for (sector, month_start), positions in df.groupby([df['sector'], months], observed=True, sort=True).indices.items():
+        month = pd.Timestamp(month_start).strftime('%Y-%m')
+        relative = os.path.join(f"sector={sector}", f"month={month}", f"part-{shard:05d}.parquet")
+        path = os.path.join(output_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        part = table.take(pa.array(positions)).select(stored_columns)
+        pq.write_table(part, path, compression=compression)
+        files.append({'path': relative, 'rows': len(positions), 'sector': sector, 'month': month, 'shard': shard})
+    return files
+
+
+def generate_partitioned(output_dir: str, rows: int = DEFAULT_ROWS, seed: Optional[int] = None,
+                         sector_mix: Optional[Dict[str, float]] = None, shard_rows: int = DEFAULT_SHARD_ROWS,
+                         workers: int = DEFAULT_WORKERS, start_date: Optional[date] = None,
+                         days: int = DEFAULT_DAYS, seasonality: Optional[Seasonality] = None,
+                         compression: str = DEFAULT_COMPRESSION, overwrite: bool = False) -> Dict[str, Any]:
+    """
+    Generate ``rows`` records into a Parquet dataset partitioned by sector
+    and arrival month, in shards of ``shard_rows`` across ``workers``
+    processes. Returns the manifest (also written to ``manifest.json``).
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow is required for partitioned datasets")
+    if os.path.exists(output_dir) and os.listdir(output_dir):
+        if not overwrite:
+            raise FileExistsError(f"{output_dir} is not empty (pass overwrite=True to replace it)")
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    start_time = time.time()
+    seed_sequence = np.random.SeedSequence(seed)
+    start_date = start_date or default_start_date(days)
+    seasonality = seasonality or Seasonality()
+    sizes = shard_sizes(rows, shard_rows)
+    files: List[Dict[str, Any]] = []
+
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(sizes)))) as executor:
+        futures = {
+            executor.submit(_write_shard, output_dir, shard, size, child, sector_mix, start_date, days,
+                            seasonality, compression): shard
+            for shard, (size, child) in enumerate(zip(sizes, seed_sequence.spawn(len(sizes))))
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            files.extend(future.result())
+            logger.info(f"Shard {futures[future]} written ({done}/{len(sizes)})")
+
+    files.sort(key=lambda entry: entry['path'])
+    manifest = {
+        'format': 'parquet',
+        'partitioning': PARTITION_COLUMNS,
+        'date_column': DATE_COLUMN,
+        'rows': sum(entry['rows'] for entry in files),
+        'shards': len(sizes),
+        'seed': seed_sequence.entropy,
+        'sector_mix': sector_mix,
+        'start_date': start_date.isoformat(),
+        'days': days,
+        'seasonality': asdict(seasonality),
+        'compression': compression,
+        'schema': [{'name': field.name, 'type': str(field.type)}
+                   for field in pq.read_schema(os.path.join(output_dir, files[0]['path']))] if files else [],
+        'files': files,
+        'created_at': datetime.now().isoformat()
+    }
+    tmp_path = os.path.join(output_dir, f"{MANIFEST_FILE}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(output_dir, MANIFEST_FILE))
+
+    logger.info(f"Generated {manifest['rows']} records in {len(sizes)} shards, {len(files)} files, "
+                f"in {time.time() - start_time:.1f}s")
+    return manifest
+
+
+def is_partitioned_dataset(path: str) -> bool:
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_FILE))
+
+
+def read_partitioned(path: str, columns: Optional[Set[str]] = None,
+                     since: Optional[date] = None, sketches: Optional[DimensionSketches] = None,
+                     workers: int = DEFAULT_READ_WORKERS) -> pd.DataFrame:
+    """
+    Rows of a partitioned dataset, projected onto ``columns`` (None: all)
+    and limited to arrivals on or after ``since`` (a date or datetime).
+    Month partitions before ``since`` are skipped without being read.
+
+    ``sketches`` is filled with the sketch dimensions of exactly the rows
+    returned, whether or not they are in ``columns``.
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow is required for partitioned datasets")
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+
+    partitioning = ds.partitioning(pa.schema([(name, pa.string()) for name in manifest['partitioning']]),
+                                   flavor='hive')
+    dataset = ds.dataset([os.path.join(path, entry['path']) for entry in manifest['files']],
+                         format='parquet', partitioning=partitioning, partition_base_dir=path)
+
+    selected = None if columns is None else [name for name in dataset.schema.names if name in columns]
+    row_filter = None
+    date_column = manifest.get('date_column')
+    if since is not None and date_column:
+        row_filter = (ds.field('month') >= since.strftime('%Y-%m')) & (ds.field(date_column) >= since)
+
+    read_columns = selected
+    if sketches is not None and selected is not None:
+        read_columns = selected + [name for name in sketches.dimensions
+                                   if name in dataset.schema.names and name not in selected]
+
+    def read_fragment(fragment) -> tuple:
+        table = fragment.to_table(schema=dataset.schema, columns=read_columns, filter=row_filter)
+        partial = None
+        if sketches is not None:
+            dimensions = [name for name in sketches.dimensions if name in table.column_names]
+            partial = sketches.spawn().update(table.select(dimensions).to_pandas())
+        return (table.select(selected) if selected is not None else table), partial
+
+    fragments = list(dataset.get_fragments(filter=row_filter))
+    if not fragments:
+        return dataset.to_table(columns=selected, filter=row_filter).to_pandas(date_as_object=False)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(fragments)))) as executor:
+        results = list(executor.map(read_fragment, fragments))
+
+    if sketches is not None:
+        for _, partial in results:
+            sketches.merge(partial)
+    return pa.concat_tables([table for table, _ in results]).to_pandas(date_as_object=False)
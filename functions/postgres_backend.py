@@ -0,0 +1,401 @@
+"""
+Postgres Backend
+================
+Optional direct PostgreSQL access for high-volume writes and reads.
+
+When ``SUPABASE_DB_URL`` (the project's Postgres connection string) is set
+and psycopg2 is installed, bulk loads bypass PostgREST and stream rows with
+``COPY ... FROM STDIN``. Frames are encoded in the COPY text format slice by
+slice while Postgres consumes them, so memory stays bounded by
+``COPY_SLICE_ROWS``. Loads that need conflict handling (upserts on a natural
+key, content-addressed blobs) are copied into a temporary staging table and
+merged with one ``INSERT ... SELECT ... ON CONFLICT``.
+
+Reads stream from a server-side cursor into typed Arrow record batches of
+``FETCH_ROWS`` rows, with the column projection and the date range pushed
+into the SQL, so neither the server nor the client materializes the result
+as JSON or as lists of dicts. Daily series (``daily_aggregate``) are
+grouped in the database, so only one row per day and group is transferred.
+Connections come from a thread-safe pool
+shared per connection string, and connection failures open the ``postgres``
+circuit breaker.
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from bulk_writer import json_default
+from circuit_breaker import CircuitBreaker, CircuitOpenError, get_breaker
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psycopg2
+    import psycopg2.extensions
+    import psycopg2.pool
+    from psycopg2 import sql
+    PSYCOPG2_AVAILABLE = True
+except ImportError:
+    PSYCOPG2_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+DB_URL_ENV = 'SUPABASE_DB_URL'
+BREAKER_NAME = 'postgres'
+DEFAULT_POOL_SIZE = int(os.getenv('POSTGRES_POOL_SIZE', 4))
+CONNECT_TIMEOUT_SECONDS = int(os.getenv('POSTGRES_CONNECT_TIMEOUT', 10))
+COPY_SLICE_ROWS = 50_000
+COPY_READ_BYTES = 1 << 20
+FETCH_ROWS = int(os.getenv('POSTGRES_FETCH_ROWS', 50_000))
+
+# Type OIDs read as plain values: numeric as float, json/jsonb as their text
+_NUMERIC_OIDS = (1700,)
+_JSON_OIDS = (114, 3802)
+
+# Characters with a meaning in the COPY text format, and their escapes
+_TEXT_ESCAPES = [('\\', '\\\\'), ('\t', '\\t'), ('\n', '\\n'), ('\r', '\\r')]
+_NULL = '\\N'
+
+
+def _encode_column(values: pd.Series) -> pd.Series:
+    """One column as COPY text fields (NULL as \\N, nested values as JSON)"""
+    missing = values.isna()
+    if pd.api.types.is_bool_dtype(values.dtype):
+        encoded = values.map({True: 't', False: 'f'})
+    elif pd.api.types.is_integer_dtype(values.dtype):
+        encoded = values.astype('string')
+    elif pd.api.types.is_float_dtype(values.dtype):
+        finite = values.where(np.isfinite(values.astype('float64')))
+        missing = finite.isna()
+        # Integral floats (e.g. ints widened by missing values) are written without a fraction;
+        # from 2**53 on floats are not exact integers and may overflow int64, so they keep repr()
+        integral = ~missing & (finite == finite.round()) & (finite.abs() < 2 ** 53)
+        encoded = finite.astype(str).astype(object)
+        encoded[integral] = finite[integral].astype('int64').astype(str)
+    elif pd.api.types.is_datetime64_any_dtype(values.dtype):
+        encoded = values.map(lambda value: value.isoformat())
+    else:
+        def to_text(value: Any) -> str:
+            if isinstance(value, (dict, list, tuple)):
+                return json.dumps(value, default=json_default)
+            if isinstance(value, (bool, np.bool_)):
+                return 't' if value else 'f'
+            if hasattr(value, 'isoformat'):
+                return value.isoformat()
+            return str(value)
+        encoded = values.map(to_text, na_action='ignore').astype('string')
+        for char, escape in _TEXT_ESCAPES:
+            encoded = encoded.str.replace(char, escape, regex=False)
+    return encoded.astype(object).where(~missing, _NULL)
+
+
+def encode_copy_text(frame: pd.DataFrame) -> str:
+    """Rows of a frame in the COPY text format"""
+    if frame.empty:
+        return ''
+    columns = [_encode_column(frame[column]) for column in frame.columns]
+    lines = columns[0].astype(str)
+    for column in columns[1:]:
+        lines = lines + '\t' + column.astype(str)
+    return '\n'.join(lines) + '\n'
+
+
+def _arrow_array(values: Sequence[Any], arrow_type: 'pa.DataType') -> 'pa.Array':
+    """Arrow array of one fetched column; types without a mapping are read as text"""
+    try:
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        if not pa.types.is_string(arrow_type):
+            raise
+        return pa.array([None if value is None else str(value) for value in values], type=arrow_type)
+
+
+class _CopyStream:
+    """File-like reader over lazily encoded COPY text, for ``copy_expert``"""
+
+    def __init__(self, frame: pd.DataFrame, slice_rows: int = COPY_SLICE_ROWS):
+        self._slices = (encode_copy_text(frame.iloc[start:start + slice_rows])
+                        for start in range(0, len(frame), slice_rows))
+        self._buffer = b''
+        self._position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if self._position >= len(self._buffer):
+            text = next(self._slices, None)
+            if text is None:
+                return b''
+            self._buffer, self._position = text.encode(), 0
+        end = len(self._buffer) if size is None or size < 0 else self._position + size
+        data = self._buffer[self._position:end]
+        self._position += len(data)
+        return data
+
+
+class PostgresBackend:
+    """Pooled direct connection to the Supabase Postgres database"""
+
+    def __init__(self, dsn: str, max_connections: int = DEFAULT_POOL_SIZE,
+                 breaker: Optional[CircuitBreaker] = None):
+        if not PSYCOPG2_AVAILABLE:
+            raise ImportError("psycopg2 is required for the direct Postgres backend")
+        self.dsn = dsn
+        self.max_connections = max(1, max_connections)
+        self.breaker = breaker or get_breaker(BREAKER_NAME)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = psycopg2.pool.ThreadedConnectionPool(
+                    0, self.max_connections, self.dsn, connect_timeout=CONNECT_TIMEOUT_SECONDS,
+                    application_name='tourism_analytics'
+                )
+            return self._pool
+
+    @contextmanager
+    def connection(self):
+        """Pooled connection, committed on success and rolled back on error"""
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.breaker.name, self.breaker.retry_in())
+        try:
+            conn = self._get_pool().getconn()
+        except Exception as e:
+            self.breaker.record_failure(e)
+            raise
+        self.breaker.record_success()
+        broken = False
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            # Includes GeneratorExit from a stream that was not read to the end
+            broken = bool(conn.closed)
+            if not broken:
+                conn.rollback()
+            raise
+        finally:
+            self._get_pool().putconn(conn, close=broken)
+
+    def copy_frame(self, table: str, frame: pd.DataFrame, conflict_columns: Optional[Sequence[str]] = None,
+                   update: bool = True, returning: Optional[str] = None, conn=None) -> List[Any]:
+        """
+        Load a frame into ``table`` with COPY.
+
+        Without ``conflict_columns`` rows are copied straight into the table.
+        With them, rows are staged and merged: conflicting rows are updated
+        (only when their ``content_hash`` differs, if the table has one) or,
+        with ``update=False``, left as they are. ``returning`` names a column
+        whose values for the inserted/updated rows are returned.
+        """
+        if frame.empty:
+            return []
+        if conn is None:
+            with self.connection() as conn:
+                return self.copy_frame(table, frame, conflict_columns, update, returning, conn)
+
+        columns = [str(column) for column in frame.columns]
+        column_list = sql.SQL(', ').join(map(sql.Identifier, columns))
+        with conn.cursor() as cursor:
+            if not conflict_columns and not returning:
+                cursor.copy_expert(
+                    sql.SQL("COPY {} ({}) FROM STDIN").format(sql.Identifier(table), column_list).as_string(conn),
+                    _CopyStream(frame), size=COPY_READ_BYTES
+                )
+                return []
+
+            stage = f"_stage_{table}"
+            cursor.execute(sql.SQL("CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA").format(
+                sql.Identifier(stage), column_list, sql.Identifier(table)))
+            cursor.copy_expert(
+                sql.SQL("COPY {} ({}) FROM STDIN").format(sql.Identifier(stage), column_list).as_string(conn),
+                _CopyStream(frame), size=COPY_READ_BYTES
+            )
+            cursor.execute(self._merge_statement(table, stage, columns, conflict_columns, update, returning))
+            returned = [row[0] for row in cursor.fetchall()] if returning else []
+            cursor.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(stage)))
+            return returned
+
+    def copy_records(self, table: str, rows: List[Dict[str, Any]], **kwargs) -> List[Any]:
+        """``copy_frame`` for a list of row dicts"""
+        return self.copy_frame(table, pd.DataFrame.from_records(rows), **kwargs)
+
+    @staticmethod
+    def _merge_statement(table: str, stage: str, columns: List[str], conflict_columns: Optional[Sequence[str]],
+                         update: bool, returning: Optional[str]):
+        column_list = sql.SQL(', ').join(map(sql.Identifier, columns))
+        statement = sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {}").format(
+            sql.Identifier(table), column_list, column_list, sql.Identifier(stage))
+        if conflict_columns:
+            target = sql.SQL(', ').join(map(sql.Identifier, conflict_columns))
+            updated = [column for column in columns if column not in conflict_columns and column != 'id']
+            if update and updated:
+                action = sql.SQL("DO UPDATE SET {}").format(sql.SQL(', ').join(
+                    sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(column)) for column in updated))
+                if 'content_hash' in columns:
+                    action += sql.SQL(" WHERE {}.content_hash IS DISTINCT FROM EXCLUDED.content_hash").format(
+                        sql.Identifier(table))
+            else:
+                action = sql.SQL("DO NOTHING")
+            statement += sql.SQL(" ON CONFLICT ({}) ").format(target) + action
+        if returning:
+            statement += sql.SQL(" RETURNING {}").format(sql.Identifier(returning))
+        return statement
+
+    def stream_batches(self, table: str, columns: Optional[Iterable[str]] = None,
+                       date_column: Optional[str] = None, start: Optional[Any] = None, end: Optional[Any] = None,
+                       batch_rows: int = FETCH_ROWS) -> Iterator['pa.RecordBatch']:
+        """
+        Rows of ``table`` as Arrow record batches of at most ``batch_rows`` rows.
+
+        ``columns`` projects the read (names the table does not have are
+        ignored); ``start``/``end`` bound ``date_column`` (inclusive) when the
+        table has that column. Rows are fetched from a server-side cursor, so
+        only one batch is held in memory at a time.
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for streamed reads")
+        with self.connection() as conn:
+            available = self.table_columns(table, conn)
+            selected = [column for column in available if columns is None or column in set(columns)]
+            if not selected:
+                return
+
+            query = sql.SQL("SELECT {} FROM {}").format(
+                sql.SQL(', ').join(map(sql.Identifier, selected)), sql.Identifier(table))
+            conditions, params = [], []
+            if date_column and date_column in available:
+                if start is not None:
+                    conditions.append(sql.SQL("{} >= %s").format(sql.Identifier(date_column)))
+                    params.append(start)
+                if end is not None:
+                    conditions.append(sql.SQL("{} <= %s").format(sql.Identifier(date_column)))
+                    params.append(end)
+            elif date_column and (start is not None or end is not None):
+                logger.warning(f"{table} has no {date_column} column, reading without a date filter")
+            if conditions:
+                query += sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions)
+
+            with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cursor:
+                cursor.itersize = batch_rows
+                psycopg2.extensions.register_type(psycopg2.extensions.new_type(
+                    _NUMERIC_OIDS, 'NUMERIC_FLOAT', lambda value, cur: None if value is None else float(value)
+                ), cursor)
+                psycopg2.extensions.register_type(psycopg2.extensions.new_type(
+                    _JSON_OIDS, 'JSON_TEXT', lambda value, cur: value
+                ), cursor)
+                cursor.execute(query, params)
+
+                schema = None
+                while True:
+                    rows = cursor.fetchmany(batch_rows)
+                    if not rows:
+                        break
+                    if schema is None:
+                        schema = pa.schema([(column.name, self._arrow_type(column.type_code))
+                                            for column in cursor.description])
+                    yield pa.RecordBatch.from_arrays(
+                        [_arrow_array(values, field.type) for values, field in zip(zip(*rows), schema)],
+                        schema=schema
+                    )
+
+    def read_frame(self, table: str, **kwargs) -> pd.DataFrame:
+        """``stream_batches`` collected into one DataFrame (batch by batch, without row dicts)"""
+        batches = list(self.stream_batches(table, **kwargs))
+        if not batches:
+            return pd.DataFrame()
+        return pa.Table.from_batches(batches).to_pandas(date_as_object=False)
+
+    def daily_aggregate(self, table: str, date_column: str, value_column: Optional[str] = None,
+                        per_column: Optional[str] = None, group_column: Optional[str] = None,
+                        start: Optional[Any] = None, end: Optional[Any] = None) -> List[Tuple]:
+        """
+        (day, group_key, records, total, mean) per day of ``date_column``
+        (and per ``group_column`` value), grouped in the database.
+
+        The value is ``value_column``, or ``value_column / per_column`` per
+        row; ``start``/``end`` are inclusive days.
+        """
+        value = sql.SQL("NULL::float8")
+        if value_column:
+            value = sql.SQL("{}::float8").format(sql.Identifier(value_column))
+            if per_column:
+                value = sql.SQL("{} / NULLIF({}, 0)").format(value, sql.Identifier(per_column))
+        group = sql.SQL("{}::text").format(sql.Identifier(group_column)) if group_column else sql.SQL("NULL::text")
+        day = sql.Identifier(date_column)
+
+        query = sql.SQL("SELECT {}::date, {}, COUNT(*), SUM({}), AVG({}) FROM {}").format(
+            day, group, value, value, sql.Identifier(table))
+        conditions, params = [], []
+        if start is not None:
+            conditions.append(sql.SQL("{} >= %s").format(day))
+            params.append(start)
+        if end is not None:
+            conditions.append(sql.SQL("{} < %s::date + 1").format(day))
+            params.append(end)
+        if conditions:
+            query += sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions)
+        query += sql.SQL(" GROUP BY 1, 2 ORDER BY 2, 1")
+
+        with self.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+
+    def table_columns(self, table: str, conn=None) -> List[str]:
+        """Column names of ``table`` in table order"""
+        if conn is None:
+            with self.connection() as conn:
+                return self.table_columns(table, conn)
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL("SELECT * FROM {} LIMIT 0").format(sql.Identifier(table)))
+            return [column.name for column in cursor.description]
+
+    @staticmethod
+    def _arrow_type(oid: int) -> 'pa.DataType':
+        return {
+            16: pa.bool_(), 20: pa.int64(), 21: pa.int16(), 23: pa.int32(),
+            700: pa.float32(), 701: pa.float64(), 1700: pa.float64(),
+            1082: pa.date32(), 1114: pa.timestamp('us'), 1184: pa.timestamp('us', tz='UTC')
+        }.get(oid, pa.string())
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+
+
+_backends: Dict[str, PostgresBackend] = {}
+_registry_lock = threading.Lock()
+
+
+def get_postgres_backend(dsn: Optional[str] = None) -> Optional[PostgresBackend]:
+    """
+    Shared backend for ``dsn`` (default: SUPABASE_DB_URL), or None when no
+    connection string is configured or psycopg2 is not installed.
+    """
+    dsn = dsn or os.getenv(DB_URL_ENV)
+    if not dsn:
+        return None
+    if not PSYCOPG2_AVAILABLE:
+        logger.warning(f"{DB_URL_ENV} is set but psycopg2 is not installed, using PostgREST")
+        return None
+    with _registry_lock:
+        backend = _backends.get(dsn)
+        if backend is None:
+            backend = PostgresBackend(dsn)
+            _backends[dsn] = backend
+        return backend
@@ -0,0 +1,112 @@
+"""
+Record Hashes
+=============
+Content hashes of logical analytics records, used to skip unchanged writes.
+
+A forecast is identified by (forecast_type, region_id, period) and a
+department insight by (department_name, insight_date); those keys carry
+unique constraints (sql/migrations/006_record_upserts.sql), so rows are
+upserted on them. ``RecordHashIndex`` keeps the content hash last written
+for each key in a small JSON file, so a rerun that produces the same record
+does not send it at all, and a changed record replaces the stored one
+instead of adding a duplicate.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from bulk_writer import IGNORE_DUPLICATES, UPSERT_KEYS, json_default
+
+logger = logging.getLogger(__name__)
+
+# Natural key columns of the tables whose records are replaced when they change
+RECORD_KEYS = {table: columns for table, columns in UPSERT_KEYS.items() if table not in IGNORE_DUPLICATES}
+
+# Columns that do not describe the record's content
+HASH_EXCLUDED_COLUMNS = {'id', 'content_hash', 'generated_at', 'created_at', 'expires_at'}
+
+INDEX_FILE = 'record_hashes.json'
+# Keys contain the record date, so old entries can never match again
+INDEX_RETENTION_DAYS = int(os.getenv('RECORD_INDEX_RETENTION_DAYS', 30))
+
+
+def record_key(table: str, row: Dict[str, Any]) -> str:
+    return '|'.join('' if row.get(column) is None else str(row.get(column)) for column in RECORD_KEYS[table])
+
+
+def record_hash(row: Dict[str, Any]) -> str:
+    content = {key: value for key, value in row.items() if key not in HASH_EXCLUDED_COLUMNS}
+    canonical = json.dumps(content, sort_keys=True, separators=(',', ':'), default=json_default)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+class RecordHashIndex:
+    """Last-written content hash per (table, record key), optionally persisted to a file"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Dict[str, str]]] = self._load()
+
+    def changed(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Rows whose content differs from what was last written for their key,
+        each stamped with its ``content_hash``. Rows of other tables pass through.
+        """
+        if table not in RECORD_KEYS:
+            return rows
+        by_key: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            row['content_hash'] = record_hash(row)
+            # One row per key: an upsert cannot touch the same row twice
+            by_key[record_key(table, row)] = row
+        with self._lock:
+            written = self._entries.get(table, {})
+            changed = [row for key, row in by_key.items()
+                       if written.get(key, {}).get('hash') != row['content_hash']]
+        skipped = len(rows) - len(changed)
+        if skipped:
+            logger.info(f"Skipping {skipped} unchanged {table} records")
+        return changed
+
+    def mark_written(self, table: str, rows: List[Dict[str, Any]]):
+        """Record the hashes of rows that were written"""
+        if table not in RECORD_KEYS or not rows:
+            return
+        now = datetime.now().isoformat()
+        with self._lock:
+            written = self._entries.setdefault(table, {})
+            for row in rows:
+                content_hash = row.get('content_hash') or record_hash(row)
+                written[record_key(table, row)] = {'hash': content_hash, 'written_at': now}
+            self._save()
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, str]]]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load record hash index from {self.path}: {str(e)}")
+            return {}
+
+    def _save(self):
+        cutoff = (datetime.now() - timedelta(days=INDEX_RETENTION_DAYS)).isoformat()
+        for table, written in self._entries.items():
+            self._entries[table] = {key: entry for key, entry in written.items() if entry['written_at'] >= cutoff}
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not save record hash index to {self.path}: {str(e)}")
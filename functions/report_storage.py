@@ -0,0 +1,226 @@
+"""
+Report Storage
+==============
+Deduplicated, compact storage of analytics report sections.
+
+Report sections are stored as a Merkle tree of content-addressed blobs in
+the ``report_blobs`` table (sql/migrations/005_report_storage.sql): every
+nested object or list whose canonical JSON reaches ``MIN_BLOB_BYTES`` is
+replaced by ``{"$ref": <hash>}`` and stored once. Static content
+(recommendations, action items, initiatives) therefore hashes to the same
+blob run after run, and a report only uploads the blobs the previous report
+did not already reference. Long numeric arrays are quantized and
+delta-encoded (``$nd``) and consecutive daily date lists collapse to a start
+date and a count (``$dates``) before hashing.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import zlib
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STORAGE_FORMAT = 'cas-v1'
+REPORT_SECTIONS = ['executive_summary', 'departmental_insights', 'forecasts', 'cross_departmental_initiatives']
+SECTION_DEFAULTS = {'cross_departmental_initiatives': []}
+
+MIN_BLOB_BYTES = 512
+MIN_ARRAY_LENGTH = 8
+# Quantization step relative to the largest magnitude in an array (about 7 significant digits)
+QUANTIZATION_BITS = 24
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def content_hash(value: Any) -> str:
+    return hashlib.blake2b(_canonical(value).encode(), digest_size=16).hexdigest()
+
+
+def _to_plain(value: Any) -> Any:
+    """NumPy scalars/arrays and dates as plain JSON values"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (date,)):
+        return value.isoformat()
+    return value
+
+
+def encode_array(values: List[float]) -> Dict[str, Any]:
+    """Quantize a numeric list to integer steps, delta-encode and deflate it"""
+    array = np.asarray(values, dtype='float64')
+    magnitude = float(np.max(np.abs(array))) if len(array) else 0.0
+    integral = bool(np.all(array == np.round(array)))
+    if integral:
+        step = 1.0
+    else:
+        step = 2.0 ** (np.floor(np.log2(magnitude)) - QUANTIZATION_BITS) if magnitude > 0 else 1.0
+    deltas = np.diff(np.round(array / step).astype('int64'), prepend=0)
+    # Narrowest integer type holding every delta
+    dtype = next(candidate for candidate in ('<i1', '<i2', '<i4', '<i8')
+                 if len(deltas) == 0 or np.abs(deltas).max() <= np.iinfo(candidate).max)
+    payload = base64.b64encode(zlib.compress(deltas.astype(dtype).tobytes(), 9)).decode('ascii')
+    return {'$nd': payload, 'dtype': dtype, 'step': step, 'n': len(array), 'int': integral}
+
+
+def decode_array(encoded: Dict[str, Any]) -> List[Any]:
+    raw = zlib.decompress(base64.b64decode(encoded['$nd']))
+    steps = np.cumsum(np.frombuffer(raw, dtype=encoded.get('dtype', '<i8')).astype('int64'))
+    if encoded.get('int'):
+        return steps.tolist()
+    return (steps * encoded['step']).tolist()
+
+
+def _daily_dates(values: List[Any]) -> Optional[Dict[str, Any]]:
+    """``$dates`` encoding for a list of consecutive ISO dates, else None"""
+    if not all(isinstance(value, str) and len(value) == 10 for value in values):
+        return None
+    try:
+        start = date.fromisoformat(values[0])
+        if any(date.fromisoformat(value) != start + timedelta(days=i) for i, value in enumerate(values)):
+            return None
+    except ValueError:
+        return None
+    return {'$dates': values[0], 'n': len(values)}
+
+
+def _is_numeric_list(values: List[Any]) -> bool:
+    return all(isinstance(value, (int, float)) and not isinstance(value, bool) and np.isfinite(value)
+               for value in values)
+
+
+class ReportEncoder:
+    """Builds the blob tree of one report, collecting the blobs it references"""
+
+    def __init__(self, min_blob_bytes: int = MIN_BLOB_BYTES):
+        self.min_blob_bytes = min_blob_bytes
+        self.blobs: Dict[str, Any] = {}
+
+    def encode(self, value: Any) -> Any:
+        value = _to_plain(value)
+        if isinstance(value, dict):
+            encoded = {str(key): self.encode(item) for key, item in value.items()}
+        elif isinstance(value, (list, tuple)):
+            items = [_to_plain(item) for item in value]
+            if len(items) >= MIN_ARRAY_LENGTH and _is_numeric_list(items):
+                encoded = encode_array(items)
+            else:
+                encoded = (_daily_dates(items) if len(items) >= MIN_ARRAY_LENGTH else None) \
+                          or [self.encode(item) for item in items]
+        else:
+            return value
+
+        if len(_canonical(encoded)) < self.min_blob_bytes:
+            return encoded
+        blob_hash = content_hash(encoded)
+        self.blobs[blob_hash] = encoded
+        return {'$ref': blob_hash}
+
+
+def encode_report_record(record: Dict[str, Any], known_hashes: Iterable[str] = (),
+                         previous_refs: Optional[Dict[str, Any]] = None,
+                         base_report_id: Optional[str] = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[str]]:
+    """
+    Convert an ``analytics_reports`` row to blob storage.
+
+    Returns the slimmed row (section columns replaced by ``content_refs``),
+    the ``report_blobs`` rows not in ``known_hashes`` and every blob hash the
+    report references. ``previous_refs`` and ``base_report_id`` describe the
+    previous report, which the row records its delta against.
+    """
+    encoder = ReportEncoder()
+    refs = {section: encoder.encode(record.get(section, SECTION_DEFAULTS.get(section, {})))
+            for section in REPORT_SECTIONS}
+
+    known = set(known_hashes)
+    blob_rows = [
+        {'hash': blob_hash, 'content': content, 'size_bytes': len(_canonical(content))}
+        for blob_hash, content in encoder.blobs.items() if blob_hash not in known
+    ]
+
+    slim = {key: value for key, value in record.items() if key not in REPORT_SECTIONS}
+    slim.update({section: SECTION_DEFAULTS.get(section, {}) for section in REPORT_SECTIONS})
+    slim['content_refs'] = refs
+    slim['storage_format'] = STORAGE_FORMAT
+    slim['base_report_id'] = base_report_id
+    slim['report_metadata'] = {
+        **(record.get('report_metadata') or {}),
+        'storage': {
+            'format': STORAGE_FORMAT,
+            'blobs': len(encoder.blobs),
+            'new_blobs': len(blob_rows),
+            'changed_sections': [section for section in REPORT_SECTIONS
+                                 if previous_refs is None or refs[section] != previous_refs.get(section)]
+        }
+    }
+    return slim, blob_rows, sorted(encoder.blobs)
+
+
+def decode_value(value: Any, blobs: Dict[str, Any]) -> Any:
+    """Expand refs, arrays and date runs back into plain JSON"""
+    if isinstance(value, list):
+        return [decode_value(item, blobs) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if '$ref' in value:
+        return decode_value(blobs[value['$ref']], blobs)
+    if '$nd' in value:
+        return decode_array(value)
+    if '$dates' in value:
+        start = date.fromisoformat(value['$dates'])
+        return [(start + timedelta(days=i)).isoformat() for i in range(value['n'])]
+    return {key: decode_value(item, blobs) for key, item in value.items()}
+
+
+def referenced_hashes(value: Any, blobs: Dict[str, Any]) -> Set[str]:
+    """Hashes reachable from ``value`` through the blobs already fetched"""
+    found: Set[str] = set()
+    stack = [value]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, list):
+            stack.extend(current)
+        elif isinstance(current, dict):
+            if '$ref' in current:
+                found.add(current['$ref'])
+                if current['$ref'] in blobs:
+                    stack.append(blobs[current['$ref']])
+            else:
+                stack.extend(current.values())
+    return found
+
+
+def decode_report_record(record: Dict[str, Any],
+                         fetch_blobs: Callable[[List[str]], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Rebuild the full sections of a stored report row. ``fetch_blobs`` maps a
+    list of hashes to their contents; it is called once per tree level.
+    """
+    if record.get('storage_format') != STORAGE_FORMAT:
+        return record
+
+    refs = record.get('content_refs') or {}
+    blobs: Dict[str, Any] = {}
+    missing = referenced_hashes(refs, blobs)
+    while missing:
+        fetched = fetch_blobs(sorted(missing))
+        absent = missing - set(fetched)
+        if absent:
+            raise KeyError(f"Report blobs not found: {', '.join(sorted(absent))}")
+        blobs.update(fetched)
+        missing = referenced_hashes(refs, blobs) - set(blobs)
+
+    decoded = dict(record)
+    for section in REPORT_SECTIONS:
+        if section in refs:
+            decoded[section] = decode_value(refs[section], blobs)
+    return decoded
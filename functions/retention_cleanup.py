@@ -0,0 +1,236 @@
+"""
+Retention Cleanup
+=================
+Chunked, resumable deletion of analytics output past its retention period.
+
+Each table is cleaned in bounded date windows, oldest first, so no single
+DELETE touches more than ``batch_days`` worth of rows. Deletes ask PostgREST
+for an exact row count with ``return=minimal`` instead of the deleted rows
+themselves. Tables are cleaned in parallel (at most ``concurrency`` at a
+time), and progress is checkpointed to ``retention_cleanup.json`` in the
+cache directory: an interrupted run with the same cutoff skips the tables it
+already finished and keeps counting from where it stopped.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from bulk_writer import NON_RETRYABLE_CODE_PREFIXES
+from circuit_breaker import CircuitOpenError
+from supabase_clients import supabase_breaker
+
+logger = logging.getLogger(__name__)
+
+# Tables to clean up with their date columns
+RETENTION_TABLES = {
+    'forecasts': 'created_at',
+    'department_insights': 'insight_date',
+    'analytics_reports': 'generated_at',
+    'data_quality_assessments': 'assessment_date',
+    'alerts': 'created_at'
+}
+
+# Blobs only referenced by deleted reports are removed after the reports
+PRUNE_BLOBS_RPC = 'prune_report_blobs'
+
+DEFAULT_BATCH_DAYS = int(os.getenv('CLEANUP_BATCH_DAYS', 7))
+DEFAULT_CONCURRENCY = int(os.getenv('CLEANUP_CONCURRENCY', 3))
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 1.0
+CHECKPOINT_FILE = 'retention_cleanup.json'
+
+# Postgres query_canceled: the window hit statement_timeout and is split
+STATEMENT_TIMEOUT_CODE = '57014'
+
+
+def _error_code(error: Exception) -> str:
+    return str(getattr(error, 'code', '') or '')
+
+
+class RetentionCleaner:
+    """Deletes rows older than a cutoff date, table by table in date windows"""
+
+    def __init__(self, client, tables: Optional[Dict[str, str]] = None,
+                 batch_days: int = DEFAULT_BATCH_DAYS, concurrency: int = DEFAULT_CONCURRENCY,
+                 checkpoint_dir: Optional[str] = None, max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_seconds: float = DEFAULT_BACKOFF_SECONDS, prune_blobs: bool = True):
+        self.client = client
+        self.tables = dict(tables or RETENTION_TABLES)
+        self.batch_days = max(1, batch_days)
+        self.concurrency = max(1, concurrency)
+        checkpoint_dir = checkpoint_dir or os.getenv('ANALYTICS_CACHE_DIR')
+        self.checkpoint_path = os.path.join(checkpoint_dir, CHECKPOINT_FILE) if checkpoint_dir else None
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.prune_blobs = prune_blobs
+        self._checkpoint: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def run(self, retention_days: int) -> Dict[str, Any]:
+        """Delete everything older than ``retention_days``; same result shape as the sync manager"""
+        cutoff_date = (datetime.now() - timedelta(days=retention_days)).date().isoformat()
+        self._checkpoint = self._load_checkpoint(cutoff_date)
+        progress = self._checkpoint['tables']
+
+        pending = [table for table in self.tables if not progress.get(table, {}).get('complete')]
+        resumed = [table for table in self.tables if table not in pending]
+        if resumed:
+            logger.info(f"Resuming cleanup to {cutoff_date}, already done: {', '.join(resumed)}")
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(pending)),
+                                    thread_name_prefix='retention-cleanup') as executor:
+                list(executor.map(lambda table: self._clean_table(table, cutoff_date), pending))
+
+        cleanup_results = {
+            table: {
+                'deleted_records': progress.get(table, {}).get('deleted', 0),
+                'success': bool(progress.get(table, {}).get('complete')),
+                **({'error': progress[table]['error']} if progress.get(table, {}).get('error') else {})
+            }
+            for table in self.tables
+        }
+
+        if self.prune_blobs and 'analytics_reports' in self.tables \
+                and cleanup_results['analytics_reports']['success']:
+            cleanup_results['report_blobs'] = self._prune_report_blobs()
+
+        complete = all(result['success'] for result in cleanup_results.values())
+        if complete:
+            self._clear_checkpoint()
+
+        total_deleted = sum(result['deleted_records'] for result in cleanup_results.values())
+        logger.info(f"Data cleanup {'completed' if complete else 'interrupted'}. "
+                    f"Total records deleted: {total_deleted}")
+        return {
+            'success': True,
+            'complete': complete,
+            'total_deleted': total_deleted,
+            'table_results': cleanup_results,
+            'cutoff_date': cutoff_date
+        }
+
+    def _clean_table(self, table: str, cutoff_date: str):
+        date_column = self.tables[table]
+        cutoff = date.fromisoformat(cutoff_date)
+        try:
+            oldest = self._oldest_date(table, date_column)
+            window = timedelta(days=self.batch_days)
+            start = oldest
+            while start is not None and start < cutoff:
+                end = min(start + window, cutoff)
+                try:
+                    # Earlier windows are already empty, so only the upper bound is needed
+                    deleted = self._execute(
+                        lambda: self.client.table(table).delete(count='exact', returning='minimal')
+                        .lt(date_column, end.isoformat()).execute().count,
+                        f"cleanup of {table} before {end.isoformat()}"
+                    ) or 0
+                except Exception as e:
+                    if _error_code(e) == STATEMENT_TIMEOUT_CODE and window > timedelta(days=1):
+                        window = max(timedelta(days=1), window // 2)
+                        logger.warning(f"Cleanup window for {table} timed out, narrowing to {window.days} day(s)")
+                        continue
+                    raise
+                self._record(table, deleted=deleted, done_until=end.isoformat())
+                logger.debug(f"Deleted {deleted} rows from {table} before {end.isoformat()}")
+                start = end
+            self._record(table, complete=True)
+            logger.info(f"Cleaned up {self._checkpoint['tables'][table]['deleted']} old records from {table}")
+        except Exception as e:
+            self._record(table, error=str(e))
+            logger.warning(f"Could not clean up {table}: {str(e)}")
+
+    def _oldest_date(self, table: str, date_column: str) -> Optional[date]:
+        rows = self._execute(
+            lambda: self.client.table(table).select(date_column).order(date_column).limit(1).execute().data,
+            f"oldest {table} row lookup"
+        )
+        if not rows or rows[0].get(date_column) is None:
+            return None
+        return date.fromisoformat(str(rows[0][date_column])[:10])
+
+    def _prune_report_blobs(self) -> Dict[str, Any]:
+        try:
+            removed = self._execute(lambda: self.client.rpc(PRUNE_BLOBS_RPC, {}).execute().data,
+                                    f"{PRUNE_BLOBS_RPC} RPC")
+            logger.info(f"Pruned {removed or 0} unreferenced report blobs")
+            return {'deleted_records': int(removed or 0), 'success': True}
+        except Exception as e:
+            if _error_code(e).startswith('PGRST') or _error_code(e) == '42883':
+                # Report storage migration not applied; nothing to prune
+                return {'deleted_records': 0, 'success': True}
+            logger.warning(f"Could not prune report blobs: {str(e)}")
+            return {'deleted_records': 0, 'success': False, 'error': str(e)}
+
+    def _execute(self, operation: Callable[[], Any], description: str) -> Any:
+        """Run one request through the Supabase breaker, retrying transient failures"""
+        breaker = supabase_breaker()
+        attempt = 0
+        while True:
+            try:
+                return breaker.call(operation)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                attempt += 1
+                code = _error_code(e)
+                if attempt > self.max_retries or code == STATEMENT_TIMEOUT_CODE \
+                        or code.startswith(NON_RETRYABLE_CODE_PREFIXES):
+                    raise
+                delay = self.backoff_seconds * (2 ** (attempt - 1))
+                logger.warning(f"{description} failed (attempt {attempt}/{self.max_retries}), "
+                               f"retrying in {delay:.1f}s: {str(e)}")
+                time.sleep(delay)
+
+    def _record(self, table: str, deleted: int = 0, done_until: Optional[str] = None,
+                complete: bool = False, error: Optional[str] = None):
+        with self._lock:
+            progress = self._checkpoint['tables'].setdefault(table, {'deleted': 0})
+            progress['deleted'] = progress.get('deleted', 0) + deleted
+            progress.pop('error', None)
+            if done_until:
+                progress['done_until'] = done_until
+            if complete:
+                progress['complete'] = True
+            if error:
+                progress['error'] = error
+            self._save_checkpoint()
+
+    def _load_checkpoint(self, cutoff_date: str) -> Dict[str, Any]:
+        fresh = {'cutoff_date': cutoff_date, 'tables': {}}
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return fresh
+        try:
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load cleanup checkpoint from {self.checkpoint_path}: {str(e)}")
+            return fresh
+        # A checkpoint from another cutoff (e.g. yesterday's run) is superseded
+        return checkpoint if checkpoint.get('cutoff_date') == cutoff_date else fresh
+
+    def _save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+            tmp_path = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._checkpoint, f)
+            os.replace(tmp_path, self.checkpoint_path)
+        except Exception as e:
+            logger.warning(f"Could not save cleanup checkpoint to {self.checkpoint_path}: {str(e)}")
+
+    def _clear_checkpoint(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            try:
+                os.remove(self.checkpoint_path)
+            except OSError as e:
+                logger.warning(f"Could not remove cleanup checkpoint {self.checkpoint_path}: {str(e)}")
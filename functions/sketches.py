@@ -0,0 +1,262 @@
+"""
+Streaming Sketches
+==================
+Mergeable, constant-memory summaries for high-cardinality dimensions.
+
+* ``SpaceSaving``  - top-k heavy hitters with per-key error bounds
+* ``CountMinSketch`` - point frequency estimates (never under-counts)
+* ``HyperLogLog``  - distinct counts (~1.04 / sqrt(2^precision) relative error)
+
+All three are fed chunk by chunk and can be merged, so per-partition
+sketches built by separate workers combine into the same result as one pass
+over the whole stream. Values are hashed with ``pd.util.hash_array`` (a fixed
+key), which is stable across processes.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Dimensions tracked by default
+SKETCH_DIMENSIONS = ['nationality', 'tourist_destination', 'home_region']
+
+DEFAULT_CAPACITY = 256
+DEFAULT_PRECISION = 12
+DEFAULT_CM_WIDTH = 2048
+DEFAULT_CM_DEPTH = 4
+
+CHUNK_ROWS = 100000
+
+
+def hash_values(values: Iterable[Any]) -> np.ndarray:
+    """64-bit hashes of the values, deterministic across processes"""
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter summary with at most ``capacity`` counters.
+
+    Counts are upper bounds; ``count - error`` is a guaranteed lower bound.
+    Any key with a true frequency above ``rows / capacity`` is retained.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='int64')
+        self.errors = pd.Series(dtype='int64')
+        # Upper bound on the count of any key that is not tracked
+        self.floor = 0
+
+    def update(self, values: pd.Series) -> 'SpaceSaving':
+        """Add one chunk of raw values (missing values are ignored)"""
+        chunk_counts = values.value_counts()
+        if chunk_counts.empty:
+            return self
+
+        chunk = SpaceSaving(self.capacity)
+        chunk.counts = chunk_counts.iloc[:self.capacity].astype('int64')
+        chunk.errors = pd.Series(0, index=chunk.counts.index, dtype='int64')
+        chunk.floor = int(chunk_counts.iloc[self.capacity]) if len(chunk_counts) > self.capacity else 0
+        return self.merge(chunk)
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """Combine with another summary in place (keys missing on one side get its floor)"""
+        keys = self.counts.index.union(other.counts.index)
+        counts = self.counts.reindex(keys, fill_value=self.floor) + \
+            other.counts.reindex(keys, fill_value=other.floor)
+        errors = self.errors.reindex(keys, fill_value=self.floor) + \
+            other.errors.reindex(keys, fill_value=other.floor)
+
+        counts = counts.sort_values(ascending=False, kind='stable')
+        dropped = counts.iloc[self.capacity:]
+        self.counts = counts.iloc[:self.capacity].astype('int64')
+        self.errors = errors.reindex(self.counts.index).astype('int64')
+        self.floor = max(self.floor + other.floor, int(dropped.iloc[0]) if len(dropped) else 0)
+        return self
+
+    def top(self, n: int) -> pd.Series:
+        """Estimated counts of the ``n`` heaviest keys, largest first"""
+        return self.counts.iloc[:n]
+
+
+class CountMinSketch:
+    """Count-Min sketch of ``depth`` rows x ``width`` counters"""
+
+    def __init__(self, width: int = DEFAULT_CM_WIDTH, depth: int = DEFAULT_CM_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype='int64')
+
+    def _buckets(self, hashes: np.ndarray) -> np.ndarray:
+        # Kirsch-Mitzenmacher double hashing: bucket_i = h1 + i * h2
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = hashes >> np.uint64(32)
+        rows = np.arange(self.depth, dtype='uint64')[:, None]
+        return ((h1[None, :] + rows * h2[None, :]) % np.uint64(self.width)).astype('int64')
+
+    def update(self, values: pd.Series) -> 'CountMinSketch':
+        """Add one chunk of raw values (missing values are ignored)"""
+        chunk_counts = values.value_counts()
+        if chunk_counts.empty:
+            return self
+
+        buckets = self._buckets(hash_values(chunk_counts.index))
+        weights = chunk_counts.to_numpy(dtype='int64')
+        for row in range(self.depth):
+            np.add.at(self.table[row], buckets[row], weights)
+        return self
+
+    def estimate(self, keys: Iterable[Any]) -> np.ndarray:
+        """Estimated count per key (an upper bound on the true count)"""
+        buckets = self._buckets(hash_values(list(keys)))
+        return self.table[np.arange(self.depth)[:, None], buckets].min(axis=0)
+
+    def merge(self, other: 'CountMinSketch') -> 'CountMinSketch':
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Cannot merge Count-Min sketches of different shapes")
+        self.table += other.table
+        return self
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter with ``2 ** precision`` registers"""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        # 64 - precision <= 53 keeps the float64 bit-length computation exact
+        if not 11 <= precision <= 18:
+            raise ValueError("precision must be between 11 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype='uint8')
+
+    def update(self, values: pd.Series) -> 'HyperLogLog':
+        """Add one chunk of raw values (missing values are ignored)"""
+        values = values.dropna()
+        if values.empty:
+            return self
+
+        hashes = hash_values(values.unique())
+        suffix_bits = 64 - self.precision
+        index = (hashes >> np.uint64(suffix_bits)).astype('int64')
+        suffix = hashes & np.uint64((1 << suffix_bits) - 1)
+        # Position of the leftmost 1-bit in the suffix (suffix_bits + 1 when it is all zeros)
+        bit_length = np.frexp(suffix.astype('float64'))[1]
+        rank = (suffix_bits - bit_length + 1).astype('uint8')
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype('int64')))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            return float(m * np.log(m / zeros))
+        return float(raw)
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        if self.precision != other.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+
+class DimensionSketches:
+    """
+    Per-dimension heavy-hitter and distinct-count sketches.
+
+    Feed record chunks with ``update()``; merge sketches built on separate
+    partitions with ``merge()``. Memory is bounded by the sketch sizes, not
+    by the number of records or distinct values.
+    """
+
+    def __init__(self, dimensions: Optional[List[str]] = None, capacity: int = DEFAULT_CAPACITY,
+                 precision: int = DEFAULT_PRECISION, cm_width: int = DEFAULT_CM_WIDTH,
+                 cm_depth: int = DEFAULT_CM_DEPTH):
+        self.dimensions = list(dimensions or SKETCH_DIMENSIONS)
+        self.params = {'capacity': capacity, 'precision': precision, 'cm_width': cm_width, 'cm_depth': cm_depth}
+        self.rows = 0
+        self.heavy_hitters = {dim: SpaceSaving(capacity) for dim in self.dimensions}
+        self.frequencies = {dim: CountMinSketch(cm_width, cm_depth) for dim in self.dimensions}
+        self.distinct_counters = {dim: HyperLogLog(precision) for dim in self.dimensions}
+        # Dimensions that have been present in at least one chunk
+        self.observed: set = set()
+
+    def spawn(self) -> 'DimensionSketches':
+        """Empty sketches of the same dimensions and sizes, for a partition merged back later"""
+        return DimensionSketches(self.dimensions, **self.params)
+
+    def update(self, df: pd.DataFrame) -> 'DimensionSketches':
+        """Fold one chunk of records into the sketches"""
+        self.rows += len(df)
+        for dim in self.dimensions:
+            if dim not in df.columns:
+                continue
+            self.observed.add(dim)
+            self.heavy_hitters[dim].update(df[dim])
+            self.frequencies[dim].update(df[dim])
+            self.distinct_counters[dim].update(df[dim])
+        return self
+
+    def update_frame(self, df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS) -> 'DimensionSketches':
+        """Stream an in-memory frame through the sketches in fixed-size chunks"""
+        for start in range(0, len(df), chunk_rows):
+            self.update(df.iloc[start:start + chunk_rows])
+        return self
+
+    @classmethod
+    def from_csv(cls, path: str, dimensions: Optional[List[str]] = None,
+                 chunk_rows: int = CHUNK_ROWS, **kwargs) -> 'DimensionSketches':
+        """Build sketches from a CSV file without materializing it"""
+        sketches = cls(dimensions, **kwargs)
+        wanted = set(sketches.dimensions)
+        for chunk in pd.read_csv(path, usecols=lambda col: col in wanted, chunksize=chunk_rows):
+            sketches.update(chunk)
+        return sketches
+
+    def merge(self, other: 'DimensionSketches') -> 'DimensionSketches':
+        """Merge sketches built over another partition of the same stream"""
+        if self.dimensions != other.dimensions:
+            raise ValueError("Cannot merge sketches over different dimensions")
+        self.rows += other.rows
+        self.observed |= other.observed
+        for dim in self.dimensions:
+            self.heavy_hitters[dim].merge(other.heavy_hitters[dim])
+            self.frequencies[dim].merge(other.frequencies[dim])
+            self.distinct_counters[dim].merge(other.distinct_counters[dim])
+        return self
+
+    def has_dimension(self, dimension: str) -> bool:
+        return dimension in self.observed
+
+    def top(self, dimension: str, n: int) -> pd.Series:
+        """Top-n values with estimated counts, largest first (value_counts().head(n) equivalent)"""
+        return self.heavy_hitters[dimension].top(n).rename('count')
+
+    def distinct(self, dimension: str) -> int:
+        """Estimated number of distinct values (nunique equivalent)"""
+        return int(round(self.distinct_counters[dimension].estimate()))
+
+    def frequency(self, dimension: str, value: Any) -> int:
+        """Estimated number of records with the given value"""
+        return int(self.frequencies[dimension].estimate([value])[0])
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'rows': self.rows,
+            'dimensions': {
+                dim: {
+                    'distinct': self.distinct(dim),
+                    'tracked_keys': len(self.heavy_hitters[dim].counts),
+                    'max_error': int(self.heavy_hitters[dim].errors.max()) if len(self.heavy_hitters[dim].errors) else 0
+                }
+                for dim in self.dimensions if dim in self.observed
+            }
+        }
@@ -0,0 +1,129 @@
+"""
+Supabase Clients
+================
+Process-wide registry of Supabase clients.
+
+One client (and so one HTTP connection pool) is kept per (url, key) and
+shared by the insights engine, the sync manager and the fallback loaders.
+The ``regions`` probe query that checks connectivity is cached for
+``SUPABASE_HEALTH_TTL`` seconds instead of running on every construction.
+Requests time out after ``SUPABASE_TIMEOUT`` seconds, and connectivity
+failures open the shared ``supabase`` circuit breaker so later calls fail
+fast during an outage. Errors PostgREST or Postgres answer with (a missing
+RPC, a constraint violation) do not open it.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from circuit_breaker import CLOSED, CircuitBreaker, get_breaker
+from lazy_imports import get_supabase
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+HEALTH_TTL_SECONDS = float(os.getenv('SUPABASE_HEALTH_TTL', 300))
+REQUEST_TIMEOUT_SECONDS = float(os.getenv('SUPABASE_TIMEOUT', 10))
+BREAKER_NAME = 'supabase'
+
+
+@dataclass
+class _ClientEntry:
+    client: 'Client'
+    healthy_at: Optional[float] = None  # monotonic time of the last successful probe
+
+
+_clients: Dict[Tuple[str, str], _ClientEntry] = {}
+_lock = threading.Lock()
+
+
+def _probe(client: 'Client'):
+    """Cheapest query that proves the database is reachable with these credentials"""
+    client.table('regions').select('id').limit(1).execute()
+
+
+def get_client(url: str, key: str) -> 'Client':
+    """Shared client for (url, key), created on first use without a health check"""
+    with _lock:
+        entry = _clients.get((url, key))
+        if entry is None:
+            # The client library is imported with the first client, not with this module
+            supabase = get_supabase()
+            options = supabase.ClientOptions(postgrest_client_timeout=REQUEST_TIMEOUT_SECONDS)
+            entry = _ClientEntry(client=supabase.create_client(url, key, options=options))
+            _clients[(url, key)] = entry
+        return entry.client
+
+
+def is_outage(error: BaseException) -> bool:
+    """Whether ``error`` means Supabase could not be reached, rather than that it rejected the request"""
+    if isinstance(error, OSError):  # Includes ConnectionError and TimeoutError
+        return True
+    # httpx is only loaded with the supabase client, and only its errors can come from a request
+    httpx = sys.modules.get('httpx')
+    if httpx is not None and isinstance(error, httpx.TransportError):
+        return True
+    # APIErrors with a PostgREST/Postgres code (PGRST202, 23505, ...) are answers from the database;
+    # without one the response did not come from PostgREST (e.g. a gateway error page)
+    return type(error).__name__ == 'APIError' and not getattr(error, 'code', None)
+
+
+def supabase_breaker() -> CircuitBreaker:
+    """Circuit breaker shared by every Supabase call in the process"""
+    return get_breaker(BREAKER_NAME, is_failure=is_outage)
+
+
+def get_healthy_client(url: Optional[str], key: Optional[str],
+                       ttl: Optional[float] = None) -> Optional['Client']:
+    """
+    Shared client for (url, key) if the database is reachable, else None.
+
+    The probe query runs at most once per ``ttl`` seconds per client; a
+    failed probe discards the client so the next call reconnects. While the
+    circuit breaker is open no connection is attempted at all.
+    """
+    if not url or not key:
+        return None
+    ttl = HEALTH_TTL_SECONDS if ttl is None else ttl
+    breaker = supabase_breaker()
+
+    with _lock:
+        entry = _clients.get((url, key))
+        if (entry is not None and entry.healthy_at is not None
+                and time.monotonic() - entry.healthy_at < ttl and breaker.state == CLOSED):
+            return entry.client
+
+    if not breaker.allow():
+        logger.warning(f"Supabase marked unavailable, skipping connection (retry in {breaker.retry_in():.0f}s)")
+        return None
+
+    try:
+        client = get_client(url, key)
+        _probe(client)
+    except Exception as e:
+        breaker.record_error(e)
+        logger.error(f"Supabase health check failed for {url}: {str(e)}")
+        with _lock:
+            _clients.pop((url, key), None)
+        return None
+
+    breaker.record_success()
+    with _lock:
+        entry = _clients.get((url, key))
+        if entry is not None:
+            entry.healthy_at = time.monotonic()
+    logger.info(f"Supabase health check passed for {url}")
+    return client
+
+
+def reset_clients():
+    """Drop all shared clients (e.g. after rotating credentials)"""
+    with _lock:
+        _clients.clear()
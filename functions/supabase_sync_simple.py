@@ -8,19 +8,52 @@ import os
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Set, Tuple
 import pandas as pd
-from supabase import create_client, Client
-from postgrest.exceptions import APIError
+
+from bulk_loader import BulkLoader
+from bulk_writer import UPSERT_KEYS, BulkWriter
+from daily_series import DAILY_SERIES, FORECAST_SERIES, SERIES_RPC, series_frame
+from report_storage import decode_report_record, encode_report_record
+from record_hashes import INDEX_FILE, RecordHashIndex
+from retention_cleanup import RetentionCleaner
+from circuit_breaker import OPEN
+from postgres_backend import get_postgres_backend
+from analytics_cache import get_cache_dir
+from supabase_clients import get_healthy_client, supabase_breaker
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 logger = logging.getLogger(__name__)
 
+# Columns of the source tables (sql/migrations/initial.sql), used to project loads
+TOURISM_TABLE_COLUMNS = {
+    'arrivals': ['id', 'flight_number', 'timestamp', 'origin', 'destination', 'passenger_count',
+                 'aircraft_type', 'segment_id', 'metadata', 'data_source', 'created_at'],
+    'occupancy': ['id', 'hotel_id', 'hotel_name', 'date', 'total_rooms', 'occupied_rooms', 'average_rate',
+                  'revenue', 'region_id', 'data_source', 'created_at'],
+    'visits': ['id', 'site_id', 'site_name', 'timestamp', 'visitor_count', 'visit_duration_minutes',
+               'visitor_demographics', 'region_id', 'data_source', 'created_at'],
+    'surveys': ['id', 'visit_id', 'rating', 'sentiment', 'comments', 'survey_type', 'language_code',
+                'respondent_demographics', 'created_at']
+}
+
+# Column each source table is windowed on by load_tourism_data
+TOURISM_DATE_COLUMNS = {
+    'arrivals': 'timestamp',
+    'occupancy': 'date',
+    'visits': 'timestamp',
+    'surveys': 'created_at'
+}
+
 class SupabaseSyncManager:
     """
     Simplified Supabase sync manager that works with your current setup
     """
     
-    def __init__(self, supabase_url: str = None, supabase_key: str = None):
+    def __init__(self, supabase_url: str = None, supabase_key: str = None, client: Optional['Client'] = None,
+                 cache_dir: Optional[str] = None, db_url: Optional[str] = None):
         self.supabase_url = supabase_url or os.getenv('SUPABASE_URL')
         # Try different environment variable names
         self.supabase_key = (
@@ -29,19 +62,39 @@ class SupabaseSyncManager:
             os.getenv('SUPABASE_ANON_KEY') or 
             os.getenv('SUPABASE_SERVICE_KEY')
         )
-        self.client = self._create_client()
+        # An already connected client (e.g. from the insights engine) skips the lookup
+        self._client = client or self._create_client()
+        
+        # Content hashes of the forecasts/insights last written, so unchanged records are skipped
+        self.record_index = RecordHashIndex(os.path.join(get_cache_dir(cache_dir), INDEX_FILE))
+        
+        # Direct Postgres connection for bulk loads (SUPABASE_DB_URL); connects on first use
+        self.postgres = get_postgres_backend(db_url)
     
-    def _create_client(self) -> Optional[Client]:
+    @property
+    def client(self) -> Optional['Client']:
+        """Supabase client, looked up again while the database was unreachable"""
+        # A long-running process (the analytics daemon) must not stay offline after an outage at
+        # start-up; get_healthy_client fails fast while the circuit breaker is open
+        if self._client is None and self.supabase_url and self.supabase_key:
+            self._client = get_healthy_client(self.supabase_url, self.supabase_key)
+        return self._client
+
+    @client.setter
+    def client(self, client: Optional['Client']):
+        self._client = client
+
+    def _create_client(self) -> Optional['Client']:
         """Create Supabase client with available credentials"""
         try:
             if not self.supabase_url or not self.supabase_key:
                 logger.warning("Supabase URL or key not provided")
                 return None
             
-            client = create_client(self.supabase_url, self.supabase_key)
-            
-            # Test the connection
-            result = client.table('regions').select('id').limit(1).execute()
+            # Shared per (url, key); the connection test is cached for SUPABASE_HEALTH_TTL
+            client = get_healthy_client(self.supabase_url, self.supabase_key)
+            if client is None:
+                return None
             
             logger.info(f"Successfully connected to Supabase (key length: {len(self.supabase_key)})")
             return client
@@ -50,6 +103,44 @@ class SupabaseSyncManager:
             logger.error(f"Failed to create Supabase client: {str(e)}")
             return None
     
+    def changed_records(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rows whose content differs from the last written version of the same record"""
+        return self.record_index.changed(table, rows)
+    
+    def mark_records_written(self, table: str, rows: List[Dict[str, Any]]):
+        self.record_index.mark_written(table, rows)
+    
+    def forecast_records(self, forecasts: Dict[str, Any], region_id: str = None) -> List[Dict[str, Any]]:
+        """Build forecasts table rows (forecasts with errors are skipped)"""
+        records = []
+        start_date = datetime.now().date()
+        for forecast_type, forecast_data in forecasts.items():
+            if 'error' in forecast_data:
+                logger.warning(f"Skipping {forecast_type} forecast due to error: {forecast_data['error']}")
+                continue
+            
+            # Determine forecast period
+            if 'forecast_dates' in forecast_data:
+                end_date = datetime.strptime(forecast_data['forecast_dates'][-1], '%Y-%m-%d').date()
+            else:
+                end_date = start_date + timedelta(days=30)
+            
+            records.append({
+                'forecast_type': forecast_type,
+                'region_id': region_id,
+                'forecast_period_start': start_date.isoformat(),
+                'forecast_period_end': end_date.isoformat(),
+                'forecast_method': forecast_data.get('method', 'unknown'),
+                'forecast_data': forecast_data,
+                'confidence_score': forecast_data.get('confidence', 0.8),
+                'metadata': {
+                    'generated_by': 'tourism_insights_engine',
+                    'data_points': len(forecast_data.get('forecast_values', [])),
+                    'avg_value': forecast_data.get('average_daily_arrivals') or forecast_data.get('daily_average_revenue')
+                }
+            })
+        return records
+    
     def save_forecasts(self, forecasts: Dict[str, Any], region_id: str = None) -> bool:
         """Save forecast data to the forecasts table"""
         if not self.client:
@@ -57,42 +148,19 @@ class SupabaseSyncManager:
             return False
         
         try:
-            for forecast_type, forecast_data in forecasts.items():
-                if 'error' in forecast_data:
-                    logger.warning(f"Skipping {forecast_type} forecast due to error: {forecast_data['error']}")
-                    continue
-                
-                # Determine forecast period
-                start_date = datetime.now().date()
-                
-                if 'forecast_dates' in forecast_data:
-                    end_date = datetime.strptime(forecast_data['forecast_dates'][-1], '%Y-%m-%d').date()
-                else:
-                    end_date = start_date + timedelta(days=30)
-                
-                # Prepare forecast record
-                forecast_record = {
-                    'forecast_type': forecast_type,
-                    'region_id': region_id,
-                    'forecast_period_start': start_date.isoformat(),
-                    'forecast_period_end': end_date.isoformat(),
-                    'forecast_method': forecast_data.get('method', 'unknown'),
-                    'forecast_data': forecast_data,
-                    'confidence_score': forecast_data.get('confidence', 0.8),
-                    'metadata': {
-                        'generated_by': 'tourism_insights_engine',
-                        'data_points': len(forecast_data.get('forecast_values', [])),
-                        'avg_value': forecast_data.get('average_daily_arrivals') or forecast_data.get('daily_average_revenue')
-                    }
-                }
-                
-                # Insert forecast record
-                result = self.client.table('forecasts').insert(forecast_record).execute()
+            forecast_records = self.changed_records('forecasts', self.forecast_records(forecasts, region_id))
+            
+            # Batch upsert changed forecasts
+            if forecast_records:
+                result = self.client.table('forecasts').upsert(
+                    forecast_records, on_conflict=','.join(UPSERT_KEYS['forecasts'])
+                ).execute()
                 
                 if result.data:
-                    logger.info(f"Successfully saved {forecast_type} forecast")
+                    self.mark_records_written('forecasts', forecast_records)
+                    logger.info(f"Successfully saved {len(forecast_records)} forecasts")
                 else:
-                    logger.warning(f"No data returned when saving {forecast_type} forecast")
+                    logger.warning("No data returned when saving forecasts")
                 
             logger.info(f"Successfully processed {len(forecasts)} forecasts")
             return True
@@ -101,6 +169,35 @@ class SupabaseSyncManager:
             logger.error(f"Error saving forecasts: {str(e)}")
             return False
     
+    def department_insight_records(self, insights: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Build department_insights table rows"""
+        insight_records = []
+        
+        for dept_name, insight_data in insights.items():
+            if 'department' not in insight_data:
+                continue
+            
+            # Calculate performance score based on metrics
+            performance_score = self._calculate_performance_score(insight_data.get('key_metrics', []))
+            
+            # Determine trend direction
+            trend_direction = self._determine_trend_direction(insight_data.get('key_metrics', []))
+            
+            insight_records.append({
+                'department_name': dept_name,
+                'insight_date': datetime.now().date().isoformat(),
+                'alert_level': insight_data.get('alert_level', 'normal'),
+                'key_metrics': insight_data.get('key_metrics', []),
+                'recommendations': insight_data.get('recommendations', []),
+                'action_items': insight_data.get('action_items', []),
+                'performance_score': performance_score,
+                'trend_direction': trend_direction,
+                'data_sources': {'tourism_data': True, 'forecasts': True},
+                'generated_by': 'tourism_insights_engine'
+            })
+        
+        return insight_records
+    
     def save_department_insights(self, insights: Dict[str, Any]) -> bool:
         """Save departmental insights to the department_insights table"""
         if not self.client:
@@ -108,38 +205,16 @@ class SupabaseSyncManager:
             return False
         
         try:
-            insight_records = []
-            
-            for dept_name, insight_data in insights.items():
-                if 'department' not in insight_data:
-                    continue
-                
-                # Calculate performance score based on metrics
-                performance_score = self._calculate_performance_score(insight_data.get('key_metrics', []))
-                
-                # Determine trend direction
-                trend_direction = self._determine_trend_direction(insight_data.get('key_metrics', []))
-                
-                insight_record = {
-                    'department_name': dept_name,
-                    'insight_date': datetime.now().date().isoformat(),
-                    'alert_level': insight_data.get('alert_level', 'normal'),
-                    'key_metrics': insight_data.get('key_metrics', []),
-                    'recommendations': insight_data.get('recommendations', []),
-                    'action_items': insight_data.get('action_items', []),
-                    'performance_score': performance_score,
-                    'trend_direction': trend_direction,
-                    'data_sources': {'tourism_data': True, 'forecasts': True},
-                    'generated_by': 'tourism_insights_engine'
-                }
-                
-                insight_records.append(insight_record)
+            insight_records = self.changed_records('department_insights', self.department_insight_records(insights))
             
-            # Batch insert insights
+            # Batch upsert changed insights
             if insight_records:
-                result = self.client.table('department_insights').insert(insight_records).execute()
+                result = self.client.table('department_insights').upsert(
+                    insight_records, on_conflict=','.join(UPSERT_KEYS['department_insights'])
+                ).execute()
                 
                 if result.data:
+                    self.mark_records_written('department_insights', insight_records)
                     logger.info(f"Successfully saved insights for {len(insight_records)} departments")
                     return True
                 else:
@@ -152,6 +227,38 @@ class SupabaseSyncManager:
             logger.error(f"Error saving department insights: {str(e)}")
             return False
     
+    def analytics_report_record(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the analytics_reports table row for a report"""
+        # Determine report period from metadata
+        report_metadata = report.get('report_metadata', {})
+        period_start = datetime.now().date() - timedelta(days=30)
+        period_end = datetime.now().date()
+        
+        return {
+            'report_type': 'comprehensive',
+            'report_period_start': period_start.isoformat(),
+            'report_period_end': period_end.isoformat(),
+            'executive_summary': report.get('executive_summary', {}),
+            'departmental_insights': report.get('departmental_insights', {}),
+            'forecasts': report.get('forecasts', {}),
+            'cross_departmental_initiatives': report.get('cross_departmental_initiatives', []),
+            'report_metadata': report_metadata,
+            'status': 'generated'
+        }
+    
+    def analytics_report_rows(self, report: Dict[str, Any], known_hashes: Set[str] = frozenset(),
+                              previous_refs: Optional[Dict[str, Any]] = None,
+                              base_report_id: Optional[str] = None) -> Tuple[Dict[str, List[Dict[str, Any]]], List[str]]:
+        """
+        Rows storing a report with deduplicated sections - the slim
+        analytics_reports row plus the report_blobs not in ``known_hashes`` -
+        and the hashes of every blob the report references.
+        """
+        record, blob_rows, blob_hashes = encode_report_record(
+            self.analytics_report_record(report), known_hashes, previous_refs, base_report_id
+        )
+        return {'report_blobs': blob_rows, 'analytics_reports': [record]}, blob_hashes
+    
     def save_analytics_report(self, report: Dict[str, Any]) -> str:
         """Save comprehensive analytics report to the analytics_reports table"""
         if not self.client:
@@ -159,24 +266,15 @@ class SupabaseSyncManager:
             return None
         
         try:
-            # Determine report period from metadata
-            report_metadata = report.get('report_metadata', {})
-            period_start = datetime.now().date() - timedelta(days=30)
-            period_end = datetime.now().date()
-            
-            report_record = {
-                'report_type': 'comprehensive',
-                'report_period_start': period_start.isoformat(),
-                'report_period_end': period_end.isoformat(),
-                'executive_summary': report.get('executive_summary', {}),
-                'departmental_insights': report.get('departmental_insights', {}),
-                'forecasts': report.get('forecasts', {}),
-                'cross_departmental_initiatives': report.get('cross_departmental_initiatives', []),
-                'report_metadata': report_metadata,
-                'status': 'generated'
-            }
+            rows, _ = self.analytics_report_rows(report)
             
-            result = self.client.table('analytics_reports').insert(report_record).execute()
+            # Blobs are content-addressed; ones stored by earlier reports are skipped
+            if rows['report_blobs']:
+                self.client.table('report_blobs').upsert(
+                    rows['report_blobs'], on_conflict='hash', ignore_duplicates=True
+                ).execute()
+            
+            result = self.client.table('analytics_reports').insert(rows['analytics_reports']).execute()
             
             if result.data and len(result.data) > 0:
                 report_id = result.data[0]['id']
@@ -190,6 +288,27 @@ class SupabaseSyncManager:
             logger.error(f"Error saving analytics report: {str(e)}")
             return None
     
+    def load_analytics_report(self, report_id: str) -> Optional[Dict[str, Any]]:
+        """Load a stored report with its sections expanded from report blobs"""
+        if not self.client:
+            logger.warning("No Supabase client available")
+            return None
+        
+        try:
+            result = self.client.table('analytics_reports').select('*').eq('id', report_id).limit(1).execute()
+            if not result.data:
+                return None
+            
+            def fetch_blobs(hashes: List[str]) -> Dict[str, Any]:
+                response = self.client.table('report_blobs').select('hash,content').in_('hash', hashes).execute()
+                return {row['hash']: row['content'] for row in response.data or []}
+            
+            return decode_report_record(result.data[0], fetch_blobs)
+            
+        except Exception as e:
+            logger.error(f"Error loading analytics report {report_id}: {str(e)}")
+            return None
+    
     def _calculate_performance_score(self, metrics: List[Dict[str, Any]]) -> float:
         """Calculate overall performance score from metrics"""
         if not metrics:
@@ -236,6 +355,73 @@ class SupabaseSyncManager:
         else:
             return 'stable'
 
+    def alert_records(self, alert_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Build alerts table rows. Simple metric values become informational
+        records, which are not persisted; only actual alerts are returned.
+        """
+        alerts = []
+        current_time = datetime.now()
+        
+        # Process alert data and create alert records
+        for alert_type, data in alert_data.items():
+            # Handle both dictionary format and simple values
+            if isinstance(data, dict):
+                # Full alert object
+                if data.get('severity', 'low') == 'none':
+                    continue
+                
+                alert_record = {
+                    'alert_type': alert_type,
+                    'severity': data.get('severity', 'medium'),
+                    'title': data.get('title', f'{alert_type.title()} Alert'),
+                    'description': data.get('description', f'Alert for {alert_type}'),
+                    'affected_department': data.get('department'),
+                    'threshold_values': data.get('thresholds', {}),
+                    'current_values': data.get('current_values', {}),
+                    'recommendations': data.get('recommendations', []),
+                    'alert_status': 'active',
+                    'created_at': current_time.isoformat(),
+                    'metadata': {
+                        'source': 'analytics_pipeline',
+                        'generated_by': 'tourism_insights_engine'
+                    }
+                }
+            else:
+                # Simple value - convert to basic alert
+                # Convert numpy types to Python types
+                if hasattr(data, 'item'):  # numpy types
+                    value = data.item()
+                else:
+                    value = data
+                
+                # Skip None or empty values
+                if value is None or value == 0:
+                    continue
+                
+                alert_record = {
+                    'alert_type': alert_type,
+                    'severity': 'info',  # Default for metric values
+                    'title': f'{alert_type.replace("_", " ").title()} Metric',
+                    'description': f'Current value: {value}',
+                    'affected_department': alert_type.split('_')[0] if '_' in alert_type else None,
+                    'threshold_values': {},
+                    'current_values': {'value': value},
+                    'recommendations': [],
+                    'alert_status': 'informational',
+                    'created_at': current_time.isoformat(),
+                    'metadata': {
+                        'source': 'analytics_pipeline',
+                        'generated_by': 'tourism_insights_engine',
+                        'metric_type': 'performance_indicator'
+                    }
+                }
+            
+            alerts.append(alert_record)
+        
+        # Only actual alerts are saved, not informational metrics
+        return [a for a in alerts if a['alert_status'] != 'informational']
+
     def trigger_alerts(self, alert_data: Dict[str, Any]) -> bool:
         """Trigger alerts based on analytics data"""
         if not self.client:
@@ -243,89 +429,45 @@ class SupabaseSyncManager:
             return False
         
         try:
-            alerts = []
-            current_time = datetime.now()
-            
-            # Process alert data and create alert records
-            for alert_type, data in alert_data.items():
-                # Handle both dictionary format and simple values
-                if isinstance(data, dict):
-                    # Full alert object
-                    if data.get('severity', 'low') == 'none':
-                        continue
-                    
-                    alert_record = {
-                        'alert_type': alert_type,
-                        'severity': data.get('severity', 'medium'),
-                        'title': data.get('title', f'{alert_type.title()} Alert'),
-                        'description': data.get('description', f'Alert for {alert_type}'),
-                        'affected_department': data.get('department'),
-                        'threshold_values': data.get('thresholds', {}),
-                        'current_values': data.get('current_values', {}),
-                        'recommendations': data.get('recommendations', []),
-                        'alert_status': 'active',
-                        'created_at': current_time.isoformat(),
-                        'metadata': {
-                            'source': 'analytics_pipeline',
-                            'generated_by': 'tourism_insights_engine'
-                        }
-                    }
-                else:
-                    # Simple value - convert to basic alert
-                    # Convert numpy types to Python types
-                    if hasattr(data, 'item'):  # numpy types
-                        value = data.item()
-                    else:
-                        value = data
-                    
-                    # Skip None or empty values
-                    if value is None or value == 0:
-                        continue
-                    
-                    alert_record = {
-                        'alert_type': alert_type,
-                        'severity': 'info',  # Default for metric values
-                        'title': f'{alert_type.replace("_", " ").title()} Metric',
-                        'description': f'Current value: {value}',
-                        'affected_department': alert_type.split('_')[0] if '_' in alert_type else None,
-                        'threshold_values': {},
-                        'current_values': {'value': value},
-                        'recommendations': [],
-                        'alert_status': 'informational',
-                        'created_at': current_time.isoformat(),
-                        'metadata': {
-                            'source': 'analytics_pipeline',
-                            'generated_by': 'tourism_insights_engine',
-                            'metric_type': 'performance_indicator'
-                        }
-                    }
-                
-                alerts.append(alert_record)
+            actual_alerts = self.alert_records(alert_data)
             
-            # Save alerts if any were generated
-            if alerts:
-                # Only save actual alerts, not informational metrics
-                actual_alerts = [a for a in alerts if a['alert_status'] != 'informational']
-                
-                if actual_alerts:
-                    result = self.client.table('alerts').insert(actual_alerts).execute()
-                    if result.data:
-                        logger.info(f"Successfully triggered {len(actual_alerts)} alerts")
-                        return True
-                    else:
-                        logger.warning("No data returned when saving alerts")
-                        return False
-                else:
-                    logger.info("No actionable alerts to trigger (only informational metrics)")
+            if actual_alerts:
+                result = self.client.table('alerts').insert(actual_alerts).execute()
+                if result.data:
+                    logger.info(f"Successfully triggered {len(actual_alerts)} alerts")
                     return True
+                else:
+                    logger.warning("No data returned when saving alerts")
+                    return False
             else:
-                logger.info("No alerts to trigger")
+                logger.info("No actionable alerts to trigger")
                 return True
                 
         except Exception as e:
             logger.error(f"Error triggering alerts: {str(e)}")
             return False
 
+    def data_quality_record(self, table_name: str, quality_metrics: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the data_quality_assessments table row for one table"""
+        return {
+            'table_name': table_name,
+            'assessment_date': datetime.now().date().isoformat(),
+            'completeness_score': quality_metrics.get('completeness', 0.0),
+            'validity_score': quality_metrics.get('validity', 0.0),
+            'consistency_score': quality_metrics.get('consistency', 0.0),
+            'timeliness_score': quality_metrics.get('timeliness', 0.0),
+            'overall_score': (
+                quality_metrics.get('completeness', 0.0) +
+                quality_metrics.get('validity', 0.0) +
+                quality_metrics.get('consistency', 0.0) +
+                quality_metrics.get('timeliness', 0.0)
+            ) / 4,
+            'assessment_metadata': {
+                'generated_by': 'analytics_pipeline',
+                'assessment_timestamp': datetime.now().isoformat()
+            }
+        }
+
     def save_data_quality_metrics(self, table_name: str, quality_metrics: Dict[str, Any]) -> bool:
         """Save data quality metrics for a specific table"""
         if not self.client:
@@ -333,24 +475,7 @@ class SupabaseSyncManager:
             return False
         
         try:
-            quality_record = {
-                'table_name': table_name,
-                'assessment_date': datetime.now().date().isoformat(),
-                'completeness_score': quality_metrics.get('completeness', 0.0),
-                'validity_score': quality_metrics.get('validity', 0.0),
-                'consistency_score': quality_metrics.get('consistency', 0.0),
-                'timeliness_score': quality_metrics.get('timeliness', 0.0),
-                'overall_score': (
-                    quality_metrics.get('completeness', 0.0) +
-                    quality_metrics.get('validity', 0.0) +
-                    quality_metrics.get('consistency', 0.0) +
-                    quality_metrics.get('timeliness', 0.0)
-                ) / 4,
-                'assessment_metadata': {
-                    'generated_by': 'analytics_pipeline',
-                    'assessment_timestamp': datetime.now().isoformat()
-                }
-            }
+            quality_record = self.data_quality_record(table_name, quality_metrics)
             
             result = self.client.table('data_quality_assessments').insert(quality_record).execute()
             
@@ -365,68 +490,93 @@ class SupabaseSyncManager:
             logger.error(f"Error saving data quality metrics for {table_name}: {str(e)}")
             return False
 
-    def cleanup_old_data(self, retention_days: int = 365) -> Dict[str, Any]:
-        """Clean up old analytics data beyond retention period"""
+    def bulk_writer(self, **kwargs) -> Optional[BulkWriter]:
+        """Writer batching this run's output rows into as few requests as possible"""
+        if not self.client:
+            logger.warning("No Supabase client available")
+            return None
+        if supabase_breaker().state == OPEN:
+            # Writes are retried later (e.g. from the write-behind spool) instead of timing out
+            logger.warning("Supabase marked unavailable, not writing now")
+            return None
+        kwargs.setdefault('copy_backend', self.postgres)
+        return BulkWriter(self.client, client_key=self.supabase_url or 'default', **kwargs)
+
+    def bulk_load(self, table: str, df: pd.DataFrame, conflict_columns: Optional[List[str]] = None,
+                  **loader_kwargs) -> Dict[str, Any]:
+        """
+        Load a whole frame into ``table``: with COPY over the direct Postgres
+        connection when configured, otherwise as checkpointed PostgREST batches
+        """
+        if self.postgres:
+            start_time = datetime.now()
+            try:
+                self.postgres.copy_frame(table, df, conflict_columns=conflict_columns)
+                execution_time = (datetime.now() - start_time).total_seconds()
+                logger.info(f"Copied {len(df)} rows into {table} in {execution_time:.2f} seconds")
+                return {'success': True, 'table': table, 'method': 'copy', 'total_rows': len(df),
+                        'rows_committed': len(df), 'execution_time': execution_time}
+            except Exception as e:
+                logger.warning(f"COPY into {table} failed, loading through PostgREST: {str(e)}")
+        
+        if not self.client:
+            logger.warning("No Supabase client available")
+            return {'success': False, 'error': 'No client available'}
+        if conflict_columns:
+            loader_kwargs.setdefault('on_conflict', ','.join(conflict_columns))
+        result = BulkLoader(self.client, table, **loader_kwargs).load(df)
+        return {**result, 'method': 'postgrest'}
+
+    def cleanup_old_data(self, retention_days: int = 365, **kwargs) -> Dict[str, Any]:
+        """
+        Clean up old analytics data beyond retention period, in bounded date
+        windows per table (see retention_cleanup.RetentionCleaner for options)
+        """
         if not self.client:
             logger.warning("No Supabase client available")
             return {'success': False, 'error': 'No client available'}
         
         try:
-            cutoff_date = (datetime.now() - timedelta(days=retention_days)).date().isoformat()
-            cleanup_results = {}
-            
-            # Tables to clean up with their date columns
-            tables_to_cleanup = {
-                'forecasts': 'created_at',
-                'department_insights': 'insight_date',
-                'analytics_reports': 'created_at',
-                'data_quality_assessments': 'assessment_date',
-                'alerts': 'created_at'
-            }
-            
-            for table_name, date_column in tables_to_cleanup.items():
-                try:
-                    # Delete old records
-                    result = self.client.table(table_name).delete().lt(date_column, cutoff_date).execute()
-                    
-                    # Count deleted records (if data is returned)
-                    deleted_count = len(result.data) if result.data else 0
-                    cleanup_results[table_name] = {
-                        'deleted_records': deleted_count,
-                        'success': True
-                    }
-                    
-                    logger.info(f"Cleaned up {deleted_count} old records from {table_name}")
-                    
-                except Exception as table_error:
-                    cleanup_results[table_name] = {
-                        'deleted_records': 0,
-                        'success': False,
-                        'error': str(table_error)
-                    }
-                    logger.warning(f"Could not clean up {table_name}: {str(table_error)}")
-            
-            total_deleted = sum(
-                result.get('deleted_records', 0) 
-                for result in cleanup_results.values() 
-                if result.get('success', False)
-            )
-            
-            logger.info(f"Data cleanup completed. Total records deleted: {total_deleted}")
-            
-            return {
-                'success': True,
-                'total_deleted': total_deleted,
-                'table_results': cleanup_results,
-                'cutoff_date': cutoff_date
-            }
-            
+            return RetentionCleaner(self.client, **kwargs).run(retention_days)
         except Exception as e:
             logger.error(f"Error during data cleanup: {str(e)}")
             return {'success': False, 'error': str(e)}
 
-    def load_tourism_data(self, days_back: int = 365) -> Dict[str, pd.DataFrame]:
-        """Load tourism data from Supabase tables"""
+    def _select_columns(self, table: str, columns: Optional[Set[str]]) -> str:
+        """PostgREST select list for a table, projected onto the requested columns"""
+        if columns is None:
+            return '*'
+        # 'id' is always kept so tables without any requested column still report row counts
+        selected = [col for col in TOURISM_TABLE_COLUMNS.get(table, []) if col in columns or col == 'id']
+        return ','.join(selected) if selected else '*'
+
+    def _load_tourism_data_direct(self, days_back: int,
+                                  columns: Optional[Set[str]]) -> Optional[Dict[str, pd.DataFrame]]:
+        """Stream the source tables over the direct Postgres connection; None to fall back to PostgREST"""
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=days_back)
+        data = {}
+        try:
+            for table, date_column in TOURISM_DATE_COLUMNS.items():
+                projection = None if columns is None else {
+                    col for col in TOURISM_TABLE_COLUMNS[table] if col in columns or col == 'id'
+                }
+                data[table] = self.postgres.read_frame(
+                    table, columns=projection, date_column=date_column, start=start_date, end=end_date
+                )
+                logger.info(f"Loaded {len(data[table])} {table} records over direct Postgres")
+        except Exception as e:
+            logger.warning(f"Direct Postgres read failed, loading through PostgREST: {str(e)}")
+            return None
+        return data
+    
+    def load_tourism_data(self, days_back: int = 365, columns: Optional[Set[str]] = None) -> Dict[str, pd.DataFrame]:
+        """Load tourism data from Supabase tables (only ``columns`` when given)"""
+        if self.postgres:
+            data = self._load_tourism_data_direct(days_back, columns)
+            if data is not None:
+                return data
+        
         if not self.client:
             logger.warning("No Supabase client available")
             return {}
@@ -441,9 +591,9 @@ class SupabaseSyncManager:
             # Load arrivals data
             try:
                 arrivals_result = self.client.table('arrivals')\
-                    .select('*')\
-                    .gte('timestamp', start_date.isoformat())\
-                    .lte('timestamp', end_date.isoformat())\
+                    .select(self._select_columns('arrivals', columns))\
+                    .gte(TOURISM_DATE_COLUMNS['arrivals'], start_date.isoformat())\
+                    .lte(TOURISM_DATE_COLUMNS['arrivals'], end_date.isoformat())\
                     .execute()
                 
                 if arrivals_result.data:
@@ -459,9 +609,9 @@ class SupabaseSyncManager:
             # Load occupancy data
             try:
                 occupancy_result = self.client.table('occupancy')\
-                    .select('*')\
-                    .gte('date', start_date.isoformat())\
-                    .lte('date', end_date.isoformat())\
+                    .select(self._select_columns('occupancy', columns))\
+                    .gte(TOURISM_DATE_COLUMNS['occupancy'], start_date.isoformat())\
+                    .lte(TOURISM_DATE_COLUMNS['occupancy'], end_date.isoformat())\
                     .execute()
                 
                 if occupancy_result.data:
@@ -477,9 +627,9 @@ class SupabaseSyncManager:
             # Load visits data
             try:
                 visits_result = self.client.table('visits')\
-                    .select('*')\
-                    .gte('visit_date', start_date.isoformat())\
-                    .lte('visit_date', end_date.isoformat())\
+                    .select(self._select_columns('visits', columns))\
+                    .gte(TOURISM_DATE_COLUMNS['visits'], start_date.isoformat())\
+                    .lte(TOURISM_DATE_COLUMNS['visits'], end_date.isoformat())\
                     .execute()
                 
                 if visits_result.data:
@@ -495,9 +645,9 @@ class SupabaseSyncManager:
             # Load surveys data
             try:
                 surveys_result = self.client.table('surveys')\
-                    .select('*')\
-                    .gte('survey_date', start_date.isoformat())\
-                    .lte('survey_date', end_date.isoformat())\
+                    .select(self._select_columns('surveys', columns))\
+                    .gte(TOURISM_DATE_COLUMNS['surveys'], start_date.isoformat())\
+                    .lte(TOURISM_DATE_COLUMNS['surveys'], end_date.isoformat())\
                     .execute()
                 
                 if surveys_result.data:
@@ -523,6 +673,53 @@ class SupabaseSyncManager:
             logger.error(f"Error loading tourism data: {str(e)}")
             return {}
 
+    def load_daily_series(self, series: Optional[Dict[str, Optional[str]]] = None,
+                          days_back: int = 365) -> Dict[str, pd.DataFrame]:
+        """
+        Daily series aggregated in the database, keyed by series name.
+
+        ``series`` maps DAILY_SERIES names to the dimension to group by (None
+        for one row per day) and defaults to FORECAST_SERIES. Series that can
+        be read neither over direct Postgres nor through the daily_series RPC
+        are left out, so callers can fall back to grouping raw rows.
+        """
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=days_back)
+        loaded = {}
+
+        for name, group_by in (series if series is not None else FORECAST_SERIES).items():
+            spec = DAILY_SERIES[name]
+            if group_by is not None and group_by not in spec.dimensions:
+                raise ValueError(f"Series {name} cannot be grouped by {group_by}")
+
+            rows = None
+            if self.postgres:
+                try:
+                    rows = self.postgres.daily_aggregate(
+                        spec.table, spec.date_column, value_column=spec.value_column, per_column=spec.per_column,
+                        group_column=group_by, start=start_date, end=end_date
+                    )
+                except Exception as e:
+                    logger.warning(f"Direct Postgres aggregation of {name} failed: {str(e)}")
+
+            if rows is None and self.client:
+                try:
+                    rows = supabase_breaker().call(lambda: self.client.rpc(SERIES_RPC, {
+                        'series_name': name,
+                        'group_by': group_by,
+                        'start_date': start_date.isoformat(),
+                        'end_date': end_date.isoformat()
+                    }).execute().data)
+                except Exception as e:
+                    logger.warning(f"Could not load daily {name} series through {SERIES_RPC}: {str(e)}")
+
+            if rows is not None:
+                loaded[name] = series_frame(rows)
+                logger.info(f"Loaded {len(loaded[name])} daily {name} aggregates"
+                            f"{f' by {group_by}' if group_by else ''}")
+
+        return loaded
+
 # Simple test function
 if __name__ == "__main__":
     # Test the simplified sync manager
@@ -0,0 +1,180 @@
+"""
+Postgres Backend Tests
+======================
+The COPY text encoding is tested on its own; COPY loads, staged merges and
+streamed reads run against a real database and are skipped unless
+``POSTGRES_TEST_URL`` names one (e.g. a local throwaway Postgres). Each test
+creates and drops its own tables.
+
+    POSTGRES_TEST_URL=postgresql://postgres@localhost:5432/postgres python -m pytest -q test_postgres_backend.py
+"""
+
+import json
+import os
+import uuid
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from circuit_breaker import CircuitBreaker
+from postgres_backend import PSYCOPG2_AVAILABLE, PostgresBackend, encode_copy_text
+
+TEST_DB_URL = os.getenv('POSTGRES_TEST_URL')
+
+requires_database = pytest.mark.skipif(
+    not TEST_DB_URL or not PSYCOPG2_AVAILABLE, reason='POSTGRES_TEST_URL not set or psycopg2 not installed'
+)
+
+
+def _fields(text: str):
+    return [line.split('\t') for line in text.splitlines()]
+
+
+def test_encode_nulls():
+    frame = pd.DataFrame({
+        'name': ['a', None],
+        'count': pd.array([1, None], dtype='Int64'),
+        'amount': [1.5, np.nan],
+        'ok': pd.array([True, None], dtype='boolean'),
+    })
+    assert _fields(encode_copy_text(frame)) == [['a', '1', '1.5', 't'], ['\\N', '\\N', '\\N', '\\N']]
+
+
+def test_encode_escapes_tabs_newlines_and_backslashes():
+    frame = pd.DataFrame({'text': ['tab\there', 'line\nbreak\r', 'back\\slash']})
+    assert encode_copy_text(frame) == 'tab\\there\nline\\nbreak\\r\nback\\\\slash\n'
+
+
+def test_encode_nested_json():
+    nested = {'a': [1, {'b': 'x\ty'}], 'when': date(2024, 1, 2)}
+    field = encode_copy_text(pd.DataFrame({'meta': [nested]})).rstrip('\n')
+    # JSON escapes the tab as \t, whose backslash COPY escapes in turn
+    assert '\t' not in field
+    assert json.loads(field.replace('\\\\', '\\')) == {'a': [1, {'b': 'x\ty'}], 'when': '2024-01-02'}
+
+
+def test_encode_floats():
+    frame = pd.DataFrame({'value': [3.0, np.nan, 2.5, np.inf, 1e20]})
+    # Ints widened by a missing value are written without a fraction; huge integral floats keep repr()
+    assert encode_copy_text(frame).splitlines() == ['3', '\\N', '2.5', '\\N', '1e+20']
+
+
+def test_encode_empty_frame():
+    assert encode_copy_text(pd.DataFrame({'value': []})) == ''
+
+
+@pytest.fixture
+def backend():
+    backend = PostgresBackend(TEST_DB_URL, max_connections=2, breaker=CircuitBreaker('postgres_test'))
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def make_table(backend):
+    """Create uniquely named tables from column definitions; dropped after the test"""
+    created = []
+
+    def make(definition: str) -> str:
+        name = f"test_{uuid.uuid4().hex[:12]}"
+        with backend.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(f"CREATE TABLE {name} ({definition})")
+        created.append(name)
+        return name
+
+    yield make
+    with backend.connection() as conn, conn.cursor() as cursor:
+        for name in created:
+            cursor.execute(f"DROP TABLE IF EXISTS {name}")
+
+
+def _fetch(backend, query: str):
+    with backend.connection() as conn, conn.cursor() as cursor:
+        cursor.execute(query)
+        return cursor.fetchall()
+
+
+@requires_database
+def test_copy_frame_round_trip(backend, make_table):
+    table = make_table("name TEXT, count BIGINT, amount DOUBLE PRECISION, meta JSONB")
+    frame = pd.DataFrame({
+        'name': ['tab\there', 'line\nbreak', 'back\\slash', None],
+        # Widened to float64 by the missing value, still loadable into BIGINT
+        'count': [1, 2, None, 4],
+        'amount': [1.5, None, 2.0, 1e20],
+        'meta': [{'a': [1, {'b': None}]}, None, [1, 2], {'s': 'x\ny'}],
+    })
+    assert frame['count'].dtype == np.float64
+
+    backend.copy_frame(table, frame)
+
+    rows = _fetch(backend, f"SELECT name, count, amount, meta FROM {table} ORDER BY count NULLS LAST")
+    assert rows == [
+        ('tab\there', 1, 1.5, {'a': [1, {'b': None}]}),
+        ('line\nbreak', 2, None, None),
+        (None, 4, 1e20, {'s': 'x\ny'}),
+        ('back\\slash', None, 2.0, [1, 2]),
+    ]
+
+
+@requires_database
+def test_copy_frame_merges_on_conflict_columns(backend, make_table):
+    table = make_table("id SERIAL PRIMARY KEY, key TEXT UNIQUE, value INTEGER, content_hash TEXT")
+    frame = pd.DataFrame({'key': ['a', 'b'], 'value': [1, 2], 'content_hash': ['h1', 'h2']})
+
+    inserted = backend.copy_frame(table, frame, conflict_columns=['key'], returning='id')
+    assert len(inserted) == 2
+
+    # Same content hashes: the conflicting rows are left alone and nothing is returned
+    assert backend.copy_frame(table, frame, conflict_columns=['key'], returning='id') == []
+
+    changed = pd.DataFrame({'key': ['a', 'b', 'c'], 'value': [10, 2, 3], 'content_hash': ['h1x', 'h2', 'h3']})
+    assert len(backend.copy_frame(table, changed, conflict_columns=['key'], returning='id')) == 2
+    assert _fetch(backend, f"SELECT key, value, content_hash FROM {table} ORDER BY key") == [
+        ('a', 10, 'h1x'), ('b', 2, 'h2'), ('c', 3, 'h3')
+    ]
+
+    ignored = pd.DataFrame({'key': ['a'], 'value': [99], 'content_hash': ['h1y']})
+    assert backend.copy_frame(table, ignored, conflict_columns=['key'], update=False, returning='id') == []
+    assert _fetch(backend, f"SELECT value FROM {table} WHERE key = 'a'") == [(10,)]
+
+
+@requires_database
+def test_stream_batches_projection_filter_and_types(backend, make_table):
+    table = make_table("label TEXT, happened_at TIMESTAMPTZ, amount NUMERIC(12, 2), day DATE, meta JSONB")
+    frame = pd.DataFrame({
+        'label': [f"row{i}" for i in range(5)],
+        'happened_at': [datetime(2024, 1, i + 1, 12, tzinfo=timezone.utc) for i in range(5)],
+        'amount': [10.25 * (i + 1) for i in range(5)],
+        'day': [date(2024, 1, i + 1) for i in range(5)],
+        'meta': [{'i': i} for i in range(5)],
+    })
+    backend.copy_frame(table, frame)
+
+    # Unknown columns are ignored, and the projection keeps table order
+    batches = list(backend.stream_batches(
+        table, columns=['meta', 'day', 'amount', 'happened_at', 'missing'], date_column='day',
+        start=date(2024, 1, 2), end=date(2024, 1, 4), batch_rows=2
+    ))
+    assert [batch.num_rows for batch in batches] == [2, 1]
+
+    schema = batches[0].schema
+    assert schema.names == ['happened_at', 'amount', 'day', 'meta']
+    assert str(schema.field('happened_at').type) == 'timestamp[us, tz=UTC]'
+    assert str(schema.field('amount').type) == 'double'
+    assert str(schema.field('day').type) == 'date32[day]'
+    assert str(schema.field('meta').type) == 'string'
+
+    rows = [row for batch in batches for row in batch.to_pylist()]
+    assert sorted(row['day'] for row in rows) == [date(2024, 1, 2), date(2024, 1, 3), date(2024, 1, 4)]
+    assert sorted(row['amount'] for row in rows) == [20.5, 30.75, 41.0]
+    assert sorted(json.loads(row['meta'])['i'] for row in rows) == [1, 2, 3]
+    assert min(row['happened_at'] for row in rows) == datetime(2024, 1, 2, 12, tzinfo=timezone.utc)
+
+
+@requires_database
+def test_stream_batches_without_matching_columns(backend, make_table):
+    table = make_table("label TEXT")
+    assert list(backend.stream_batches(table, columns=['missing'])) == []
@@ -10,9 +10,9 @@ import os
 import sys
 import json
 import logging
-import schedule
 import time
-import pandas as pd
+import threading
+import uuid
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import argparse
@@ -22,17 +22,14 @@ from pathlib import Path
 current_dir = Path(__file__).parent
 sys.path.append(str(current_dir))
 
-# Import our custom modules
-from tourism_insights_engine import TourismInsightsEngine
+# The insights engine (pandas, forecasting libraries) and the sync manager
+# (Supabase client) are imported on first use, so metadata commands such as
+# `status` stay fast and never touch the network.
 
-# Use simplified sync manager by default  
-try:
-    from supabase_sync_simple import SupabaseSyncManager
-except ImportError:
-    try:
-        from supabase_sync import SupabaseSyncManager  
-    except ImportError:
-        SupabaseSyncManager = None
+from analytics_cache import get_cache_dir
+from lazy_imports import get_sync_manager_class
+
+_UNSET = object()
 
 # Configure logging
 logging.basicConfig(
@@ -52,29 +49,201 @@ class TourismAnalyticsOrchestrator:
     
     def __init__(self, config: Dict[str, Any] = None):
         self.config = config or self._load_config()
-        self.insights_engine = TourismInsightsEngine(
-            self.config.get('supabase_url'),
-            self.config.get('supabase_key')
-        )
+        # Shared by the per-request processes the API route spawns (spool, record hashes, breaker state)
+        self.cache_dir = get_cache_dir(self.config.get('cache_dir'))
         
-        # Initialize sync manager with error handling
+        # Built on first use (see the properties below)
+        self._insights_engine = None
+        self._sync_manager = _UNSET
+        self._write_behind = _UNSET
+        
+        # Track operation status
+        self.last_run_timestamp = None
+        self.operation_history = []
+        
+        # Data fingerprints behind the last successful writes, so unchanged results are not rewritten
+        self._persist_state_path = os.path.join(self.cache_dir, 'persisted_fingerprints.json')
+        self._persisted_fingerprints = self._load_persisted_fingerprints()
+        self._persist_lock = threading.Lock()
+        # Entries (fingerprint plus details) of results spooled for writing but not yet written
+        self._pending_fingerprints: Dict[str, Dict[str, Any]] = {}
+    
+    @property
+    def insights_engine(self):
+        """Insights engine, created on first use"""
+        if self._insights_engine is None:
+            from tourism_insights_engine import TourismInsightsEngine
+            self._insights_engine = TourismInsightsEngine(
+                self.config.get('supabase_url'),
+                self.config.get('supabase_key'),
+                cache_dir=self.cache_dir
+            )
+        return self._insights_engine
+    
+    @insights_engine.setter
+    def insights_engine(self, engine):
+        self._insights_engine = engine
+    
+    @property
+    def sync_manager(self):
+        """Sync manager, connected on first use (None when running offline)"""
+        if self._sync_manager is _UNSET:
+            self._sync_manager = self._create_sync_manager()
+        return self._sync_manager
+    
+    @sync_manager.setter
+    def sync_manager(self, manager):
+        self._sync_manager = manager
+        self._write_behind = _UNSET
+    
+    @property
+    def write_behind(self):
+        """Write-behind queue, opened (and replaying its spool) on first use"""
+        if self._write_behind is _UNSET:
+            self._write_behind = self._create_write_behind(self.cache_dir)
+        return self._write_behind
+    
+    @write_behind.setter
+    def write_behind(self, queue):
+        self._write_behind = queue
+    
+    def _create_sync_manager(self):
+        """Initialize sync manager with error handling"""
         try:
+            SupabaseSyncManager = get_sync_manager_class()
             if SupabaseSyncManager and self.config.get('supabase_url') and self.config.get('supabase_key'):
-                self.sync_manager = SupabaseSyncManager(
+                sync_manager = SupabaseSyncManager(
                     self.config.get('supabase_url'),
-                    self.config.get('supabase_key')
+                    self.config.get('supabase_key'),
+                    cache_dir=self.cache_dir
                 )
                 logger.info("Sync manager initialized successfully")
-            else:
-                self.sync_manager = None
-                logger.warning("Sync manager not available - running in offline mode")
+                return sync_manager
+            logger.warning("Sync manager not available - running in offline mode")
         except Exception as e:
             logger.warning(f"Could not initialize sync manager: {str(e)} - running in offline mode")
-            self.sync_manager = None
+        return None
+    
+    def _create_write_behind(self, cache_dir: Optional[str]):
+        """Durable write-behind queue, or None to persist synchronously"""
+        spool_path = self.config.get('write_behind_spool') or os.getenv('ANALYTICS_WRITE_BEHIND_SPOOL') or (
+            os.path.join(cache_dir, 'write_behind.sqlite') if cache_dir else None
+        )
+        enabled = str(self.config.get('write_behind', os.getenv('ANALYTICS_WRITE_BEHIND', 'true'))).lower() != 'false'
+        if not spool_path or not enabled or not self.sync_manager:
+            return None
+        try:
+            from supabase_clients import supabase_breaker
+            from write_behind import WriteBehindQueue
+            return WriteBehindQueue(
+                self.sync_manager.bulk_writer,
+                spool_path,
+                exit_timeout=float(os.getenv('ANALYTICS_WRITE_BEHIND_EXIT_TIMEOUT', 60)),
+                # While Supabase is unreachable batches wait for the breaker's next trial request
+                unavailable_for=lambda: supabase_breaker().retry_in()
+            ).start()
+        except Exception as e:
+            logger.warning(f"Could not open write-behind spool at {spool_path}: {str(e)} - persisting synchronously")
+            return None
+    
+    def _load_persisted_fingerprints(self) -> Dict[str, Any]:
+        """Load the fingerprints of previously persisted results"""
+        if not self._persist_state_path or not os.path.exists(self._persist_state_path):
+            return {}
+        try:
+            with open(self._persist_state_path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load persisted fingerprints: {str(e)}")
+            return {}
+    
+    def _persisted_entry(self, kind: str, fingerprint: Optional[str]) -> Optional[Dict[str, Any]]:
+        """The written (or spooled) entry of this kind for the same data fingerprint, if any"""
+        if fingerprint is None:
+            return None
+        for entries in (self._pending_fingerprints, self._persisted_fingerprints):
+            entry = entries.get(kind)
+            if entry and entry.get('fingerprint') == fingerprint:
+                return entry
+        return None
+    
+    def _is_persisted(self, kind: str, fingerprint: Optional[str]) -> bool:
+        """Whether results of this kind were already written (or spooled) for the same data fingerprint"""
+        return self._persisted_entry(kind, fingerprint) is not None
+    
+    def _mark_persisted(self, kind: str, fingerprint: Optional[str], **details):
+        """Remember the data fingerprint behind a successful write"""
+        if fingerprint is None:
+            return
+        with self._persist_lock:
+            self._persisted_fingerprints[kind] = {'fingerprint': fingerprint, **details}
+            if self._persist_state_path:
+                try:
+                    os.makedirs(os.path.dirname(self._persist_state_path), exist_ok=True)
+                    # Written atomically: the daemon, CLI runs and write-behind callbacks share the file
+                    tmp_path = f"{self._persist_state_path}.{os.getpid()}.tmp"
+                    with open(tmp_path, 'w') as f:
+                        json.dump(self._persisted_fingerprints, f)
+                    os.replace(tmp_path, self._persist_state_path)
+                except Exception as e:
+                    logger.warning(f"Could not save persisted fingerprints: {str(e)}")
+    
+    def _persist_rows(self, rows: Dict[str, List[Dict[str, Any]]], queued: Dict[str, tuple]) -> str:
+        """
+        Persist a run's rows: spooled to the write-behind queue when available,
+        otherwise written synchronously in one batch. ``queued`` maps result
+        kinds to (table, fingerprint, details) marked persisted once written.
         
-        # Track operation status
-        self.last_run_timestamp = None
-        self.operation_history = []
+        Returns 'none', 'queued', 'written', 'partial' or 'failed'.
+        """
+        if not any(rows.values()):
+            return 'none'
+        
+        on_complete = lambda saved, failed: self._on_rows_persisted(queued, failed, rows)
+        
+        if self.write_behind:
+            try:
+                self.write_behind.submit(rows, on_complete=on_complete)
+                for kind, (_, kind_fingerprint, details) in queued.items():
+                    if kind_fingerprint is not None:
+                        self._pending_fingerprints[kind] = {'fingerprint': kind_fingerprint, **details}
+                return 'queued'
+            except Exception as e:
+                logger.warning(f"Could not spool analytics results, writing synchronously: {str(e)}")
+        
+        writer = self.sync_manager.bulk_writer() if self.sync_manager else None
+        if writer is None:
+            return 'failed'
+        try:
+            for table, table_rows in rows.items():
+                writer.add(table, table_rows)
+            saved = writer.flush()
+            on_complete(saved, writer.failed)
+        except Exception as e:
+            logger.warning(f"Could not persist analytics results: {str(e)}")
+            return 'failed'
+        if not writer.failed:
+            return 'written'
+        return 'partial' if any(saved.values()) else 'failed'
+    
+    def _on_rows_persisted(self, queued: Dict[str, tuple], failed: Dict[str, List[Dict[str, Any]]],
+                           rows: Optional[Dict[str, List[Dict[str, Any]]]] = None):
+        """Mark result kinds (and the record hashes of rows) that were written as persisted"""
+        if rows and self.sync_manager:
+            for table, table_rows in rows.items():
+                # Failed rows may be copies (e.g. replayed from the spool), so match them by hash
+                failed_hashes = {row.get('content_hash') for row in failed.get(table, [])}
+                self.sync_manager.mark_records_written(
+                    table, [row for row in table_rows if row.get('content_hash') not in failed_hashes]
+                )
+        for kind, (table, kind_fingerprint, details) in queued.items():
+            if table in failed:
+                logger.warning(f"Could not save {table}: {len(failed[table])} rows failed")
+            else:
+                self._mark_persisted(kind, kind_fingerprint, **details)
+            # No longer pending either way; results that failed are written again by the next run
+            if self._pending_fingerprints.get(kind, {}).get('fingerprint') == kind_fingerprint:
+                self._pending_fingerprints.pop(kind, None)
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from environment variables or config file"""
@@ -109,58 +278,92 @@ class TourismAnalyticsOrchestrator:
         
         return config
     
-    def run_full_analytics_pipeline(self) -> Dict[str, Any]:
+    def run_full_analytics_pipeline(self, sections: Optional[List[str]] = None) -> Dict[str, Any]:
         """
-        Run the complete analytics pipeline
+        Run the complete analytics pipeline.
+        
+        When ``sections`` is given only those report sections are computed and
+        returned; the partial report is not persisted as a comprehensive report.
         """
-        logger.info("Starting full analytics pipeline")
+        logger.info(f"Starting full analytics pipeline (sections: {', '.join(sections) if sections else 'all'})")
         start_time = datetime.now()
         
         try:
-            # Generate comprehensive report
-            report = self.insights_engine.generate_comprehensive_report()
+            # Generate comprehensive report (sections are evaluated lazily)
+            report = self.insights_engine.generate_comprehensive_report(sections=sections)
             
             if 'error' in report:
                 logger.error(f"Analytics generation failed: {report['error']}")
                 return {'success': False, 'error': report['error']}
             
-            # Save forecasts to database
-            if 'forecasts' in report and self.sync_manager:
-                try:
-                    forecast_saved = self.sync_manager.save_forecasts(report['forecasts'])
-                    logger.info(f"Forecasts saved: {forecast_saved}")
-                except Exception as e:
-                    logger.warning(f"Could not save forecasts: {str(e)}")
+            # Results derived from unchanged data (same fingerprint, same day) are not rewritten
+            data_digest = report.section('report_metadata').get('data_fingerprint')
+            fingerprint = f"{data_digest}|{datetime.now().date()}" if data_digest else None
             
-            # Save department insights
-            if 'departmental_insights' in report and self.sync_manager:
-                try:
-                    insights_saved = self.sync_manager.save_department_insights(
-                        report['departmental_insights']
-                    )
-                    logger.info(f"Department insights saved: {insights_saved}")
-                except Exception as e:
-                    logger.warning(f"Could not save department insights: {str(e)}")
+            # Collect all rows of this run; they are persisted in one batch
+            rows: Dict[str, List[Dict[str, Any]]] = {}
+            queued: Dict[str, tuple] = {}
+            report_id = None
             
-            # Save comprehensive report
             if self.sync_manager:
-                try:
-                    report_id = self.sync_manager.save_analytics_report(report)
-                    logger.info(f"Analytics report saved with ID: {report_id}")
-                except Exception as e:
-                    logger.warning(f"Could not save analytics report: {str(e)}")
-                    report_id = f"local_{int(time.time())}"
-            else:
-                report_id = f"local_{int(time.time())}"
+                if 'forecasts' in report:
+                    if self._is_persisted('forecasts', fingerprint):
+                        logger.info("Forecasts unchanged since last save, skipping write")
+                    else:
+                        rows['forecasts'] = self.sync_manager.changed_records(
+                            'forecasts', self.sync_manager.forecast_records(report['forecasts'])
+                        )
+                        queued['forecasts'] = ('forecasts', fingerprint, {})
+                
+                if 'departmental_insights' in report:
+                    insights_fingerprint = f"{fingerprint}|{','.join(report['departmental_insights'])}" if fingerprint else None
+                    if self._is_persisted('department_insights', insights_fingerprint):
+                        logger.info("Department insights unchanged since last save, skipping write")
+                    else:
+                        rows['department_insights'] = self.sync_manager.changed_records(
+                            'department_insights',
+                            self.sync_manager.department_insight_records(report['departmental_insights'])
+                        )
+                        queued['department_insights'] = ('department_insights', insights_fingerprint, {})
+                
+                # Comprehensive report (partial reports are not persisted)
+                if not sections:
+                    persisted_report = self._persisted_entry('analytics_report', fingerprint)
+                    if persisted_report is not None:
+                        report_id = persisted_report.get('report_id')
+                        logger.info(f"Analytics report unchanged, reusing report ID: {report_id}")
+                    else:
+                        # Sections are stored as deduplicated blobs; blobs referenced by the
+                        # previous report are already stored and not sent again
+                        previous = self._persisted_fingerprints.get('analytics_report', {})
+                        report_rows, blob_hashes = self.sync_manager.analytics_report_rows(
+                            report,
+                            known_hashes=set(previous.get('blob_hashes', [])),
+                            previous_refs=previous.get('content_refs'),
+                            base_report_id=previous.get('report_id')
+                        )
+                        # The id is assigned here so it can be returned before the write completes
+                        report_id = str(uuid.uuid4())
+                        report_record = report_rows['analytics_reports'][0]
+                        report_record['id'] = report_id
+                        rows.update(report_rows)
+                        queued['analytics_report'] = ('analytics_reports', fingerprint, {
+                            'report_id': report_id,
+                            'blob_hashes': blob_hashes,
+                            'content_refs': report_record['content_refs']
+                        })
+                
+                if 'departmental_insights' in report:
+                    rows['alerts'] = self.sync_manager.alert_records(self._extract_alert_data(report))
             
-            # Trigger alerts if needed
-            if self.sync_manager:
-                try:
-                    alert_data = self._extract_alert_data(report)
-                    alerts_triggered = self.sync_manager.trigger_alerts(alert_data)
-                    logger.info(f"Alerts processed: {alerts_triggered}")
-                except Exception as e:
-                    logger.warning(f"Could not process alerts: {str(e)}")
+            persistence = self._persist_rows(rows, queued)
+            if 'analytics_report' in queued and (persistence == 'failed' or (
+                    persistence == 'partial'
+                    and self._persisted_fingerprints.get('analytics_report', {}).get('report_id') != report_id)):
+                report_id = None
+            
+            if report_id is None and not sections:
+                report_id = f"local_{int(time.time())}"
             
             # Record operation
             execution_time = (datetime.now() - start_time).total_seconds()
@@ -168,12 +371,24 @@ class TourismAnalyticsOrchestrator:
             
             logger.info(f"Full analytics pipeline completed in {execution_time:.2f} seconds")
             
+            if sections:
+                return {
+                    'success': True,
+                    'report_id': report_id,
+                    'persistence': persistence,
+                    'execution_time': execution_time,
+                    'timestamp': datetime.now().isoformat(),
+                    'sections': report.to_dict(),
+                    'data_sources_used': self._get_data_sources_info()
+                }
+            
             # Enhanced response with dimensional analysis
             summary = report.get('executive_summary', {})
             
             return {
                 'success': True,
                 'report_id': report_id,
+                'persistence': persistence,
                 'execution_time': execution_time,
                 'timestamp': datetime.now().isoformat(),
                 'summary': {
@@ -204,9 +419,10 @@ class TourismAnalyticsOrchestrator:
             # Load data
             client = self.insights_engine.connect_to_supabase()
             data = self.insights_engine.load_tourism_data(client)
+            series = self.insights_engine.load_daily_series(client)
             
             # Generate forecasts (needed for insights)
-            forecasts = self.insights_engine.generate_forecasts(data)
+            forecasts = self.insights_engine.generate_forecasts(data, series=series)
             
             # Generate insights
             if department:
@@ -274,14 +490,28 @@ class TourismAnalyticsOrchestrator:
         try:
             # Load data
             client = self.insights_engine.connect_to_supabase()
-            data = self.insights_engine.load_tourism_data(client)
+            # Daily series aggregated in the database; raw rows only when a series is unavailable
+            from daily_series import FORECAST_SERIES
+            series = self.insights_engine.load_daily_series(client)
+            if set(FORECAST_SERIES) <= set(series):
+                data = {}
+            else:
+                data = self.insights_engine.load_tourism_data(client)
             
             # Generate forecasts
             forecast_days = self.config.get('forecast_days', 30)
-            forecasts = self.insights_engine.generate_forecasts(data, forecast_days)
-            
-            # Save forecasts
-            saved = self.sync_manager.save_forecasts(forecasts)
+            forecasts = self.insights_engine.generate_forecasts(data, forecast_days, series=series)
+            
+            # Save forecasts unless the same data was already forecast and saved today
+            fingerprint = f"{self.insights_engine.forecast_fingerprint(data, series)}|" \
+                          f"{datetime.now().date()}|{forecast_days}"
+            if self._is_persisted('forecasts_update', fingerprint):
+                logger.info("Forecasts unchanged since last save, skipping write")
+                saved = True
+            else:
+                saved = self.sync_manager.save_forecasts(forecasts)
+                if saved:
+                    self._mark_persisted('forecasts_update', fingerprint)
             
             execution_time = (datetime.now() - start_time).total_seconds()
             self._record_operation('forecasts_update', execution_time, saved)
@@ -327,9 +557,13 @@ class TourismAnalyticsOrchestrator:
                 }
                 
                 quality_results[table_name] = table_quality
-                
-                # Save quality metrics
-                self.sync_manager.save_data_quality_metrics(table_name, table_quality)
+            
+            # Save quality metrics for all tables in one batch
+            if self.sync_manager and quality_results:
+                self._persist_rows({'data_quality_assessments': [
+                    self.sync_manager.data_quality_record(table_name, table_quality)
+                    for table_name, table_quality in quality_results.items()
+                ]}, {})
             
             execution_time = (datetime.now() - start_time).total_seconds()
             self._record_operation('data_quality_check', execution_time, True)
@@ -356,15 +590,23 @@ class TourismAnalyticsOrchestrator:
         start_time = datetime.now()
         
         try:
-            cleaned = self.sync_manager.cleanup_old_data()
+            cleaned = self.sync_manager.cleanup_old_data(
+                retention_days=self.config.get('data_retention_days', 365),
+                checkpoint_dir=self.cache_dir
+            )
+            success = bool(cleaned.get('success'))
             
             execution_time = (datetime.now() - start_time).total_seconds()
-            self._record_operation('cleanup', execution_time, cleaned)
+            self._record_operation('cleanup', execution_time, success, cleaned.get('error'))
             
             logger.info(f"Data cleanup completed in {execution_time:.2f} seconds")
             
             return {
-                'success': cleaned,
+                'success': success,
+                'complete': cleaned.get('complete', False),
+                'total_deleted': cleaned.get('total_deleted', 0),
+                'table_results': cleaned.get('table_results', {}),
+                'cutoff_date': cleaned.get('cutoff_date'),
                 'execution_time': execution_time,
                 'timestamp': datetime.now().isoformat()
             }
@@ -433,6 +675,8 @@ class TourismAnalyticsOrchestrator:
     
     def _check_timeliness(self, df, table_name: str) -> float:
         """Check data timeliness (how recent the data is)"""
+        import pandas as pd
+        
         if df.empty:
             return 0.0
         
@@ -481,6 +725,8 @@ class TourismAnalyticsOrchestrator:
     
     def setup_scheduled_jobs(self):
         """Set up scheduled jobs for automated analytics"""
+        import schedule
+        
         logger.info("Setting up scheduled jobs")
         
         # Daily insights generation (6 AM)
@@ -502,6 +748,8 @@ class TourismAnalyticsOrchestrator:
     
     def run_scheduler(self):
         """Run the scheduler indefinitely"""
+        import schedule
+        
         logger.info("Starting scheduler...")
         
         while True:
@@ -526,15 +774,51 @@ class TourismAnalyticsOrchestrator:
         
         return sources_info
 
+def emit_result(result: Dict[str, Any]):
+    """
+    Print a command result. When ANALYTICS_RESULT_FD names an inherited pipe,
+    the result is also written there and the pipe closed, so the caller can
+    use it while spooled writes are still draining before exit.
+    """
+    output = json.dumps(result, indent=2, default=str)
+    print(output)
+    sys.stdout.flush()
+    result_fd = os.getenv('ANALYTICS_RESULT_FD')
+    if result_fd:
+        try:
+            with os.fdopen(int(result_fd), 'w') as f:
+                f.write(output)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not write result to fd {result_fd}: {str(e)}")
+
+# Commands that return a result (the CLI and analytics_daemon.py both dispatch them through run_command)
+RESULT_COMMANDS = ['run-pipeline', 'run-insights', 'run-forecasts', 'run-quality-check', 'cleanup', 'status']
+
+def run_command(orchestrator: TourismAnalyticsOrchestrator, command: str, department: Optional[str] = None,
+                sections: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run one of RESULT_COMMANDS and return its result"""
+    if command == 'run-pipeline':
+        return orchestrator.run_full_analytics_pipeline(sections)
+    if command == 'run-insights':
+        return orchestrator.run_department_insights(department)
+    if command == 'run-forecasts':
+        return orchestrator.run_forecasts_update()
+    if command == 'run-quality-check':
+        return orchestrator.run_data_quality_check()
+    if command == 'cleanup':
+        return orchestrator.cleanup_old_data()
+    if command == 'status':
+        return orchestrator.get_status()
+    raise ValueError(f"Unknown command: {command}")
+
 def main():
     """Main CLI interface"""
     parser = argparse.ArgumentParser(description='Ethiopia Tourism Analytics Orchestrator')
-    parser.add_argument('command', choices=[
-        'run-pipeline', 'run-insights', 'run-forecasts', 'run-quality-check',
-        'cleanup', 'status', 'schedule', 'test'
-    ], help='Command to execute')
+    parser.add_argument('command', choices=RESULT_COMMANDS + ['schedule', 'test'], help='Command to execute')
     parser.add_argument('--department', type=str, help='Specific department for insights')
     parser.add_argument('--config', type=str, help='Config file path')
+    parser.add_argument('--sections', type=str,
+                        help='Comma-separated report sections to compute (e.g. forecasts,dimensional_analysis.regions)')
     
     args = parser.parse_args()
     
@@ -546,29 +830,9 @@ def main():
     orchestrator = TourismAnalyticsOrchestrator()
     
     try:
-        if args.command == 'run-pipeline':
-            result = orchestrator.run_full_analytics_pipeline()
-            print(json.dumps(result, indent=2))
-        
-        elif args.command == 'run-insights':
-            result = orchestrator.run_department_insights(args.department)
-            print(json.dumps(result, indent=2))
-        
-        elif args.command == 'run-forecasts':
-            result = orchestrator.run_forecasts_update()
-            print(json.dumps(result, indent=2))
-        
-        elif args.command == 'run-quality-check':
-            result = orchestrator.run_data_quality_check()
-            print(json.dumps(result, indent=2))
-        
-        elif args.command == 'cleanup':
-            result = orchestrator.cleanup_old_data()
-            print(json.dumps(result, indent=2))
-        
-        elif args.command == 'status':
-            status = orchestrator.get_status()
-            print(json.dumps(status, indent=2))
+        if args.command in RESULT_COMMANDS:
+            sections = [name for name in args.sections.split(',') if name.strip()] if args.sections else None
+            emit_result(run_command(orchestrator, args.command, args.department, sections))
         
         elif args.command == 'schedule':
             orchestrator.setup_scheduled_jobs()
@@ -581,7 +845,7 @@ def main():
     
     except Exception as e:
         logger.error(f"Command failed: {str(e)}")
-        print(json.dumps({'success': False, 'error': str(e)}, indent=2))
+        emit_result({'success': False, 'error': str(e)})
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
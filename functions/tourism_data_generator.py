@@ -0,0 +1,328 @@
+"""
+Tourism Data Generator
+======================
+Vectorized synthetic tourist records in the flat ``tourism_data`` shape.
+
+Every column is drawn as one NumPy array from a seeded
+``numpy.random.Generator``; sector-specific columns are filled through
+sector masks and left missing for the other sectors. Categorical columns
+are built from integer codes (``pd.Categorical``), so generating tens of
+millions of rows costs a few arrays per column instead of a Python loop
+with a dict per record.
+
+Arrival times follow a ``Seasonality``: a weight per day of the window
+(yearly cycle, weekday profile, growth trend and holiday spikes) and per
+hour of the day. Rows draw their day and hour from those weights, so the
+time series carry the patterns the forecasting and time-pattern code
+paths look for.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field, fields
+from datetime import date, timedelta
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SECTORS = ['airlines', 'hotels', 'regional_tourism', 'travel_agencies', 'other']
+DEFAULT_ROWS = 500_000
+# Arrival dates span this many days, ending today unless a start date is given
+DEFAULT_DAYS = 365
+# Equal share per sector
+DEFAULT_SECTOR_MIX = {sector: 1.0 / len(SECTORS) for sector in SECTORS}
+
+REGION_DESTINATIONS = {
+    "Addis Ababa": [
+        "National Museum of Ethiopia",
+        "Entoto Hills",
+        "Red Terror Martyrs' Memorial Museum",
+        "Holy Trinity Cathedral",
+        "Friendship Park",
+        "Unity Park",
+        "Adwa Victory Monument",
+    ],
+    "Oromia": [
+        "Bale Mountains",
+        "Awash National Park",
+        "Wonchi",
+        "Sof Omar Caves",
+        "Wenchi Crater Lake",
+        "Lake Langano",
+        "Rift Valley Lakes",
+        "Aba Jifar Palace",
+        "Jimma Museum",
+        "Melka Kunture",
+        "Babugaya"
+    ],
+    "Amhara": [
+        "Lalibela Churches",
+        "Blue Nile Gorge",
+        "Gondar & Fasil Ghebbi",
+        "Tiya Stelae Field",
+        "Simien Mountains National Park",
+        "Gorgora",
+        "Lake Tana",
+        "Blue Nile Falls"
+    ],
+    "Tigray": [
+        "Axum Obelisks",
+        "Gheralta Rock-Hewn Churches",
+        "Rock-Hewn Churches of Tigray",
+        "Yeha&apos;s Temple",
+        "Northern Stelae Field",
+        "Monastery of Debre Damo",
+        "Gheralta Rock"
+    ],
+    "Somali": [
+        "Sodore Hot Springs",
+        "Laas Geel",
+        "Gode",
+        "Kebri Dar"
+    ],
+    "SNNPR": [
+        "Omo Valley",
+        "Konso Cultural Landscape",
+        "Lake Abaya",
+        "Lakes Chamo and Abaya",
+        "Nechisar National Park",
+        "Arba Minch",
+        "Dorze Village",
+        "Abijatta-Shalla Lakes National Park",
+        "Koysha"
+    ],
+    "Afar": [
+        "Danakil Depression",
+        "Erta Ale volcano",
+        "Yangudi Rassa National Park"
+    ],
+    "Harari": [
+        "Harar Old City"
+    ]
+}
+REGIONS = list(REGION_DESTINATIONS)
+
+# Drawn uniformly; repeated entries are intentionally more frequent
+NATIONALITIES = [
+    'UK', 'China', 'India', 'Germany', 'France', 'Italy', 'Brazil', 'Canada',
+    'Australia', 'Japan', 'South Korea', 'Russia', 'Turkey', 'Egypt', 'Morocco', 'Algeria', 'Morocco', 'Algeria',
+    'Saudi Arabia', 'United Kingdom', 'United States', 'Canada', 'Australia', 'Ethiopia', 'Spain', 'Mexico',
+    'South Africa', 'Switzerland', 'Netherlands', 'Thailand', 'Indonesia', 'Vietnam', 'Malaysia', 'Singapore',
+    'New Zealand', 'Argentina', 'Chile', 'Colombia', 'Peru'
+]
+SEXES = ['Male', 'Female']
+PACKAGE_TYPES = ['budget', 'standard', 'premium']
+
+SENTIMENT_WEIGHTS = {'positive': 0.60, 'negative': 0.25, 'neutral': 0.15}
+SENTIMENT_COMMENTS = {
+    'positive': ["Excellent experience", "Loved it", "Highly recommended", "Fantastic service", "Will return"],
+    'negative': ["Very disappointed", "Not worth it", "Terrible service", "Would not recommend", "Poor experience"],
+    'neutral': ["It was okay", "Average", "Nothing special", "Mediocre", "So-so"]
+}
+
+
+# Ethiopian holidays (month-day) and the multiplier on arrivals that day
+HOLIDAY_SPIKES = {
+    '01-07': 1.8,  # Genna (Christmas)
+    '01-19': 2.5,  # Timkat (Epiphany)
+    '03-02': 1.3,  # Adwa Victory Day
+    '09-11': 1.6,  # Enkutatash (New Year)
+    '09-27': 2.0,  # Meskel
+}
+
+# Share of arrivals per hour of the day (international flights land early morning and evening)
+HOURLY_PROFILE = (
+    0.6, 0.4, 0.3, 0.3, 0.5, 1.0, 1.6, 2.0, 1.8, 1.4, 1.2, 1.1,
+    1.0, 1.0, 1.1, 1.2, 1.3, 1.5, 1.8, 2.0, 1.7, 1.3, 1.0, 0.8
+)
+
+
+@dataclass
+class Seasonality:
+    """Relative arrival intensity over the days of the year, the week and the hours of the day"""
+    yearly_amplitude: float = 0.35  # Peak-season uplift over the yearly mean
+    yearly_peak_day: int = 15  # Day of the year the season peaks (mid-January high season)
+    weekly_profile: Tuple[float, ...] = (0.9, 0.85, 0.9, 0.95, 1.15, 1.25, 1.0)  # Monday first
+    hourly_profile: Tuple[float, ...] = HOURLY_PROFILE
+    annual_growth: float = 0.08  # Trend: arrivals grow by this fraction per year
+    holidays: Dict[str, float] = field(default_factory=lambda: dict(HOLIDAY_SPIKES))
+    holiday_spread_days: int = 2  # Days on either side of a holiday share part of its spike
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> 'Seasonality':
+        known = {f.name for f in fields(cls)}
+        unknown = set(values) - known
+        if unknown:
+            raise ValueError(f"Unknown seasonality settings: {', '.join(sorted(unknown))}")
+        return cls(**{key: tuple(value) if isinstance(value, list) else value for key, value in values.items()})
+
+    def daily_weights(self, start_date: date, days: int) -> np.ndarray:
+        """Relative arrival intensity of each day from ``start_date``"""
+        dates = np.datetime64(start_date, 'D') + np.arange(days)
+        day_of_year = (dates - dates.astype('datetime64[Y]')).astype(np.int64)
+        yearly = 1 + self.yearly_amplitude * np.cos(2 * np.pi * (day_of_year - self.yearly_peak_day) / 365.25)
+        # 1970-01-01 was a Thursday
+        weekday = (dates.astype(np.int64) + 3) % 7
+        weekly = np.asarray(self.weekly_profile, dtype=float)[weekday]
+        trend = (1 + self.annual_growth) ** (np.arange(days) / 365.25)
+
+        holiday = np.ones(days)
+        month = dates.astype('datetime64[M]').astype(np.int64) % 12 + 1
+        day_of_month = (dates - dates.astype('datetime64[M]')).astype(np.int64) + 1
+        for key, multiplier in self.holidays.items():
+            holiday_month, holiday_day = (int(part) for part in key.split('-'))
+            for index in np.flatnonzero((month == holiday_month) & (day_of_month == holiday_day)):
+                for offset in range(-self.holiday_spread_days, self.holiday_spread_days + 1):
+                    if 0 <= index + offset < days:
+                        share = 1 - abs(offset) / (self.holiday_spread_days + 1)
+                        holiday[index + offset] = max(holiday[index + offset], 1 + (multiplier - 1) * share)
+
+        return np.clip(yearly * weekly * trend * holiday, 0, None)
+
+    def draw_times(self, rng: np.random.Generator, rows: int, start_date: date, days: int) -> np.ndarray:
+        """``rows`` arrival timestamps (datetime64[s]) distributed by the day and hour weights"""
+        day_weights = self.daily_weights(start_date, days)
+        hour_weights = np.asarray(self.hourly_profile, dtype=float)
+        day_offsets = rng.choice(days, size=rows, p=day_weights / day_weights.sum())
+        seconds = (rng.choice(24, size=rows, p=hour_weights / hour_weights.sum()) * 3600
+                   + rng.integers(0, 3600, size=rows))
+        return (np.datetime64(start_date, 'D') + day_offsets).astype('datetime64[s]') + seconds
+
+
+# Arrivals spread evenly over every day and hour
+UNIFORM_SEASONALITY = Seasonality(yearly_amplitude=0.0, weekly_profile=(1.0,) * 7, hourly_profile=(1.0,) * 24,
+                                  annual_growth=0.0, holidays={})
+
+
+def parse_seasonality(value: str) -> Seasonality:
+    """'uniform', or a JSON file of Seasonality settings (e.g. {"annual_growth": 0.15})"""
+    if value == 'uniform':
+        return UNIFORM_SEASONALITY
+    with open(value) as f:
+        return Seasonality.from_dict(json.load(f))
+
+
+def sector_counts(rows: int, sector_mix: Optional[Dict[str, float]] = None) -> Dict[str, int]:
+    """Rows per sector for a mix of relative weights (largest remainder, so the counts sum to ``rows``)"""
+    mix = {sector: float(weight) for sector, weight in (sector_mix or DEFAULT_SECTOR_MIX).items() if weight > 0}
+    unknown = set(mix) - set(SECTORS)
+    if unknown:
+        raise ValueError(f"Unknown sectors in mix: {', '.join(sorted(unknown))}")
+    if not mix:
+        raise ValueError("Sector mix has no positive weights")
+
+    total_weight = sum(mix.values())
+    shares = {sector: rows * weight / total_weight for sector, weight in mix.items()}
+    counts = {sector: int(share) for sector, share in shares.items()}
+    by_remainder = sorted(mix, key=lambda sector: shares[sector] - counts[sector], reverse=True)
+    for sector in by_remainder[:rows - sum(counts.values())]:
+        counts[sector] += 1
+    return {sector: counts[sector] for sector in SECTORS if sector in counts}
+
+
+def _nested_choice(rng: np.random.Generator, parent_codes: np.ndarray, children: Dict[str, list]) -> pd.Categorical:
+    """For each parent code, a uniform pick among that parent's children (all picks in one pass)"""
+    sizes = np.array([len(values) for values in children.values()])
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    codes = offsets[parent_codes] + (rng.random(len(parent_codes)) * sizes[parent_codes]).astype(np.int64)
+    flat = [value for values in children.values() for value in values]
+    # Categories must be unique; identical names under different parents share one category
+    categories, inverse = np.unique(np.array(flat, dtype=object), return_inverse=True)
+    return pd.Categorical.from_codes(inverse[codes], categories=categories)
+
+
+def _choice(rng: np.random.Generator, values: list, size: int, p: Optional[list] = None) -> pd.Categorical:
+    categories, inverse = np.unique(np.array(values, dtype=object), return_inverse=True)
+    return pd.Categorical.from_codes(inverse[rng.choice(len(values), size=size, p=p)], categories=categories)
+
+
+def _sector_values(mask: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """``values`` on the sector's rows, NaN elsewhere"""
+    column = np.full(len(mask), np.nan)
+    column[mask] = values
+    return column
+
+
+def default_start_date(days: int = DEFAULT_DAYS) -> date:
+    return date.today() - timedelta(days=days - 1)
+
+
+def generate_records(rows: int = DEFAULT_ROWS, rng: Union[np.random.Generator, int, None] = None,
+                     sector_mix: Optional[Dict[str, float]] = None, start_date: Optional[date] = None,
+                     days: int = DEFAULT_DAYS, seasonality: Optional[Seasonality] = None) -> pd.DataFrame:
+    """
+    ``rows`` synthetic tourist records, grouped by sector in ``SECTORS`` order.
+
+    ``rng`` is a Generator or a seed (None draws a fresh seed); the same
+    seed, row count, mix and start date always produce the same frame.
+    ``sector_mix`` maps sectors to relative weights (default: equal shares).
+    Arrival times fall in the ``days`` days from ``start_date`` (default:
+    the last ``days`` days), distributed by ``seasonality`` (default:
+    ``Seasonality()``; ``UNIFORM_SEASONALITY`` spreads them evenly).
+    """
+    rng = np.random.default_rng(rng)
+    start_date = start_date or default_start_date(days)
+    arrival_times = (seasonality or Seasonality()).draw_times(rng, rows, start_date, days)
+    counts = sector_counts(rows, sector_mix)
+    sector_codes = np.repeat(np.arange(len(SECTORS)), [counts.get(sector, 0) for sector in SECTORS])
+    is_sector = {sector: sector_codes == code for code, sector in enumerate(SECTORS)}
+
+    region_codes = rng.integers(0, len(REGIONS), size=rows)
+    spend = np.round(rng.gamma(2, 1000, size=rows), 2)
+    duration = np.round(rng.exponential(3, size=rows) + 1, 1)
+
+    sentiment_names = list(SENTIMENT_WEIGHTS)
+    sentiment_codes = rng.choice(len(sentiment_names), size=rows, p=list(SENTIMENT_WEIGHTS.values()))
+
+    df = pd.DataFrame({
+        'sector': pd.Categorical.from_codes(sector_codes, categories=SECTORS),
+        'age': rng.integers(18, 80, size=rows),
+        'sex': _choice(rng, SEXES, rows),
+        'nationality': _choice(rng, NATIONALITIES, rows),
+        'home_region': pd.Categorical.from_codes(region_codes, categories=REGIONS),
+        'tourist_destination': _nested_choice(rng, region_codes, REGION_DESTINATIONS),
+        'arrival_date': arrival_times.astype('datetime64[D]'),
+        'arrival_timestamp': arrival_times,
+        'spend_amount': spend,
+        'visit_duration_days': duration,
+        'satisfaction_score': rng.integers(1, 6, size=rows),
+        'infrastructure_rating': rng.integers(1, 6, size=rows),
+        'local_business_spend': np.round(spend * rng.uniform(0.1, 0.5, size=rows), 2),
+        'review_sentiment': pd.Categorical.from_codes(sentiment_codes, categories=sentiment_names),
+        'review_comment': _nested_choice(rng, sentiment_codes, SENTIMENT_COMMENTS)
+    })
+
+    # Sector-specific columns: drawn for the sector's rows only
+    mask = is_sector['airlines']
+    n = int(mask.sum())
+    df['flight_delay_minutes'] = _sector_values(mask, rng.poisson(15, size=n))
+    df['flight_spend'] = _sector_values(mask, np.round(spend[mask] * rng.uniform(0.5, 1, size=n), 2))
+
+    mask = is_sector['hotels']
+    n = int(mask.sum())
+    df['hotel_nights'] = _sector_values(mask, np.floor(duration[mask]))
+    df['hotel_rating'] = _sector_values(mask, rng.integers(1, 6, size=n))
+    df['hotel_spend'] = _sector_values(mask, np.round(spend[mask] * rng.uniform(0.5, 1, size=n), 2))
+
+    mask = is_sector['regional_tourism']
+    n = int(mask.sum())
+    df['activities_count'] = _sector_values(mask, rng.integers(1, 10, size=n))
+    df['activity_spend'] = _sector_values(mask, np.round(spend[mask] * rng.uniform(0.4, 0.9, size=n), 2))
+
+    mask = is_sector['travel_agencies']
+    n = int(mask.sum())
+    package_codes = np.full(rows, -1)
+    package_codes[mask] = rng.integers(0, len(PACKAGE_TYPES), size=n)
+    df['package_type'] = pd.Categorical.from_codes(package_codes, categories=PACKAGE_TYPES)
+    df['package_spend'] = _sector_values(mask, np.round(spend[mask] * rng.uniform(0.6, 1, size=n), 2))
+
+    mask = is_sector['other']
+    n = int(mask.sum())
+    df['souvenir_spend'] = _sector_values(mask, np.round(spend[mask] * rng.uniform(0.2, 0.6, size=n), 2))
+    df['other_service_rating'] = _sector_values(mask, rng.integers(1, 6, size=n))
+
+    logger.info(f"Generated {rows} tourism records ({', '.join(f'{s}={c}' for s, c in counts.items())})")
+    return df
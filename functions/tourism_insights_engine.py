@@ -10,46 +10,38 @@ from dataclasses import dataclass
 import os
 import sys
 import logging
+import time
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple, Union
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple, Union
 import json
 from pathlib import Path
+from collections import OrderedDict
 
-# ML and Analytics imports
-try:
-    from prophet import Prophet
-    PROPHET_AVAILABLE = True
-except ImportError:
-    PROPHET_AVAILABLE = False
-    
-try:
-    import xgboost as xgb
-    XGBOOST_AVAILABLE = True
-except ImportError:
-    XGBOOST_AVAILABLE = False
-
-try:
-    from sklearn.ensemble import RandomForestRegressor
-    from sklearn.metrics import mean_absolute_error, mean_squared_error
-    from sklearn.preprocessing import StandardScaler
-    SKLEARN_AVAILABLE = True
-except ImportError:
-    SKLEARN_AVAILABLE = False
+from lazy_report import LazyReport, split_section_names
+from metric_kernels import grouped_ratio_of_sums, safe_rate
+from dimension_cube import DimensionCube
+from sketches import DimensionSketches
+from data_fingerprint import (
+    FingerprintService, attach_fingerprint, combine_digests, derived_fingerprint, fingerprint_frame, frame_fingerprint
+)
+from daily_series import series_values
+from partitioned_dataset import MANIFEST_FILE, is_partitioned_dataset, read_partitioned
+from metrics_store import MetricsStore, open_metrics_store
+from analytics_cache import get_cache_dir
+from department_registry import (
+    COMPLETENESS_COLUMNS, DATE_COLUMNS, DEPARTMENT_REGISTRY, SPEND_COLUMNS, department_columns, expand_derived,
+    get_department_specs, register_department
+)
 
-# Use simplified sync manager by default
-try:
-    from supabase_sync_simple import SupabaseSyncManager
-except ImportError:
-    try:
-        from supabase_sync import SupabaseSyncManager
-    except ImportError:
-        SupabaseSyncManager = None
+# Prophet and the sync manager with its Supabase client are imported on first use
+# through lazy_imports, not when this module loads
+from lazy_imports import get_prophet, get_sync_manager_class
 
 # Database connectivity
-import os
-from supabase import create_client, Client
+from supabase_clients import get_client, get_healthy_client, supabase_breaker
+from postgres_backend import get_postgres_backend
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -82,40 +74,40 @@ class TourismInsightsEngine:
     Advanced tourism analytics engine for generating multi-departmental insights
     """
     
-    def __init__(self, supabase_url: str = None, supabase_key: str = None):
+    def __init__(self, supabase_url: str = None, supabase_key: str = None, cache_dir: str = None,
+                 departments: Optional[List[str]] = None):
         self.supabase_url = supabase_url or os.getenv('SUPABASE_URL')
         self.supabase_key = supabase_key or os.getenv('SUPABASE_KEY')
         
+        # Directory for persisted aggregates (dimension cube), fingerprints and metric history
+        self.cache_dir = get_cache_dir(cache_dir)
+        self._cube_memo: Optional[Tuple[pd.DataFrame, DimensionCube]] = None
+        self._sketch_memo: Optional[Tuple[pd.DataFrame, DimensionSketches]] = None
+        
+        # Content fingerprints key every cached result (forecasts, cube, report sections)
+        self.fingerprints = FingerprintService(self.cache_dir)
+        self._result_memo: 'OrderedDict[Tuple, Any]' = OrderedDict()
+        
+        # Loaded data is reused for ANALYTICS_SNAPSHOT_TTL seconds (0: reload on every call),
+        # so a long-running process (see analytics_daemon.py) does not re-query per request
+        self.snapshot_ttl = float(os.getenv('ANALYTICS_SNAPSHOT_TTL', 0))
+        self._snapshots: Dict[Tuple, Tuple[float, Any]] = {}
+        
+        # Columnar history of emitted metrics (ANALYTICS_METRICS_DIR, else <cache_dir>/metrics)
+        metrics_dir = os.getenv('ANALYTICS_METRICS_DIR') or os.path.join(self.cache_dir, 'metrics')
+        self.metrics_store: Optional[MetricsStore] = open_metrics_store(metrics_dir)
+        
         # Initialize ML models
         self.models = {}
         self.scalers = {}
         
-        # Department configurations
+        # Department configurations come from the plugin registry (see @register_department);
+        # ANALYTICS_DEPARTMENTS (comma-separated) narrows the enabled set
+        if departments is None and os.getenv('ANALYTICS_DEPARTMENTS'):
+            departments = [name.strip() for name in os.getenv('ANALYTICS_DEPARTMENTS').split(',') if name.strip()]
         self.departments = {
-            'software_development': {
-                'focus_metrics': ['api_usage', 'system_performance', 'data_quality', 'user_engagement'],
-                'priority': 'technical_optimization'
-            },
-            'operations': {
-                'focus_metrics': ['occupancy_rates', 'arrival_patterns', 'capacity_utilization', 'revenue'],
-                'priority': 'operational_efficiency'
-            },
-            'marketing': {
-                'focus_metrics': ['visitor_satisfaction', 'market_segments', 'seasonal_trends', 'roi'],
-                'priority': 'market_expansion'
-            },
-            'research_development': {
-                'focus_metrics': ['innovation_metrics', 'tourist_behavior', 'emerging_trends', 'competitive_analysis'],
-                'priority': 'strategic_insights'
-            },
-            'resource_mobility': {
-                'focus_metrics': ['resource_allocation', 'transportation', 'infrastructure_usage', 'logistics'],
-                'priority': 'resource_optimization'
-            },
-            'tourism_funding': {
-                'focus_metrics': ['revenue_generation', 'investment_returns', 'economic_impact', 'funding_efficiency'],
-                'priority': 'financial_performance'
-            }
+            spec.name: {'focus_metrics': spec.focus_metrics, 'priority': spec.priority}
+            for spec in get_department_specs(departments)
         }
     
     def connect_to_supabase(self) -> Optional[Any]:
@@ -125,11 +117,11 @@ class TourismInsightsEngine:
                 logger.warning("Supabase URL or key not provided, using mock data")
                 return None
             
-            # Create Supabase client
-            client = create_client(self.supabase_url, self.supabase_key)
-            
-            # Test the connection with a simple query
-            result = client.table('regions').select('id').limit(1).execute()
+            # Shared client; the connectivity probe is cached (see supabase_clients)
+            client = get_healthy_client(self.supabase_url, self.supabase_key)
+            if client is None:
+                logger.warning("Database connection failed, will use mock data")
+                return None
             
             logger.info("Successfully connected to Supabase using client library")
             return client
@@ -139,17 +131,47 @@ class TourismInsightsEngine:
             logger.warning("Database connection failed, will use mock data")
             return None
     
-    def load_tourism_data(self, client=None, days_back: int = 365) -> Dict[str, pd.DataFrame]:
-        """Load tourism data from Supabase or CSV file as fallback"""
-        
-        if client is not None:
+    def _snapshot(self, key: Tuple, loader: Callable[[], Any]) -> Any:
+        """``loader()``, reused while younger than ``snapshot_ttl`` seconds"""
+        if self.snapshot_ttl <= 0:
+            return loader()
+        now = time.monotonic()
+        cached = self._snapshots.get(key)
+        if cached is not None and now - cached[0] < self.snapshot_ttl:
+            return cached[1]
+        value = loader()
+        self._snapshots = {k: v for k, v in self._snapshots.items() if now - v[0] < self.snapshot_ttl}
+        self._snapshots[key] = (now, value)
+        return value
+    
+    def load_tourism_data(self, client=None, days_back: int = 365,
+                          columns: Optional[Set[str]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Load tourism data from Supabase or CSV file as fallback.
+
+        ``columns`` projects the load onto the given source columns (see
+        required_columns()); None loads every column.
+        """
+        key = ('tourism_data', days_back, tuple(sorted(columns)) if columns is not None else None)
+        return self._snapshot(key, lambda: self._load_tourism_data(client, days_back, columns))
+    
+    def _load_tourism_data(self, client, days_back: int, columns: Optional[Set[str]]) -> Dict[str, pd.DataFrame]:
+        # The direct Postgres backend (SUPABASE_DB_URL) reads even when the REST API is unreachable
+        if client is not None or get_postgres_backend() is not None:
             try:
                 # Use the SupabaseSyncManager's load method
-                sync_manager = SupabaseSyncManager(self.supabase_url, self.supabase_key)
-                data = sync_manager.load_tourism_data(days_back)
+                sync_manager = get_sync_manager_class()(self.supabase_url, self.supabase_key, client=client)
+                data = sync_manager.load_tourism_data(days_back, columns=columns)
                 
                 if data and not all(df.empty for df in data.values()):
                     logger.info("Successfully loaded data from Supabase")
+                    projection = ','.join(sorted(columns)) if columns is not None else '*'
+                    for table_name, frame in data.items():
+                        # Source tables are append-only; row count + latest created_at identify a snapshot
+                        source_key = FingerprintService.watermark_source_key(
+                            f"supabase:{table_name}", frame, 'created_at', days_back, projection
+                        )
+                        attach_fingerprint(frame, self.fingerprints.fingerprint(frame, source_key))
                     return data
                 else:
                     logger.warning("No data loaded from Supabase, trying fallback methods")
@@ -157,24 +179,60 @@ class TourismInsightsEngine:
                 logger.error(f"Error loading data from Supabase: {str(e)}")
         
         # Fallback to CSV file or direct table query
-        return self._load_fallback_data(days_back)
+        return self._load_fallback_data(days_back, columns=columns)
     
-    def _load_fallback_data(self, days_back: int) -> Dict[str, pd.DataFrame]:
-        """Load data from CSV file or direct database query as fallback"""
-        
-        # Try loading from CSV file first
-        csv_paths = [
+    def _read_dataset_file(self, path: str, columns: Optional[Set[str]] = None,
+                           since: Optional[datetime] = None,
+                           sketches: Optional[DimensionSketches] = None) -> pd.DataFrame:
+        """
+        Read a Parquet or CSV dataset, projecting onto ``columns`` when given.
+
+        A partitioned dataset directory (see partitioned_dataset.py) is read
+        without the rows before ``since``, and fills ``sketches`` per file
+        as it is read.
+        """
+        
+        if is_partitioned_dataset(path):
+            return read_partitioned(path, columns, since=since, sketches=sketches)
+        
+        if path.endswith('.parquet'):
+            if columns is None:
+                return pd.read_parquet(path)
+            import pyarrow.parquet as pq
+            available = pq.read_schema(path).names
+            return pd.read_parquet(path, columns=[col for col in available if col in columns])
+        
+        usecols = (lambda col: col in columns) if columns is not None else None
+        return pd.read_csv(path, low_memory=False, dtype=str, usecols=usecols)
+    
+    def _load_fallback_data(self, days_back: int, columns: Optional[Set[str]] = None) -> Dict[str, pd.DataFrame]:
+        """Load data from a Parquet/CSV file or direct database query as fallback"""
+        
+        # Try loading from a dataset file first (partitioned Parquet, then Parquet, then CSV)
+        dataset_paths = [
+            'tourism_dataset',
+            'data/tourism_dataset',
+            '../tourism_dataset',
+            'functions/tourism_dataset',
+            'tourism_dataset.parquet',
+            'data/tourism_dataset.parquet',
+            '../tourism_dataset.parquet',
+            'functions/tourism_dataset.parquet',
             'tourism_dataset.csv',
             'data/tourism_dataset.csv',
             '../tourism_dataset.csv',
             'functions/tourism_dataset.csv'
         ]
         
-        for csv_path in csv_paths:
-            if os.path.exists(csv_path):
+        for csv_path in dataset_paths:
+            if os.path.isfile(csv_path) or is_partitioned_dataset(csv_path):
                 try:
-                    logger.info(f"Loading data from CSV file: {csv_path}")
-                    df = pd.read_csv(csv_path, low_memory=False, dtype=str)
+                    logger.info(f"Loading data from dataset file: {csv_path}")
+                    cutoff_date = datetime.now() - timedelta(days=days_back)
+                    sketches = DimensionSketches()
+                    df = self._read_dataset_file(csv_path, columns, since=cutoff_date, sketches=sketches)
+                    if columns is not None:
+                        logger.info(f"Projected load onto {len(df.columns)} required columns")
                     
                     # Convert numeric columns where possible
                     numeric_columns = ['arrivals', 'tourist_arrivals', 'visitors', 'count', 'revenue', 'total_revenue']
@@ -190,7 +248,6 @@ class TourismInsightsEngine:
                         try:
                             df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
                             if not df[date_col].isna().all():
-                                cutoff_date = datetime.now() - timedelta(days=days_back)
                                 df = df[df[date_col] >= cutoff_date]
                                 logger.info(f"Filtered data to last {days_back} days, {len(df)} records remaining")
                         except Exception as e:
@@ -199,21 +256,54 @@ class TourismInsightsEngine:
                         logger.info(f"No date column found, using all {len(df)} records")
                     
                     # Process the CSV data into the expected format
-                    return self._process_csv_data(df)
+                    data = self._process_csv_data(df)
+                    
+                    # Sketches built while reading answer top-N and distinct counts for these rows;
+                    # readers that did not fill them (or rows filtered since) leave exact counting
+                    if sketches.observed and sketches.rows == len(data['arrivals']):
+                        self._sketch_memo = (data['arrivals'], sketches)
+                    
+                    # Fingerprint each table from the file's bytes (memoized by mtime) rather than
+                    # rehashing the parsed frames; a partitioned dataset changes with its manifest
+                    projection = ','.join(sorted(columns)) if columns is not None else '*'
+                    source_digest = self.fingerprints.file_digest(
+                        os.path.join(csv_path, MANIFEST_FILE) if os.path.isdir(csv_path) else csv_path
+                    )
+                    for table_name, frame in data.items():
+                        attach_fingerprint(frame, derived_fingerprint(
+                            frame, source_digest, days_back, datetime.now().date(), projection, table_name
+                        ))
+                    
+                    return data
                     
                 except Exception as e:
-                    logger.error(f"Error loading CSV file {csv_path}: {str(e)}")
+                    logger.error(f"Error loading dataset file {csv_path}: {str(e)}")
                     continue
         
+        # Try streaming tourism_data over the direct Postgres connection
+        backend = get_postgres_backend()
+        if backend is not None:
+            try:
+                logger.info("Attempting direct Postgres read of tourism_data table")
+                cutoff_date = (datetime.now() - timedelta(days=days_back)).date()
+                df = backend.read_frame('tourism_data', columns=columns, date_column='date', start=cutoff_date)
+                if not df.empty:
+                    logger.info(f"Loaded {len(df)} records from tourism_data table")
+                    return self._process_tourism_data_table(df)
+            except Exception as e:
+                logger.error(f"Error reading tourism_data table over direct Postgres: {str(e)}")
+        
         # Try direct database query to tourism_data table
         if self.supabase_url and self.supabase_key:
             try:
                 logger.info("Attempting direct query to tourism_data table")
-                client = create_client(self.supabase_url, self.supabase_key)
+                client = get_client(self.supabase_url, self.supabase_key)
                 
-                # Query tourism_data table directly
+                # Query tourism_data table directly (fails fast while Supabase is marked down)
                 cutoff_date = (datetime.now() - timedelta(days=days_back)).isoformat()
-                result = client.table('tourism_data').select('*').gte('date', cutoff_date).execute()
+                result = supabase_breaker().call(
+                    lambda: client.table('tourism_data').select('*').gte('date', cutoff_date).execute()
+                )
                 
                 if result.data:
                     df = pd.DataFrame(result.data)
@@ -257,12 +347,11 @@ class TourismInsightsEngine:
             df['week_of_year'] = df['arrival_date'].dt.isocalendar().week
         
         # Calculate total spending per visitor
-        spending_cols = ['spend_amount', 'flight_spend', 'hotel_spend', 'activity_spend', 'package_spend', 'souvenir_spend']
-        df['total_spend'] = df[[col for col in spending_cols if col in df.columns]].sum(axis=1, skipna=True)
+        df['total_spend'] = df[[col for col in SPEND_COLUMNS if col in df.columns]].sum(axis=1, skipna=True)
         
         # Calculate occupancy rate if we can derive it
         if 'hotel_nights' in df.columns and 'visit_duration_days' in df.columns:
-            df['occupancy_rate'] = (df['hotel_nights'] / df['visit_duration_days']).clip(0, 1)
+            df['occupancy_rate'] = safe_rate(df['hotel_nights'], df['visit_duration_days']).clip(0, 1)
         
         # Create separate DataFrames for different analysis types
         data = {
@@ -284,25 +373,97 @@ class TourismInsightsEngine:
             'surveys': pd.DataFrame()
         }
     
-    def generate_forecasts(self, data: Dict[str, pd.DataFrame], forecast_days: int = 30) -> Dict[str, Any]:
-        """Generate ML-based forecasts for key tourism metrics"""
+    def data_fingerprint(self, data: Dict[str, pd.DataFrame], tables: Optional[List[str]] = None) -> str:
+        """Content digest of the loaded tables (all of them, or just ``tables``)"""
+        return combine_digests({
+            name: frame_fingerprint(frame, self.fingerprints).digest
+            for name, frame in data.items()
+            if frame is not None and (tables is None or name in tables)
+        })
+    
+    def _memoized(self, key: Tuple, builder: Callable[[], Any], max_entries: int = 32) -> Any:
+        """Return the cached result for ``key`` (which embeds a data fingerprint) or build it"""
+        if key in self._result_memo:
+            self._result_memo.move_to_end(key)
+            return self._result_memo[key]
+        result = builder()
+        self._result_memo[key] = result
+        while len(self._result_memo) > max_entries:
+            self._result_memo.popitem(last=False)
+        return result
+    
+    def load_daily_series(self, client=None, days_back: int = 365) -> Dict[str, pd.DataFrame]:
+        """
+        Daily series for forecasting (see daily_series.FORECAST_SERIES),
+        aggregated in the database. Series that could not be loaded or hold
+        no rows are left out; forecasts for them group the raw rows instead.
+        """
+        return self._snapshot(('daily_series', days_back), lambda: self._load_daily_series(client, days_back))
+    
+    def _load_daily_series(self, client, days_back: int) -> Dict[str, pd.DataFrame]:
+        SupabaseSyncManager = get_sync_manager_class()
+        if (client is None and get_postgres_backend() is None) or SupabaseSyncManager is None:
+            return {}
+        try:
+            sync_manager = SupabaseSyncManager(self.supabase_url, self.supabase_key, client=client)
+            series = sync_manager.load_daily_series(days_back=days_back)
+        except Exception as e:
+            logger.warning(f"Could not load daily series, forecasting from raw rows: {str(e)}")
+            return {}
+        return {name: frame for name, frame in series.items() if not frame.empty}
+    
+    def forecast_fingerprint(self, data: Dict[str, pd.DataFrame],
+                             series: Optional[Dict[str, pd.DataFrame]] = None) -> str:
+        """Content digest of the forecast inputs: the daily series and the raw forecast tables"""
+        digests = {f"series:{name}": fingerprint_frame(frame).digest for name, frame in (series or {}).items()}
+        digests['tables'] = self.data_fingerprint(data, ['arrivals', 'occupancy'])
+        return combine_digests(digests)
+    
+    def generate_forecasts(self, data: Dict[str, pd.DataFrame], forecast_days: int = 30,
+                           series: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, Any]:
+        """
+        Generate ML-based forecasts for key tourism metrics (recomputed only when the data changes).
+
+        ``series`` holds daily series from load_daily_series(); a forecast
+        whose series is present uses it instead of grouping the rows in ``data``.
+        """
         
+        try:
+            key = ('forecasts', self.forecast_fingerprint(data, series), forecast_days, datetime.now().date())
+        except Exception as e:
+            logger.warning(f"Could not fingerprint data, forecasting without cache: {str(e)}")
+            return self._generate_forecasts(data, forecast_days, series)
+        return self._memoized(key, lambda: self._generate_forecasts(data, forecast_days, series))
+    
+    def _generate_forecasts(self, data: Dict[str, pd.DataFrame], forecast_days: int,
+                            series: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, Any]:
         forecasts = {}
+        series = series or {}
+        arrivals_df = data.get('arrivals', pd.DataFrame())
+        occupancy_df = data.get('occupancy', pd.DataFrame())
         
         try:
             # Arrivals forecasting
-            if not data['arrivals'].empty:
-                arrivals_forecast = self._forecast_arrivals(data['arrivals'], forecast_days)
+            if 'arrivals' in series:
+                daily_arrivals = series_values(series['arrivals']).rename('arrivals').rename_axis('date').reset_index()
+                forecasts['arrivals'] = self._forecast_daily_arrivals(daily_arrivals, forecast_days)
+            elif not arrivals_df.empty:
+                arrivals_forecast = self._forecast_arrivals(arrivals_df, forecast_days)
                 forecasts['arrivals'] = arrivals_forecast
             
             # Occupancy forecasting
-            if not data['occupancy'].empty:
-                occupancy_forecast = self._forecast_occupancy(data['occupancy'], forecast_days)
+            if 'occupancy' in series:
+                forecasts['occupancy'] = self._forecast_occupancy_series(series['occupancy'], forecast_days)
+            elif not occupancy_df.empty:
+                occupancy_forecast = self._forecast_occupancy(occupancy_df, forecast_days)
                 forecasts['occupancy'] = occupancy_forecast
             
             # Revenue forecasting
-            if not data['occupancy'].empty:
-                revenue_forecast = self._forecast_revenue(data['occupancy'], forecast_days)
+            if 'revenue' in series:
+                daily_revenue = series_values(series['revenue']).rename('revenue').rename_axis('date').reset_index()
+                forecasts['revenue'] = self._forecast_daily_revenue(daily_revenue, forecast_days)
+            elif not occupancy_df.empty:
+                revenue_forecast = self._forecast_revenue(occupancy_df, forecast_days)
                 forecasts['revenue'] = revenue_forecast
             
         except Exception as e:
@@ -356,8 +517,14 @@ class TourismInsightsEngine:
             logger.error(f"Error preparing arrivals data: {str(e)}")
             return {'error': f'Data preparation failed: {str(e)}'}
         
+        return self._forecast_daily_arrivals(daily_arrivals, days)
+    
+    def _forecast_daily_arrivals(self, daily_arrivals: pd.DataFrame, days: int) -> Dict[str, Any]:
+        """Forecast from daily arrivals (``date`` and ``arrivals`` columns, sorted by date)"""
+        
         # Use Prophet if available, otherwise simple trend analysis
-        if PROPHET_AVAILABLE and len(daily_arrivals) > 30:
+        Prophet = get_prophet() if len(daily_arrivals) > 30 else None
+        if Prophet is not None:
             try:
                 prophet_df = daily_arrivals[['date', 'arrivals']].rename(
                     columns={'date': 'ds', 'arrivals': 'y'}
@@ -439,7 +606,7 @@ class TourismInsightsEngine:
         if 'hotel_nights' in occupancy_df.columns and 'visit_duration_days' in occupancy_df.columns:
             # Calculate occupancy rate from hotel nights vs visit duration
             occupancy_df = occupancy_df.copy()
-            occupancy_df['occupancy_rate'] = (occupancy_df['hotel_nights'] / occupancy_df['visit_duration_days']).clip(0, 1)
+            occupancy_df['occupancy_rate'] = safe_rate(occupancy_df['hotel_nights'], occupancy_df['visit_duration_days']).clip(0, 1)
             
             # Find date column
             date_columns = ['arrival_date', 'created_at', 'date', 'timestamp']
@@ -456,23 +623,12 @@ class TourismInsightsEngine:
                     region_col = 'home_region' if 'home_region' in occupancy_df.columns else None
                     
                     if region_col:
-                        for region in occupancy_df[region_col].unique():
-                            region_data = occupancy_df[occupancy_df[region_col] == region]
-                            daily_occupancy = region_data.groupby(region_data[date_col].dt.date)['occupancy_rate'].mean().reset_index()
-                            
-                            if len(daily_occupancy) > 7:
-                                # Simple moving average with seasonal adjustment
-                                recent_avg = daily_occupancy['occupancy_rate'].tail(7).mean()
-                                seasonal_pattern = 1.0 + 0.15 * np.sin(2 * np.pi * np.arange(days) / 365)
-                                
-                                forecast_values = [min(0.95, max(0.1, recent_avg * factor)) for factor in seasonal_pattern]
-                                
-                                regional_forecasts[region] = {
-                                    'forecast_rates': forecast_values,
-                                    'average_predicted_rate': np.mean(forecast_values),
-                                    'peak_predicted_rate': max(forecast_values),
-                                    'trend': 'increasing' if forecast_values[-1] > forecast_values[0] else 'decreasing'
-                                }
+                        # Daily mean occupancy for every region in a single groupby pass
+                        regional_daily = occupancy_df.groupby(
+                            [occupancy_df[region_col], occupancy_df[date_col].dt.date.rename('day')]
+                        )['occupancy_rate'].mean()
+                        
+                        regional_forecasts = self._forecast_regional_occupancy(regional_daily, days)
                     else:
                         # Overall occupancy forecast without regional breakdown
                         daily_occupancy = occupancy_df.groupby(occupancy_df[date_col].dt.date)['occupancy_rate'].mean().reset_index()
@@ -528,6 +684,40 @@ class TourismInsightsEngine:
             'note': 'No hotel_nights, visit_duration, or hotel_rating data available'
         }
     
+    def _forecast_regional_occupancy(self, regional_daily: pd.Series, days: int) -> Dict[str, Any]:
+        """Per-region forecasts from daily mean occupancy rates indexed by (region, day)"""
+        
+        regional_forecasts = {}
+        for region, region_series in regional_daily.groupby(level=0, sort=False):
+            daily_occupancy = region_series.reset_index(drop=True).to_frame('occupancy_rate')
+            
+            if len(daily_occupancy) > 7:
+                # Simple moving average with seasonal adjustment
+                recent_avg = daily_occupancy['occupancy_rate'].tail(7).mean()
+                seasonal_pattern = 1.0 + 0.15 * np.sin(2 * np.pi * np.arange(days) / 365)
+                
+                forecast_values = [min(0.95, max(0.1, recent_avg * factor)) for factor in seasonal_pattern]
+                
+                regional_forecasts[region] = {
+                    'forecast_rates': forecast_values,
+                    'average_predicted_rate': np.mean(forecast_values),
+                    'peak_predicted_rate': max(forecast_values),
+                    'trend': 'increasing' if forecast_values[-1] > forecast_values[0] else 'decreasing'
+                }
+        return regional_forecasts
+    
+    def _forecast_occupancy_series(self, occupancy_series: pd.DataFrame, days: int) -> Dict[str, Any]:
+        """Forecast occupancy from the daily occupied/total room rate series, grouped by region"""
+        
+        # Rows without a region are grouped under 'overall'
+        regions = occupancy_series['group_key'].fillna('overall').rename('region')
+        regional_daily = occupancy_series.set_index([regions, 'day'])['mean'].dropna()
+        return {
+            'regional_forecasts': self._forecast_regional_occupancy(regional_daily, days),
+            'forecast_dates': [(datetime.now() + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(1, days + 1)],
+            'method': 'room_occupancy'
+        }
+    
     def _forecast_revenue(self, occupancy_df: pd.DataFrame, days: int) -> Dict[str, Any]:
         """Enhanced revenue forecasting using multiple data sources"""
         
@@ -554,6 +744,11 @@ class TourismInsightsEngine:
             logger.error(f"Error preparing revenue data: {str(e)}")
             return {'error': f'Revenue data preparation failed: {str(e)}'}
         
+        return self._forecast_daily_revenue(daily_revenue, days)
+    
+    def _forecast_daily_revenue(self, daily_revenue: pd.DataFrame, days: int) -> Dict[str, Any]:
+        """Forecast from daily revenue (``date`` and ``revenue`` columns, sorted by date)"""
+        
         if len(daily_revenue) > 7:
             # Enhanced trend analysis with growth factors
             recent_avg = daily_revenue['revenue'].tail(14).mean()
@@ -596,7 +791,7 @@ class TourismInsightsEngine:
         # Use occupancy or visitor data to estimate revenue
         if 'occupied_rooms' in data_df.columns and 'total_rooms' in data_df.columns:
             # Hotel-based revenue estimation
-            avg_occupancy = (data_df['occupied_rooms'] / data_df['total_rooms']).mean()
+            avg_occupancy = safe_rate(data_df['occupied_rooms'], data_df['total_rooms']).mean()
             avg_rooms = data_df['total_rooms'].mean()
             estimated_daily_revenue = avg_occupancy * avg_rooms * 100  # Assume $100 per room
             
@@ -630,10 +825,54 @@ class TourismInsightsEngine:
         insights = {}
         
         for dept_name, dept_config in self.departments.items():
+            spec = DEPARTMENT_REGISTRY[dept_name]
+            if not spec.has_inputs(data):
+                logger.info(f"Skipping {dept_name} insights: no data in {', '.join(spec.tables)}")
+                continue
             insights[dept_name] = self._generate_department_insight(dept_name, dept_config, data, forecasts)
         
+        if self.metrics_store is not None:
+            self._record_metric_history(insights, data)
+        
         return insights
     
+    def _record_metric_history(self, insights: Dict[str, DepartmentInsight], data: Dict[str, pd.DataFrame]):
+        """Append this run's metrics to the metrics store and derive trends from their history"""
+        
+        try:
+            records = [
+                {
+                    'department': dept_name,
+                    'metric': metric.metric_name,
+                    'value': metric.current_value,
+                    'predicted': metric.predicted_value,
+                    'confidence': metric.confidence
+                }
+                for dept_name, insight in insights.items()
+                for metric in insight.key_metrics
+            ]
+            fingerprint = f"{self.data_fingerprint(data)}|{','.join(insights)}"
+            self.metrics_store.append(records, fingerprint=fingerprint)
+            
+            trends = self.metrics_store.trends()
+            history_trend = dict(zip(zip(trends['department'], trends['metric']), trends['trend']))
+            for dept_name, insight in insights.items():
+                for metric in insight.key_metrics:
+                    # Only replace the placeholder 'stable'; handler-derived trends are kept
+                    if metric.trend == 'stable':
+                        metric.trend = history_trend.get((dept_name, metric.metric_name), metric.trend)
+        except Exception as e:
+            logger.warning(f"Could not record metric history: {str(e)}")
+    
+    def metric_trends(self) -> List[Dict[str, Any]]:
+        """Run-over-run deltas, trends and sparklines for every recorded metric"""
+        
+        if self.metrics_store is None:
+            return []
+        trends = self.metrics_store.trends()
+        trends['sparkline'] = trends['sparkline'].map(lambda values: [round(float(v), 4) for v in values])
+        return trends.astype(object).where(trends.notna(), None).to_dict(orient='records')
+    
     def _generate_department_insight(self, dept_name: str, dept_config: Dict[str, Any], 
                                    data: Dict[str, pd.DataFrame], forecasts: Dict[str, Any]) -> DepartmentInsight:
         """Generate insights for a specific department"""
@@ -643,49 +882,9 @@ class TourismInsightsEngine:
         action_items = []
         alert_level = 'normal'
         
-        if dept_name == 'software_development':
-            # Focus on API usage, system performance, data quality
-            metrics, recs, actions, alert = self._software_dev_insights(data, forecasts)
-            key_metrics.extend(metrics)
-            recommendations.extend(recs)
-            action_items.extend(actions)
-            alert_level = alert
-            
-        elif dept_name == 'operations':
-            # Focus on occupancy, capacity, operational efficiency
-            metrics, recs, actions, alert = self._operations_insights(data, forecasts)
-            key_metrics.extend(metrics)
-            recommendations.extend(recs)
-            action_items.extend(actions)
-            alert_level = alert
-            
-        elif dept_name == 'marketing':
-            # Focus on visitor satisfaction, market trends, ROI
-            metrics, recs, actions, alert = self._marketing_insights(data, forecasts)
-            key_metrics.extend(metrics)
-            recommendations.extend(recs)
-            action_items.extend(actions)
-            alert_level = alert
-            
-        elif dept_name == 'research_development':
-            # Focus on innovation metrics, emerging trends
-            metrics, recs, actions, alert = self._rd_insights(data, forecasts)
-            key_metrics.extend(metrics)
-            recommendations.extend(recs)
-            action_items.extend(actions)
-            alert_level = alert
-            
-        elif dept_name == 'resource_mobility':
-            # Focus on resource allocation, transportation
-            metrics, recs, actions, alert = self._resource_mobility_insights(data, forecasts)
-            key_metrics.extend(metrics)
-            recommendations.extend(recs)
-            action_items.extend(actions)
-            alert_level = alert
-            
-        elif dept_name == 'tourism_funding':
-            # Focus on revenue, ROI, economic impact
-            metrics, recs, actions, alert = self._funding_insights(data, forecasts)
+        spec = DEPARTMENT_REGISTRY.get(dept_name)
+        if spec is not None:
+            metrics, recs, actions, alert = getattr(self, spec.handler)(data, forecasts)
             key_metrics.extend(metrics)
             recommendations.extend(recs)
             action_items.extend(actions)
@@ -700,6 +899,14 @@ class TourismInsightsEngine:
             action_items=action_items
         )
     
+    @register_department(
+        'software_development',
+        focus_metrics=['api_usage', 'system_performance', 'data_quality', 'user_engagement'],
+        priority='technical_optimization',
+        tables=['arrivals'],
+        columns=COMPLETENESS_COLUMNS,
+        metrics=['Data Completeness', 'API Response Time']
+    )
     def _software_dev_insights(self, data: Dict[str, pd.DataFrame], forecasts: Dict[str, Any]) -> Tuple[List[InsightMetric], List[str], List[str], str]:
         """Generate software development team insights"""
         
@@ -708,9 +915,11 @@ class TourismInsightsEngine:
         action_items = []
         alert_level = 'normal'
         
-        # Data quality metrics
-        if not data['arrivals'].empty:
-            data_completeness = 1.0 - (data['arrivals'].isnull().sum().sum() / data['arrivals'].size)
+        # Data quality metrics, over the declared columns only so the value does not depend on
+        # which other departments or sections widened the loaded projection
+        checked = data['arrivals'][[column for column in COMPLETENESS_COLUMNS if column in data['arrivals'].columns]]
+        if not checked.empty:
+            data_completeness = 1.0 - (checked.isnull().sum().sum() / checked.size)
             metrics.append(InsightMetric(
                 metric_name="Data Completeness",
                 current_value=data_completeness * 100,
@@ -754,6 +963,16 @@ class TourismInsightsEngine:
         
         return metrics, recommendations, action_items, alert_level
     
+    @register_department(
+        'operations',
+        focus_metrics=['occupancy_rates', 'arrival_patterns', 'capacity_utilization', 'revenue'],
+        priority='operational_efficiency',
+        tables=['occupancy', 'arrivals'],
+        columns=['hotel_nights', 'hotel_rating', 'hotel_spend', 'home_region', 'arrival_date',
+                 'visit_duration_days', 'infrastructure_rating'],
+        metrics=['Average Hotel Nights per Visitor', 'Average Hotel Rating', 'Average Revenue per Guest',
+                 'Total Visitors', 'Average Visit Duration (Days)', 'Infrastructure Satisfaction']
+    )
     def _operations_insights(self, data: Dict[str, pd.DataFrame], forecasts: Dict[str, Any]) -> Tuple[List[InsightMetric], List[str], List[str], str]:
         """Generate operations team insights with comprehensive hotel and occupancy analytics"""
         
@@ -922,6 +1141,16 @@ class TourismInsightsEngine:
         
         return metrics, recommendations, action_items, alert_level
     
+    @register_department(
+        'marketing',
+        focus_metrics=['visitor_satisfaction', 'market_segments', 'seasonal_trends', 'roi'],
+        priority='market_expansion',
+        tables=['arrivals'],
+        columns=['nationality', 'satisfaction_score', 'tourist_destination', 'age', 'sex', 'arrival_date'],
+        derived=['total_spend'],
+        metrics=['Top Source Market Share', 'Market Diversity Index', 'Average Spending per Visitor',
+                 'Overall Satisfaction Score', 'Top Destination Share', 'Dominant Age Group']
+    )
     def _marketing_insights(self, data: Dict[str, pd.DataFrame], forecasts: Dict[str, Any]) -> Tuple[List[InsightMetric], List[str], List[str], str]:
         """Generate marketing team insights with comprehensive visitor analytics"""
         
@@ -932,12 +1161,15 @@ class TourismInsightsEngine:
         
         if not data['arrivals'].empty:
             df = data['arrivals']
+            # Dimension scans below are answered from the aggregate cube when available
+            cube = self._get_dimension_cube(df)
+            # Top-N rankings and distinct counts come from sketches when the reader built them
+            sketches = self._get_dimension_sketches(df)
             
             # Nationality/Source Market Analysis
             if 'nationality' in df.columns:
                 try:
-                    nationality_distribution = df['nationality'].value_counts()
-                    top_nationalities = nationality_distribution.head(5)
+                    top_nationalities = self._dimension_top(df, sketches, 'nationality', 5)
                     
                     # Market concentration analysis
                     total_visitors = len(df)
@@ -955,7 +1187,7 @@ class TourismInsightsEngine:
                     ))
                     
                     # Market diversity assessment
-                    market_diversity = len(nationality_distribution) / total_visitors * 100
+                    market_diversity = self._dimension_distinct(df, sketches, 'nationality') / total_visitors * 100
                     metrics.append(InsightMetric(
                         metric_name="Market Diversity Index",
                         current_value=market_diversity,
@@ -980,8 +1212,7 @@ class TourismInsightsEngine:
                 spend_col = 'total_spend' if 'total_spend' in df.columns else 'spend_amount'
                 
                 try:
-                    avg_spending = df[spend_col].mean()
-                    total_revenue = df[spend_col].sum()
+                    avg_spending = self._measure_mean(df, cube, spend_col)
                     
                     metrics.append(InsightMetric(
                         metric_name="Average Spending per Visitor",
@@ -996,7 +1227,7 @@ class TourismInsightsEngine:
                     
                     # Spending by nationality
                     if 'nationality' in df.columns:
-                        nationality_spending = df.groupby('nationality')[spend_col].mean().sort_values(ascending=False)
+                        nationality_spending = self._dimension_mean(df, cube, 'nationality', spend_col).sort_values(ascending=False)
                         top_spending_nations = nationality_spending.head(3)
                         
                         for nationality, avg_spend in top_spending_nations.items():
@@ -1008,7 +1239,7 @@ class TourismInsightsEngine:
                     
                     for category in spending_categories:
                         if category in df.columns:
-                            category_spending[category] = df[category].mean()
+                            category_spending[category] = self._measure_mean(df, cube, category)
                     
                     if category_spending:
                         top_category = max(category_spending, key=category_spending.get)
@@ -1020,8 +1251,7 @@ class TourismInsightsEngine:
             # Satisfaction and Experience Analysis
             if 'satisfaction_score' in df.columns:
                 try:
-                    avg_satisfaction = df['satisfaction_score'].mean()
-                    satisfaction_std = df['satisfaction_score'].std()
+                    avg_satisfaction = self._measure_mean(df, cube, 'satisfaction_score')
                     
                     metrics.append(InsightMetric(
                         metric_name="Overall Satisfaction Score",
@@ -1040,7 +1270,7 @@ class TourismInsightsEngine:
                     
                     # Satisfaction by nationality
                     if 'nationality' in df.columns:
-                        nationality_satisfaction = df.groupby('nationality')['satisfaction_score'].mean().sort_values(ascending=False)
+                        nationality_satisfaction = self._dimension_mean(df, cube, 'nationality', 'satisfaction_score').sort_values(ascending=False)
                         low_satisfaction_markets = nationality_satisfaction[nationality_satisfaction < 3.5]
                         
                         if len(low_satisfaction_markets) > 0:
@@ -1052,8 +1282,7 @@ class TourismInsightsEngine:
             # Tourism Destination Performance
             if 'tourist_destination' in df.columns:
                 try:
-                    destination_performance = df['tourist_destination'].value_counts()
-                    top_destinations = destination_performance.head(5)
+                    top_destinations = self._dimension_top(df, sketches, 'tourist_destination', 5)
                     
                     for i, (destination, count) in enumerate(top_destinations.head(3).items()):
                         share = (count / len(df)) * 100
@@ -1077,10 +1306,12 @@ class TourismInsightsEngine:
             # Age Demographics Analysis
             if 'age' in df.columns:
                 try:
-                    avg_age = df['age'].mean()
-                    age_distribution = pd.cut(df['age'], bins=[0, 25, 35, 50, 65, 100], 
-                                            labels=['18-25', '26-35', '36-50', '51-65', '65+'])
-                    age_segments = age_distribution.value_counts()
+                    if cube is not None and cube.has_dimension('age_group'):
+                        age_segments = cube.counts('age_group')
+                    else:
+                        age_distribution = pd.cut(df['age'], bins=[0, 25, 35, 50, 65, 100], 
+                                                labels=['18-25', '26-35', '36-50', '51-65', '65+'])
+                        age_segments = age_distribution.value_counts()
                     
                     dominant_age_group = age_segments.index[0]
                     dominant_percentage = (age_segments.iloc[0] / len(df)) * 100
@@ -1102,7 +1333,8 @@ class TourismInsightsEngine:
             # Gender Distribution Analysis
             if 'sex' in df.columns:
                 try:
-                    gender_distribution = df['sex'].value_counts(normalize=True) * 100
+                    gender_counts = self._dimension_counts(df, cube, 'sex')
+                    gender_distribution = gender_counts / gender_counts.sum() * 100
                     
                     for gender, percentage in gender_distribution.items():
                         if percentage > 60:  # Significant gender skew
@@ -1115,12 +1347,16 @@ class TourismInsightsEngine:
             # Seasonal Pattern Analysis
             if 'arrival_date' in df.columns:
                 try:
-                    df['arrival_date'] = pd.to_datetime(df['arrival_date'], errors='coerce')
-                    df_with_dates = df.dropna(subset=['arrival_date'])
+                    if cube is not None and cube.has_dimension('day'):
+                        daily_arrivals = cube.counts('day')
+                    else:
+                        arrival_dates = pd.to_datetime(df['arrival_date'], errors='coerce').dt.normalize()
+                        daily_arrivals = arrival_dates.value_counts()
+                    arrival_days = pd.DatetimeIndex(daily_arrivals.index)
                     
-                    if not df_with_dates.empty:
+                    if not daily_arrivals.empty:
                         # Monthly arrival patterns
-                        monthly_arrivals = df_with_dates.groupby(df_with_dates['arrival_date'].dt.month).size()
+                        monthly_arrivals = daily_arrivals.groupby(arrival_days.month).sum()
                         peak_month = monthly_arrivals.idxmax()
                         low_month = monthly_arrivals.idxmin()
                         
@@ -1131,7 +1367,7 @@ class TourismInsightsEngine:
                         ])
                         
                         # Weekly patterns
-                        weekly_arrivals = df_with_dates.groupby(df_with_dates['arrival_date'].dt.day_name()).size()
+                        weekly_arrivals = daily_arrivals.groupby(arrival_days.day_name()).sum()
                         peak_day = weekly_arrivals.idxmax()
                         
                         recommendations.append(f"Optimize marketing campaigns for {peak_day} arrivals")
@@ -1158,6 +1394,45 @@ class TourismInsightsEngine:
         
         return metrics, recommendations, action_items, alert_level
     
+    def _dimension_counts(self, df: pd.DataFrame, cube: Optional[DimensionCube], column: str) -> pd.Series:
+        """value_counts() for a dimension, answered from the cube when possible"""
+        if cube is not None and cube.has_dimension(column):
+            return cube.counts(column)
+        return df[column].value_counts()
+    
+    def _dimension_mean(self, df: pd.DataFrame, cube: Optional[DimensionCube], column: str, measure: str) -> pd.Series:
+        """Per-dimension mean of a measure, answered from the cube when possible"""
+        if cube is not None and cube.has_dimension(column) and cube.has_measure(measure):
+            return cube.mean(column, measure)
+        return df.groupby(column)[measure].mean()
+    
+    def _dimension_top(self, df: pd.DataFrame, sketches: Optional[DimensionSketches], column: str,
+                       n: int) -> pd.Series:
+        """Top-n value counts for a dimension, answered from the heavy-hitter sketch when possible"""
+        if sketches is not None and sketches.has_dimension(column):
+            return sketches.top(column, n)
+        return df[column].value_counts().head(n)
+    
+    def _dimension_distinct(self, df: pd.DataFrame, sketches: Optional[DimensionSketches], column: str) -> int:
+        """Distinct count for a dimension, answered from the HyperLogLog sketch when possible"""
+        if sketches is not None and sketches.has_dimension(column):
+            return sketches.distinct(column)
+        return df[column].nunique()
+    
+    def _measure_mean(self, df: pd.DataFrame, cube: Optional[DimensionCube], measure: str) -> float:
+        """Overall mean of a measure, answered from the cube when possible"""
+        if cube is not None and cube.has_measure(measure):
+            return cube.total_mean(measure)
+        return df[measure].mean()
+    
+    @register_department(
+        'research_development',
+        focus_metrics=['innovation_metrics', 'tourist_behavior', 'emerging_trends', 'competitive_analysis'],
+        priority='strategic_insights',
+        tables=['arrivals', 'occupancy'],
+        columns=['nationality'],
+        metrics=['Market Diversity Index', 'Digital Technology Adoption']
+    )
     def _rd_insights(self, data: Dict[str, pd.DataFrame], forecasts: Dict[str, Any]) -> Tuple[List[InsightMetric], List[str], List[str], str]:
         """Generate R&D team insights"""
         
@@ -1170,7 +1445,8 @@ class TourismInsightsEngine:
         if not data['arrivals'].empty and not data['occupancy'].empty:
             # Market diversity index using nationality instead of origin
             if 'nationality' in data['arrivals'].columns:
-                unique_origins = data['arrivals']['nationality'].nunique()
+                sketches = self._get_dimension_sketches(data['arrivals'])
+                unique_origins = self._dimension_distinct(data['arrivals'], sketches, 'nationality')
                 total_arrivals = len(data['arrivals'])
                 diversity_index = unique_origins / max(1, total_arrivals / 100)  # Normalized
                 
@@ -1213,6 +1489,15 @@ class TourismInsightsEngine:
         
         return metrics, recommendations, action_items, alert_level
     
+    @register_department(
+        'resource_mobility',
+        focus_metrics=['resource_allocation', 'transportation', 'infrastructure_usage', 'logistics'],
+        priority='resource_optimization',
+        tables=['arrivals', 'occupancy'],
+        columns=DATE_COLUMNS + ['region_name', 'region', 'location', 'destination', 'region_id', 'total_rooms',
+                                'occupied_rooms'],
+        metrics=['Airport Congestion Score', 'Regional Resource Efficiency']
+    )
     def _resource_mobility_insights(self, data: Dict[str, pd.DataFrame], forecasts: Dict[str, Any]) -> Tuple[List[InsightMetric], List[str], List[str], str]:
         """Generate resource mobility insights"""
         
@@ -1225,8 +1510,7 @@ class TourismInsightsEngine:
             df = data['arrivals']
             
             # Transportation efficiency (based on arrival patterns)
-            date_columns = ['timestamp', 'date', 'arrival_date', 'created_at']
-            date_col = next((col for col in date_columns if col in df.columns), None)
+            date_col = next((col for col in DATE_COLUMNS if col in df.columns), None)
             
             if date_col:
                 try:
@@ -1261,17 +1545,14 @@ class TourismInsightsEngine:
             df = data['occupancy']
             
             # Regional resource distribution
-            region_columns = ['region_name', 'region', 'location', 'destination']
+            # The Supabase occupancy table only carries region_id
+            region_columns = ['region_name', 'region', 'location', 'destination', 'region_id']
             region_col = next((col for col in region_columns if col in df.columns), None)
             
             if region_col and 'total_rooms' in df.columns:
                 try:
-                    regional_capacity = df.groupby(region_col)['total_rooms'].sum()
-                    
                     if 'occupied_rooms' in df.columns:
-                        regional_utilization = df.groupby(region_col).apply(
-                            lambda x: x['occupied_rooms'].sum() / x['total_rooms'].sum() if x['total_rooms'].sum() > 0 else 0
-                        )
+                        regional_utilization = grouped_ratio_of_sums(df, region_col, 'occupied_rooms', 'total_rooms')
                         
                         # Resource efficiency score
                         efficiency_score = (regional_utilization.mean()) * 100
@@ -1305,6 +1586,15 @@ class TourismInsightsEngine:
         
         return metrics, recommendations, action_items, alert_level
     
+    @register_department(
+        'tourism_funding',
+        focus_metrics=['revenue_generation', 'investment_returns', 'economic_impact', 'funding_efficiency'],
+        priority='financial_performance',
+        tables=['occupancy', 'arrivals'],
+        columns=['revenue', 'date', 'timestamp', 'created_at', 'passenger_count', 'visitors', 'tourist_count',
+                 'region_name', 'region', 'location', 'destination', 'region_id', 'total_rooms'],
+        metrics=['Total Tourism Revenue', 'Revenue per Visitor', 'Projected Economic Impact']
+    )
     def _funding_insights(self, data: Dict[str, pd.DataFrame], forecasts: Dict[str, Any]) -> Tuple[List[InsightMetric], List[str], List[str], str]:
         """Generate tourism funding insights"""
         
@@ -1381,16 +1671,13 @@ class TourismInsightsEngine:
         if not data['occupancy'].empty:
             df = data['occupancy']
             
-            region_columns = ['region_name', 'region', 'location', 'destination']
+            region_columns = ['region_name', 'region', 'location', 'destination', 'region_id']
             region_col = next((col for col in region_columns if col in df.columns), None)
             
             if region_col and 'revenue' in df.columns and 'total_rooms' in df.columns:
                 try:
-                    regional_revenue = df.groupby(region_col)['revenue'].sum()
-                    regional_capacity = df.groupby(region_col)['total_rooms'].sum()
-                    
                     # Revenue per room capacity (efficiency indicator)
-                    regional_efficiency = regional_revenue / regional_capacity
+                    regional_efficiency = grouped_ratio_of_sums(df, region_col, 'revenue', 'total_rooms')
                     top_performers = regional_efficiency.nlargest(3)
                     
                     for region, efficiency in top_performers.items():
@@ -1440,59 +1727,213 @@ class TourismInsightsEngine:
         
         return metrics, recommendations, action_items, alert_level
     
-    def generate_comprehensive_report(self, output_format: str = 'json') -> Dict[str, Any]:
-        """Generate comprehensive analytics report for all departments"""
+    def generate_comprehensive_report(self, output_format: str = 'json',
+                                      sections: Optional[List[str]] = None) -> Union[LazyReport, Dict[str, Any]]:
+        """
+        Generate comprehensive analytics report for all departments.
+
+        The report is a LazyReport: each section is computed on first access.
+        Pass ``sections`` (e.g. ``['forecasts']`` or
+        ``['dimensional_analysis.regions']``) to restrict the report to the
+        panels a caller actually needs.
+        """
         
         try:
-            # Load data
+            # Load data, projected onto the columns the requested sections need
             client = self.connect_to_supabase()
-            data = self.load_tourism_data(client)
+            data = self.load_tourism_data(client, columns=self.required_columns(sections))
+            # Forecasts read daily series aggregated in the database where available
+            series = self.load_daily_series(client) if self.FORECAST_SECTIONS & self._report_section_names(sections) else {}
             
-            # Generate forecasts
-            forecasts = self.generate_forecasts(data)
-            
-            # Generate departmental insights
-            departmental_insights = self.generate_departmental_insights(data, forecasts)
-            
-            # Create comprehensive report
-            report = {
-                'report_metadata': {
-                    'generated_at': datetime.now().isoformat(),
-                    'data_period': f"Last {len(data.get('arrivals', pd.DataFrame()))} records",
-                    'forecast_period': '30 days',
-                    'confidence_level': 0.85
-                },
-                'executive_summary': self._generate_executive_summary(departmental_insights, forecasts, data),
-                'forecasts': forecasts,
-                'departmental_insights': {
-                    dept: {
-                        'department': insight.department,
-                        'alert_level': insight.alert_level,
-                        'key_metrics': [
-                            {
-                                'name': metric.metric_name,
-                                'current_value': metric.current_value,
-                                'predicted_value': metric.predicted_value,
-                                'trend': metric.trend,
-                                'confidence': metric.confidence,
-                                'impact_level': metric.impact_level,
-                                'recommendation': metric.recommendation
-                            } for metric in insight.key_metrics
-                        ],
-                        'recommendations': insight.recommendations,
-                        'action_items': insight.action_items
-                    } for dept, insight in departmental_insights.items()
-                },
-                'cross_departmental_initiatives': self._generate_cross_departmental_initiatives(departmental_insights)
-            }
-            
-            return report
+            return self.build_report(data, sections=sections, series=series)
             
         except Exception as e:
             logger.error(f"Error generating comprehensive report: {str(e)}")
             return {'error': str(e), 'timestamp': datetime.now().isoformat()}
     
-    def _generate_executive_summary(self, insights: Dict[str, DepartmentInsight], forecasts: Dict[str, Any], data: Dict[str, pd.DataFrame] = None) -> Dict[str, Any]:
+    DEFAULT_REPORT_SECTIONS = ['report_metadata', 'executive_summary', 'forecasts',
+                               'departmental_insights', 'cross_departmental_initiatives']
+    
+    # Source columns read by report sections outside the department handlers
+    FORECAST_COLUMNS = DATE_COLUMNS + [
+        'home_region', 'hotel_nights', 'hotel_rating', 'visit_duration_days', 'passenger_count', 'visitors',
+        'total_rooms', 'occupied_rooms', 'revenue', 'total_revenue', 'income', 'earnings',
+        'total_spend', 'occupancy_rate'
+    ]
+    INDICATOR_COLUMNS = DATE_COLUMNS + ['nationality']
+    DIMENSION_VALUE_COLUMNS = ['total_spend', 'spend_amount', 'hotel_spend', 'activity_spend', 'flight_spend', 'package_spend']
+    
+    # Sections that evaluate the forecasts
+    FORECAST_SECTIONS = {'forecasts', 'departmental_insights', 'performance_indicators'}
+    
+    def _report_section_names(self, sections: Optional[List[str]] = None) -> Set[str]:
+        """Top-level sections evaluated for a report request, including those the executive summary reads"""
+        requested = split_section_names(sections)
+        names = set(requested) if requested is not None else set(self.DEFAULT_REPORT_SECTIONS)
+        if 'executive_summary' in names:
+            names |= {'forecasts', 'departmental_insights', 'dimensional_analysis', 'performance_indicators'}
+        return names
+    
+    def required_columns(self, sections: Optional[List[str]] = None) -> Set[str]:
+        """Source columns needed to build the requested report sections for the enabled departments"""
+        
+        requested = split_section_names(sections)
+        names = self._report_section_names(sections)
+        
+        needed = set(DATE_COLUMNS)
+        if names & self.FORECAST_SECTIONS:
+            needed.update(self.FORECAST_COLUMNS)
+        if 'departmental_insights' in names:
+            needed |= department_columns(self.departments)
+        if 'performance_indicators' in names:
+            needed.update(self.INDICATOR_COLUMNS)
+        if 'dimensional_analysis' in names:
+            dimensions = (requested or {}).get('dimensional_analysis') or list(self.REPORT_DIMENSIONS)
+            needed.update(self.REPORT_DIMENSIONS[name][0] for name in dimensions if name in self.REPORT_DIMENSIONS)
+            needed.update(self.DIMENSION_VALUE_COLUMNS)
+        
+        return expand_derived(needed)
+    
+    def build_report(self, data: Dict[str, pd.DataFrame], forecast_days: int = 30,
+                     sections: Optional[List[str]] = None,
+                     series: Optional[Dict[str, pd.DataFrame]] = None) -> LazyReport:
+        """Build a lazily evaluated report over already loaded data (and daily series, see generate_forecasts)"""
+        
+        requested = split_section_names(sections)
+        dimensions = self._dimension_report(data, requested.get('dimensional_analysis') if requested else None)
+        
+        # Section results are reused while the data fingerprint (and day) is unchanged
+        data_digest = self.data_fingerprint(data)
+        if series:
+            data_digest = combine_digests({'tables': data_digest, 'forecasts': self.forecast_fingerprint(data, series)})
+        section_key = (data_digest, forecast_days, datetime.now().date(), tuple(self.departments))
+        
+        report: LazyReport = None
+        
+        def build_departmental_insights() -> Dict[str, DepartmentInsight]:
+            return self._memoized(
+                ('departmental_insights',) + section_key,
+                lambda: self.generate_departmental_insights(data, report.section('forecasts'))
+            )
+        
+        def build_executive_summary() -> Dict[str, Any]:
+            return self._generate_executive_summary(
+                report.section('_department_insights'),
+                report.section('forecasts'),
+                data,
+                dimensional_analysis=dimensions.section('_all'),
+                performance_indicators=report.section('performance_indicators')
+            )
+        
+        builders = {
+            'report_metadata': lambda: {
+                'generated_at': datetime.now().isoformat(),
+                'data_period': f"Last {len(data.get('arrivals', pd.DataFrame()))} records",
+                'forecast_period': f'{forecast_days} days',
+                'confidence_level': 0.85,
+                'data_fingerprint': data_digest
+            },
+            'executive_summary': build_executive_summary,
+            'forecasts': lambda: self.generate_forecasts(data, forecast_days, series=series),
+            'departmental_insights': lambda: {
+                dept: self._serialize_department_insight(insight)
+                for dept, insight in report.section('_department_insights').items()
+            },
+            'cross_departmental_initiatives': lambda: self._generate_cross_departmental_initiatives(
+                report.section('_department_insights') if report.is_computed('_department_insights') else {}
+            ),
+            'dimensional_analysis': lambda: dimensions,
+            'metric_trends': lambda: self.metric_trends(),
+            'performance_indicators': lambda: self._memoized(
+                ('performance_indicators',) + section_key,
+                lambda: self._calculate_performance_indicators(data, report.section('forecasts'))
+            ),
+            '_department_insights': build_departmental_insights
+        }
+        
+        report = LazyReport(
+            builders,
+            default_sections=self.DEFAULT_REPORT_SECTIONS,
+            sections=list(requested) if requested is not None else None
+        )
+        return report
+    
+    def _serialize_department_insight(self, insight: DepartmentInsight) -> Dict[str, Any]:
+        """Flatten a DepartmentInsight into the report's JSON structure"""
+        return {
+            'department': insight.department,
+            'alert_level': insight.alert_level,
+            'key_metrics': [
+                {
+                    'name': metric.metric_name,
+                    'current_value': metric.current_value,
+                    'predicted_value': metric.predicted_value,
+                    'trend': metric.trend,
+                    'confidence': metric.confidence,
+                    'impact_level': metric.impact_level,
+                    'recommendation': metric.recommendation
+                } for metric in insight.key_metrics
+            ],
+            'recommendations': insight.recommendations,
+            'action_items': insight.action_items
+        }
+    
+    # Report dimension name -> (source column, top_n)
+    REPORT_DIMENSIONS = {
+        'regions': ('home_region', 5),
+        'destinations': ('tourist_destination', 5),
+        'sectors': ('sector', 5),
+        'demographics': ('sex', 5),
+        'nationalities': ('nationality', 10),
+        'age_groups': ('age', 5),
+        'package_types': ('package_type', 5)
+    }
+    
+    def _dimension_report(self, data: Dict[str, pd.DataFrame], dimensions: Optional[List[str]] = None) -> LazyReport:
+        """Build a LazyReport with one lazily analyzed section per available dimension"""
+        
+        df = data.get('arrivals') if data else None
+        available = []
+        if df is not None and not df.empty:
+            available = [name for name, (col, _) in self.REPORT_DIMENSIONS.items() if col in df.columns]
+        
+        def build_dimension(name: str) -> Callable[[], Dict[str, Any]]:
+            column, top_n = self.REPORT_DIMENSIONS[name]
+            
+            def build() -> Dict[str, Any]:
+                return self._memoized(('dimension', name, frame_fingerprint(df, self.fingerprints).digest),
+                                      analyze)
+            
+            def analyze() -> Dict[str, Any]:
+                try:
+                    if name == 'age_groups':
+                        cube = self._get_dimension_cube(df)
+                        if cube is not None and cube.has_dimension('age_group'):
+                            return self._analyze_dimension(df, 'age_group', top_n=top_n)
+                        # Create age groups for analysis
+                        df_copy = df[[col for col in df.columns if col != 'age_group']].copy()
+                        df_copy['age_group'] = pd.cut(df_copy['age'], 
+                                                    bins=[0, 25, 35, 50, 65, 100], 
+                                                    labels=['18-25', '26-35', '36-50', '51-65', '65+'])
+                        return self._analyze_dimension(df_copy, 'age_group', top_n=top_n, use_cube=False)
+                    return self._analyze_dimension(df, column, top_n=top_n)
+                except Exception as e:
+                    logger.warning(f"Error in dimensional analysis for {name}: {str(e)}")
+                    return {'error': f"Analysis error: {str(e)}"}
+            return build
+        
+        builders = {name: build_dimension(name) for name in available}
+        dimension_report: LazyReport = None
+        builders['_all'] = lambda: {name: dimension_report.section(name) for name in available}
+        
+        dimension_report = LazyReport(builders, default_sections=available,
+                                      sections=[name for name in dimensions if name in available] if dimensions else None)
+        return dimension_report
+    
+    def _generate_executive_summary(self, insights: Dict[str, DepartmentInsight], forecasts: Dict[str, Any],
+                                    data: Dict[str, pd.DataFrame] = None,
+                                    dimensional_analysis: Optional[Dict[str, Any]] = None,
+                                    performance_indicators: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Generate comprehensive executive summary with multi-dimensional analysis"""
         
         # Count alerts by level
@@ -1520,55 +1961,11 @@ class TourismInsightsEngine:
             forecast_summary['revenue'] = forecasts['revenue']['total_predicted_revenue']
         
         # Multi-dimensional analysis
-        dimensional_analysis = {}
+        if dimensional_analysis is None:
+            dimensional_analysis = self._dimension_report(data).section('_all')
         
-        if data and 'arrivals' in data and not data['arrivals'].empty:
-            df = data['arrivals']
-            
-            try:
-                # Regional analysis (using home_region from real CSV)
-                if 'home_region' in df.columns:
-                    regional_performance = self._analyze_dimension(df, 'home_region')
-                    dimensional_analysis['regions'] = regional_performance
-                
-                # Destination analysis (using tourist_destination from real CSV)
-                if 'tourist_destination' in df.columns:
-                    destination_performance = self._analyze_dimension(df, 'tourist_destination')
-                    dimensional_analysis['destinations'] = destination_performance
-                
-                # Sector analysis (using sector from real CSV)
-                if 'sector' in df.columns:
-                    sector_performance = self._analyze_dimension(df, 'sector')
-                    dimensional_analysis['sectors'] = sector_performance
-                
-                # Gender analysis (using sex from real CSV)
-                if 'sex' in df.columns:
-                    gender_performance = self._analyze_dimension(df, 'sex')
-                    dimensional_analysis['demographics'] = gender_performance
-                
-                # Nationality analysis (using nationality from real CSV)
-                if 'nationality' in df.columns:
-                    nationality_performance = self._analyze_dimension(df, 'nationality', top_n=10)
-                    dimensional_analysis['nationalities'] = nationality_performance
-                
-                # Age group analysis
-                if 'age' in df.columns:
-                    # Create age groups for analysis
-                    df_copy = df.copy()
-                    df_copy['age_group'] = pd.cut(df_copy['age'], 
-                                                bins=[0, 25, 35, 50, 65, 100], 
-                                                labels=['18-25', '26-35', '36-50', '51-65', '65+'])
-                    age_performance = self._analyze_dimension(df_copy, 'age_group')
-                    dimensional_analysis['age_groups'] = age_performance
-                
-                # Package type analysis
-                if 'package_type' in df.columns:
-                    package_performance = self._analyze_dimension(df, 'package_type')
-                    dimensional_analysis['package_types'] = package_performance
-                    
-            except Exception as e:
-                logger.warning(f"Error in dimensional analysis: {str(e)}")
-                dimensional_analysis['error'] = f"Analysis error: {str(e)}"
+        if performance_indicators is None:
+            performance_indicators = self._calculate_performance_indicators(data, forecasts)
         
         # Generate key opportunities based on analysis
         key_opportunities = self._generate_key_opportunities(dimensional_analysis, forecasts)
@@ -1580,12 +1977,66 @@ class TourismInsightsEngine:
             'forecast_summary': forecast_summary,
             'dimensional_analysis': dimensional_analysis,
             'key_opportunities': key_opportunities,
-            'performance_indicators': self._calculate_performance_indicators(data, forecasts)
+            'performance_indicators': performance_indicators
         }
     
-    def _analyze_dimension(self, df: pd.DataFrame, dimension_col: str, value_col: str = None, top_n: int = 5) -> Dict[str, Any]:
+    def _get_dimension_cube(self, df: pd.DataFrame) -> Optional[DimensionCube]:
+        """Return the aggregate cube for a visits frame, building it once per data snapshot"""
+        
+        if df is None or df.empty:
+            return None
+        if self._cube_memo is not None and self._cube_memo[0] is df:
+            return self._cube_memo[1]
+        
+        try:
+            snapshot_key = frame_fingerprint(df, self.fingerprints).digest
+        except Exception as e:
+            logger.warning(f"Could not fingerprint frame for dimension cube: {str(e)}")
+            snapshot_key = None
+        if snapshot_key and self._cube_memo is not None and self._cube_memo[1].snapshot_key == snapshot_key:
+            # Same content loaded again: reuse the in-memory cube
+            self._cube_memo = (df, self._cube_memo[1])
+            return self._cube_memo[1]
+        
+        cube_path = None
+        if self.cache_dir and snapshot_key:
+            cube_path = os.path.join(self.cache_dir, 'dimension_cube.parquet')
+        
+        cube = DimensionCube.load(cube_path, snapshot_key) if cube_path else None
+        if cube is None:
+            try:
+                cube = DimensionCube.build(df, snapshot_key=snapshot_key)
+            except Exception as e:
+                logger.warning(f"Could not build dimension cube, analysing raw rows: {str(e)}")
+                return None
+            if cube_path:
+                cube.save(cube_path)
+        
+        self._cube_memo = (df, cube)
+        return cube
+    
+    def _get_dimension_sketches(self, df: pd.DataFrame) -> Optional[DimensionSketches]:
+        """
+        Top-k / distinct-count sketches the dataset reader built for this frame,
+        or None (exact counts) for frames loaded without them
+        """
+        
+        memo = self._sketch_memo
+        if df is None or df.empty or memo is None or memo[0] is not df:
+            return None
+        return memo[1]
+    
+    def _analyze_dimension(self, df: pd.DataFrame, dimension_col: str, value_col: str = None, top_n: int = 5,
+                           use_cube: bool = True) -> Dict[str, Any]:
         """Analyze performance across a specific dimension"""
         
+        if use_cube:
+            cube = self._get_dimension_cube(df)
+            if cube is not None and cube.has_dimension(dimension_col):
+                result = self._analyze_cube_dimension(cube, df, dimension_col, value_col, top_n)
+                if result is not None:
+                    return result
+        
         if dimension_col not in df.columns:
             return {}
         
@@ -1643,6 +2094,58 @@ class TourismInsightsEngine:
             'growth_potential': self._assess_growth_potential(analysis)
         }
     
+    def _analyze_cube_dimension(self, cube: DimensionCube, df: pd.DataFrame, dimension_col: str,
+                                value_col: Optional[str], top_n: int) -> Optional[Dict[str, Any]]:
+        """Answer _analyze_dimension from the aggregate cube (None if the cube lacks the measure)"""
+        
+        if value_col is None:
+            value_cols = ['total_spend', 'spend_amount', 'hotel_spend', 'activity_spend', 'flight_spend', 'package_spend']
+            value_col = next((col for col in value_cols if col in df.columns), None)
+            
+            if value_col is None:
+                analysis = cube.counts(dimension_col).head(top_n)
+                return {
+                    'top_performers': [
+                        {'name': str(idx), 'value': int(val), 'percentage': round(val/analysis.sum()*100, 2)}
+                        for idx, val in analysis.items()
+                    ],
+                    'total_categories': cube.nunique(dimension_col),
+                    'metric_type': 'count'
+                }
+        
+        if value_col in df.columns and pd.api.types.is_numeric_dtype(df[value_col]):
+            if not cube.has_measure(value_col):
+                return None
+            # Use sum for spending columns, mean for ratings
+            if 'spend' in value_col.lower() or 'revenue' in value_col.lower():
+                analysis = cube.sum(dimension_col, value_col).sort_values(ascending=False).head(top_n)
+                metric_type = f"total_{value_col}"
+            elif 'rating' in value_col.lower() or 'score' in value_col.lower():
+                analysis = cube.mean(dimension_col, value_col).sort_values(ascending=False).head(top_n)
+                metric_type = f"avg_{value_col}"
+            else:
+                analysis = cube.sum(dimension_col, value_col).sort_values(ascending=False).head(top_n)
+                metric_type = value_col
+        else:
+            analysis = cube.counts(dimension_col).head(top_n)
+            metric_type = 'count'
+        
+        total_value = analysis.sum()
+        
+        return {
+            'top_performers': [
+                {
+                    'name': str(idx),
+                    'value': float(val),
+                    'percentage': round(val/total_value*100, 2) if total_value > 0 else 0
+                }
+                for idx, val in analysis.items()
+            ],
+            'total_categories': cube.nunique(dimension_col),
+            'metric_type': metric_type,
+            'growth_potential': self._assess_growth_potential(analysis)
+        }
+    
     def _assess_growth_potential(self, data_series) -> str:
         """Assess growth potential based on distribution"""
         if len(data_series) == 0:
@@ -1711,8 +2214,8 @@ class TourismInsightsEngine:
             
             # Diversity index (using nationality column from real CSV)
             if 'nationality' in df.columns:
-                nationality_counts = df['nationality'].value_counts()
-                diversity_index = len(nationality_counts) / len(df) * 100
+                sketches = self._get_dimension_sketches(df)
+                diversity_index = self._dimension_distinct(df, sketches, 'nationality') / len(df) * 100
                 indicators['market_diversity_index'] = round(diversity_index, 2)
             
             # Growth indicators (using arrival_date from real CSV)
@@ -1845,8 +2348,11 @@ def lambda_handler(event, context):
     """AWS Lambda handler for the insights engine"""
     
     try:
-        engine = TourismInsightsEngine()
-        report = engine.generate_comprehensive_report()
+        engine = TourismInsightsEngine(departments=(event or {}).get('departments'))
+        sections = (event or {}).get('sections')
+        report = engine.generate_comprehensive_report(sections=sections)
+        if isinstance(report, LazyReport):
+            report = report.to_dict()
         
         return {
             'statusCode': 200,
@@ -1871,4 +2377,6 @@ if __name__ == "__main__":
     # Local testing
     engine = TourismInsightsEngine()
     report = engine.generate_comprehensive_report()
+    if isinstance(report, LazyReport):
+        report = report.to_dict()
     print(json.dumps(report, indent=2)) 
\ No newline at end of file
@@ -0,0 +1,317 @@
+"""
+Tourism Tables Generator
+========================
+Vectorized synthetic data for the Supabase source tables: ``regions``,
+``arrivals``, ``occupancy``, ``visits`` and ``surveys``, with the columns
+of ``TOURISM_TABLE_COLUMNS`` (see supabase_sync_simple.py).
+
+The tables are referentially consistent: hotels and sites belong to a
+region, occupancy has one row per hotel and day, visits reference their
+site's region and surveys reference visits. Volume is set by
+``TableVolumes`` (hotels, sites, flights and visit records per day, survey
+response rate) and daily intensity follows the same ``Seasonality`` as the
+flat generator, so occupancy, arrivals and visits peak together.
+
+``write_sqlite`` stores the tables in a local SQLite file and
+``load_sqlite`` reads them back in the shape ``load_tourism_data``
+returns, as a stand-in database for profiling the multi-table load and
+insight paths without a Supabase project.
+"""
+
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Set, Union
+
+import numpy as np
+import pandas as pd
+
+from tourism_data_generator import (
+    DEFAULT_DAYS, REGION_DESTINATIONS, REGIONS, SENTIMENT_COMMENTS, Seasonality, _choice, _nested_choice,
+    default_start_date
+)
+
+logger = logging.getLogger(__name__)
+
+TABLES = ['regions', 'arrivals', 'occupancy', 'visits', 'surveys']
+DATA_SOURCE = 'synthetic'
+
+# Share of hotels (and sites) per region
+REGION_WEIGHTS = {
+    'Addis Ababa': 0.32, 'Oromia': 0.17, 'Amhara': 0.18, 'Tigray': 0.09, 'Somali': 0.04,
+    'SNNPR': 0.10, 'Afar': 0.04, 'Harari': 0.06
+}
+
+ORIGIN_AIRPORTS = {
+    'DXB': 0.12, 'NBO': 0.10, 'JNB': 0.06, 'LHR': 0.07, 'FRA': 0.07, 'IAD': 0.06, 'CDG': 0.05,
+    'IST': 0.06, 'DEL': 0.06, 'PEK': 0.06, 'CAI': 0.05, 'JED': 0.06, 'LOS': 0.05, 'ACC': 0.04,
+    'KGL': 0.04, 'EBB': 0.05
+}
+# Bole International takes most flights; the rest land at regional airports
+DESTINATION_AIRPORTS = {'ADD': 0.85, 'DIR': 0.04, 'BJR': 0.03, 'LLI': 0.03, 'GDQ': 0.03, 'AXU': 0.02}
+AIRLINE_CODES = {'ET': 0.70, 'EK': 0.07, 'TK': 0.06, 'KQ': 0.05, 'LH': 0.04, 'QR': 0.04, 'MS': 0.04}
+# Aircraft type and seats
+AIRCRAFT_SEATS = {'B787-8': 270, 'B787-9': 315, 'A350-900': 348, 'B777-300ER': 400, 'B737-800': 160,
+                  'Q400': 78}
+
+# Hotel tiers: share of hotels, room count range and average daily rate range (USD)
+HOTEL_TIERS = {
+    'Guest House': (0.35, (8, 30), (25, 60)),
+    'Hotel': (0.40, (30, 120), (60, 140)),
+    'Resort': (0.15, (40, 200), (120, 260)),
+    'International Hotel': (0.10, (150, 450), (180, 400)),
+}
+
+SURVEY_TYPES = {'post_visit': 0.70, 'exit_survey': 0.20, 'online': 0.10}
+LANGUAGE_CODES = {'en': 0.50, 'am': 0.25, 'fr': 0.07, 'de': 0.06, 'zh': 0.06, 'ar': 0.06}
+# Rating 1-5 and the sentiment each rating maps to
+RATING_WEIGHTS = (0.04, 0.08, 0.18, 0.38, 0.32)
+RATING_SENTIMENTS = ('negative', 'negative', 'neutral', 'positive', 'positive')
+VISITOR_DEMOGRAPHICS = [
+    '{"age_group": "18-29", "nationality": "Ethiopian"}',
+    '{"age_group": "30-44", "nationality": "Ethiopian"}',
+    '{"age_group": "30-44", "nationality": "International"}',
+    '{"age_group": "45-64", "nationality": "International"}',
+    '{"age_group": "65+", "nationality": "International"}',
+    '{"age_group": "18-29", "nationality": "Diaspora"}',
+]
+
+
+@dataclass
+class TableVolumes:
+    """How much data to generate per table"""
+    days: int = DEFAULT_DAYS
+    hotels: int = 300
+    sites: int = 120
+    flights_per_day: float = 150.0  # Average arrivals rows per day
+    visits_per_site_day: float = 8.0  # Average visit records per site and day
+    survey_rate: float = 0.25  # Share of visits with a survey response
+
+    def scaled(self, factor: float) -> 'TableVolumes':
+        """The same window with ``factor`` times the hotels, sites and flights"""
+        return TableVolumes(days=self.days, hotels=max(1, round(self.hotels * factor)),
+                            sites=max(1, round(self.sites * factor)),
+                            flights_per_day=self.flights_per_day * factor,
+                            visits_per_site_day=self.visits_per_site_day, survey_rate=self.survey_rate)
+
+
+def _uuids(rng: np.random.Generator, size: int) -> np.ndarray:
+    """``size`` random version-4 UUID strings, formatted in one pass over a byte matrix"""
+    digits = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+    nibbles = rng.integers(0, 16, size=(size, 32), dtype=np.uint8)
+    nibbles[:, 12] = 4  # Version
+    nibbles[:, 16] = 8 | (nibbles[:, 16] & 3)  # RFC 4122 variant
+    chars = np.full((size, 36), ord('-'), dtype=np.uint8)
+    chars[:, [i for i in range(36) if i not in (8, 13, 18, 23)]] = digits[nibbles]
+    return chars.view('S36').ravel().astype(str).astype(object)
+
+
+def _weighted(rng: np.random.Generator, weights: Dict[str, float], size: int) -> pd.Categorical:
+    return _choice(rng, list(weights), size, p=np.array(list(weights.values())) / sum(weights.values()))
+
+
+def _timestamps(values: np.ndarray) -> pd.Series:
+    """datetime64 values as UTC timestamps, the way timestamptz columns arrive"""
+    return pd.Series(pd.to_datetime(values).tz_localize('UTC'))
+
+
+def generate_tables(volumes: Optional[TableVolumes] = None, rng: Union[np.random.Generator, int, None] = None,
+                    start_date: Optional[date] = None,
+                    seasonality: Optional[Seasonality] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Synthetic ``regions``, ``arrivals``, ``occupancy``, ``visits`` and
+    ``surveys`` tables over ``volumes.days`` days from ``start_date``
+    (default: ending today). ``rng`` is a Generator or a seed; the same
+    seed, volumes and start date always produce the same tables.
+    """
+    volumes = volumes or TableVolumes()
+    rng = np.random.default_rng(rng)
+    seasonality = seasonality or Seasonality()
+    days = volumes.days
+    start_date = start_date or default_start_date(days)
+    first_day = np.datetime64(start_date, 'D')
+    day_weights = seasonality.daily_weights(start_date, days)
+    # Daily intensity around 1.0, driving occupancy rates and room prices
+    intensity = day_weights / day_weights.mean()
+
+    region_ids = _uuids(rng, len(REGIONS))
+    regions = pd.DataFrame({
+        'id': region_ids,
+        'name': REGIONS,
+        'country_code': 'ET',
+        'timezone': 'Africa/Addis_Ababa',
+        'created_at': _timestamps(np.full(len(REGIONS), first_day, dtype='datetime64[s]'))
+    })
+    region_p = np.array([REGION_WEIGHTS.get(region, 0.01) for region in REGIONS])
+    region_p /= region_p.sum()
+
+    # Arrivals: one row per flight, timed by the seasonal day and hour weights
+    flights = int(round(volumes.flights_per_day * days))
+    flight_times = seasonality.draw_times(rng, flights, start_date, days)
+    aircraft = _weighted(rng, {name: 1.0 for name in AIRCRAFT_SEATS}, flights)
+    seats = np.array([AIRCRAFT_SEATS[name] for name in aircraft.categories])[aircraft.codes]
+    flight_day = ((flight_times.astype('datetime64[D]') - first_day).astype(np.int64))
+    load_factor = np.clip(0.72 * intensity[flight_day] + rng.normal(0, 0.06, size=flights), 0.2, 1.0)
+    airline = _weighted(rng, AIRLINE_CODES, flights)
+    arrivals = pd.DataFrame({
+        'id': _uuids(rng, flights),
+        'flight_number': (np.asarray(airline, dtype=object)
+                          + rng.integers(100, 1000, size=flights).astype(str).astype(object)),
+        'timestamp': _timestamps(flight_times),
+        'origin': _weighted(rng, ORIGIN_AIRPORTS, flights),
+        'destination': _weighted(rng, DESTINATION_AIRPORTS, flights),
+        'passenger_count': rng.binomial(seats, load_factor),
+        'aircraft_type': aircraft,
+        'segment_id': None,
+        'metadata': None,
+        'data_source': DATA_SOURCE,
+        'created_at': _timestamps(flight_times + rng.integers(60, 3600, size=flights))
+    }).sort_values('timestamp', ignore_index=True)
+
+    # Occupancy: every hotel reports every day
+    tier_names = list(HOTEL_TIERS)
+    tier_codes = rng.choice(len(tier_names), size=volumes.hotels, p=[tier[0] for tier in HOTEL_TIERS.values()])
+    room_bounds = np.array([tier[1] for tier in HOTEL_TIERS.values()])[tier_codes]
+    rate_bounds = np.array([tier[2] for tier in HOTEL_TIERS.values()])[tier_codes]
+    hotel_rooms = rng.integers(room_bounds[:, 0], room_bounds[:, 1] + 1)
+    hotel_rate = rng.uniform(rate_bounds[:, 0], rate_bounds[:, 1])
+    hotel_base_occupancy = rng.beta(6, 4, size=volumes.hotels)
+    hotel_regions = rng.choice(len(REGIONS), size=volumes.hotels, p=region_p)
+    hotel_names = np.array([f"{REGIONS[region]} {tier_names[tier]} {index + 1}"
+                            for index, (region, tier) in enumerate(zip(hotel_regions, tier_codes))], dtype=object)
+
+    hotel = np.repeat(np.arange(volumes.hotels), days)
+    day = np.tile(np.arange(days), volumes.hotels)
+    rows = len(hotel)
+    occupancy_rate = np.clip(hotel_base_occupancy[hotel] * intensity[day] + rng.normal(0, 0.05, size=rows), 0, 1)
+    occupied = rng.binomial(hotel_rooms[hotel], occupancy_rate)
+    average_rate = np.round(hotel_rate[hotel] * (0.8 + 0.2 * intensity[day]), 2)
+    occupancy_dates = first_day + day
+    occupancy = pd.DataFrame({
+        'id': _uuids(rng, rows),
+        'hotel_id': _uuids(rng, volumes.hotels)[hotel],
+        'hotel_name': hotel_names[hotel],
+        'date': occupancy_dates.astype('datetime64[s]'),
+        'total_rooms': hotel_rooms[hotel],
+        'occupied_rooms': occupied,
+        'average_rate': average_rate,
+        'revenue': np.round(occupied * average_rate, 2),
+        'region_id': region_ids[hotel_regions][hotel],
+        'data_source': DATA_SOURCE,
+        'created_at': _timestamps(occupancy_dates.astype('datetime64[s]') + np.timedelta64(23, 'h')
+                                  + rng.integers(0, 3600, size=rows))
+    })
+
+    # Visits: sites are destinations of their region, visit records follow the seasonal weights
+    site_regions = rng.choice(len(REGIONS), size=volumes.sites, p=region_p)
+    site_names = np.empty(volumes.sites, dtype=object)
+    for region in np.unique(site_regions):
+        destinations = REGION_DESTINATIONS[REGIONS[region]]
+        in_region = np.flatnonzero(site_regions == region)
+        site_names[in_region] = [destinations[index % len(destinations)] for index in range(len(in_region))]
+    visit_count = int(round(volumes.visits_per_site_day * volumes.sites * days))
+    visit_times = np.sort(seasonality.draw_times(rng, visit_count, start_date, days))
+    site = rng.integers(0, volumes.sites, size=visit_count)
+    visit_ids = _uuids(rng, visit_count)
+    visits = pd.DataFrame({
+        'id': visit_ids,
+        'site_id': _uuids(rng, volumes.sites)[site],
+        'site_name': site_names[site],
+        'timestamp': _timestamps(visit_times),
+        'visitor_count': rng.geometric(0.35, size=visit_count),
+        'visit_duration_minutes': np.round(rng.gamma(3, 40, size=visit_count)).astype(np.int64) + 15,
+        'visitor_demographics': _choice(rng, VISITOR_DEMOGRAPHICS, visit_count),
+        'region_id': region_ids[site_regions][site],
+        'data_source': DATA_SOURCE,
+        'created_at': _timestamps(visit_times)
+    })
+
+    # Surveys: a share of visits answer, some hours after the visit
+    answered = np.flatnonzero(rng.random(visit_count) < volumes.survey_rate)
+    responses = len(answered)
+    rating = rng.choice(5, size=responses, p=RATING_WEIGHTS) + 1
+    sentiment_names = list(SENTIMENT_COMMENTS)
+    sentiment_codes = np.array([sentiment_names.index(name) for name in RATING_SENTIMENTS])[rating - 1]
+    surveys = pd.DataFrame({
+        'id': _uuids(rng, responses),
+        'visit_id': visit_ids[answered],
+        'rating': rating,
+        'sentiment': pd.Categorical.from_codes(sentiment_codes, categories=sentiment_names),
+        'comments': _nested_choice(rng, sentiment_codes, SENTIMENT_COMMENTS),
+        'survey_type': _weighted(rng, SURVEY_TYPES, responses),
+        'language_code': _weighted(rng, LANGUAGE_CODES, responses),
+        'respondent_demographics': visits['visitor_demographics'].to_numpy()[answered],
+        'created_at': _timestamps(visit_times[answered] + (rng.exponential(6, size=responses) * 3600).astype(np.int64))
+    })
+
+    return {'regions': regions, 'arrivals': arrivals, 'occupancy': occupancy, 'visits': visits, 'surveys': surveys}
+
+
+def write_sqlite(tables: Dict[str, pd.DataFrame], path: str, overwrite: bool = False) -> Dict[str, int]:
+    """
+    Store generated tables in a SQLite file (timestamps as ISO 8601 text,
+    categoricals as text), indexed on the columns the loaders window on.
+    Returns the rows written per table.
+    """
+    if os.path.exists(path):
+        if not overwrite:
+            raise FileExistsError(f"{path} exists (pass overwrite=True to replace it)")
+        os.remove(path)
+
+    from supabase_sync_simple import TOURISM_DATE_COLUMNS
+
+    counts = {}
+    conn = sqlite3.connect(path)
+    try:
+        for name, df in tables.items():
+            started = time.time()
+            stored = df.copy()
+            for column in stored.columns:
+                if isinstance(stored[column].dtype, pd.CategoricalDtype):
+                    stored[column] = stored[column].astype(object)
+                elif isinstance(stored[column].dtype, pd.DatetimeTZDtype):
+                    values = stored[column].dt.tz_convert('UTC').dt.tz_localize(None).to_numpy('datetime64[s]')
+                    stored[column] = np.char.add(np.datetime_as_string(values), '+00:00').astype(object)
+                elif pd.api.types.is_datetime64_any_dtype(stored[column]):
+                    stored[column] = np.datetime_as_string(stored[column].to_numpy('datetime64[D]')).astype(object)
+            stored.to_sql(name, conn, index=False, chunksize=100_000)
+            if name in TOURISM_DATE_COLUMNS:
+                conn.execute(f'CREATE INDEX "{name}_{TOURISM_DATE_COLUMNS[name]}_idx" '
+                             f'ON "{name}" ("{TOURISM_DATE_COLUMNS[name]}")')
+            conn.commit()
+            counts[name] = len(stored)
+            logger.info(f"Wrote {len(stored)} {name} rows to {path} in {time.time() - started:.1f}s")
+    finally:
+        conn.close()
+    return counts
+
+
+def load_sqlite(path: str, days_back: int = 365, columns: Optional[Set[str]] = None,
+                end_date: Optional[date] = None) -> Dict[str, pd.DataFrame]:
+    """
+    The source tables of a ``write_sqlite`` file, windowed and projected
+    like ``SupabaseSyncManager.load_tourism_data``: the last ``days_back``
+    days up to ``end_date`` (default: today), only ``columns`` (plus
+    ``id``) when given, values as they arrive over PostgREST.
+    """
+    from supabase_sync_simple import TOURISM_DATE_COLUMNS, TOURISM_TABLE_COLUMNS
+
+    end_date = end_date or datetime.now().date()
+    start_date = end_date - timedelta(days=days_back)
+    data = {}
+    conn = sqlite3.connect(path)
+    try:
+        for table, date_column in TOURISM_DATE_COLUMNS.items():
+            selected = ', '.join(f'"{col}"' for col in TOURISM_TABLE_COLUMNS[table]
+                                 if columns is None or col in columns or col == 'id')
+            query = f'SELECT {selected} FROM "{table}" WHERE "{date_column}" >= ? AND "{date_column}" < ?'
+            data[table] = pd.read_sql_query(
+                query, conn, params=(start_date.isoformat(), (end_date + timedelta(days=1)).isoformat())
+            )
+            logger.info(f"Loaded {len(data[table])} {table} records from {path}")
+    finally:
+        conn.close()
+    return data
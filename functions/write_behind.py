@@ -0,0 +1,305 @@
+"""
+Write-Behind Queue
+==================
+Asynchronous, durable persistence of analytics output rows.
+
+Callers submit a batch of rows per table and return immediately. Each batch
+is first spooled to a local SQLite file, then written by a single background
+worker through a ``BulkWriter``. Rows that fail are kept in the spool and
+retried with backoff; while the database cannot be reached at all, batches
+wait for it without using up their attempts. Batches left behind by a
+crashed or interrupted process are replayed by the next queue opened on the
+same spool. Pending batches are drained on interpreter exit.
+"""
+
+import atexit
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from bulk_writer import BulkWriter, json_default
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PENDING = 100
+DEFAULT_MAX_ATTEMPTS = 8
+DEFAULT_RETRY_SECONDS = 5.0
+DEFAULT_CLAIM_TIMEOUT = 600.0
+DEFAULT_EXIT_TIMEOUT = 60.0
+POLL_SECONDS = 1.0
+
+# Called with (written ids per table, failed rows per table) after each write attempt of a batch
+CompletionCallback = Callable[[Dict[str, List[Any]], Dict[str, List[Dict[str, Any]]]], None]
+
+SPOOL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spool (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    claimed_by TEXT,
+    claimed_at REAL,
+    last_error TEXT
+)
+"""
+
+
+def _owner_alive(owner: str) -> bool:
+    """Whether the process holding a claim still runs (claims from other hosts are assumed alive)"""
+    host, _, pid = owner.rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+class WriteBehindQueue:
+    """
+    Durable write-behind queue for ``BulkWriter`` batches.
+
+    ``writer_factory`` returns a fresh writer per batch, or None while no
+    database client is available. Such a batch is not counted as an attempt:
+    it waits ``unavailable_for()`` seconds (e.g. until the circuit breaker
+    lets a trial request through), at least ``retry_seconds``, however long
+    the outage lasts.
+    """
+
+    def __init__(self, writer_factory: Callable[[], Optional[BulkWriter]], spool_path: str,
+                 max_pending: int = DEFAULT_MAX_PENDING, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 retry_seconds: float = DEFAULT_RETRY_SECONDS, claim_timeout: float = DEFAULT_CLAIM_TIMEOUT,
+                 exit_timeout: float = DEFAULT_EXIT_TIMEOUT,
+                 unavailable_for: Optional[Callable[[], float]] = None):
+        self.writer_factory = writer_factory
+        self.unavailable_for = unavailable_for
+        self.spool_path = spool_path
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.claim_timeout = claim_timeout
+        self.exit_timeout = exit_timeout
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._callbacks: Dict[int, CompletionCallback] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._busy = False
+        self._worker: Optional[threading.Thread] = None
+
+        spool_dir = os.path.dirname(spool_path)
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+        self._conn = sqlite3.connect(spool_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(SPOOL_SCHEMA)
+
+    def start(self) -> 'WriteBehindQueue':
+        """Replay spooled batches from earlier processes and start the worker"""
+        if self._worker is not None:
+            return self
+        replayed = self._release_orphaned_claims()
+        backlog = self.pending()
+        if backlog:
+            logger.info(f"Replaying {backlog} spooled write batches ({replayed} orphaned by a previous process)")
+        self._worker = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+        return self
+
+    def submit(self, rows: Dict[str, List[Dict[str, Any]]],
+               on_complete: Optional[CompletionCallback] = None) -> Optional[int]:
+        """
+        Spool a batch of rows per table for asynchronous writing.
+
+        Blocks only while the spool holds ``max_pending`` unwritten batches.
+        Returns the spool id, or None when there was nothing to write.
+        """
+        rows = {table: table_rows for table, table_rows in rows.items() if table_rows}
+        if not rows:
+            return None
+
+        deadline = time.monotonic() + self.exit_timeout
+        while self.pending() >= self.max_pending and time.monotonic() < deadline:
+            self._wake.set()
+            time.sleep(0.1)
+
+        payload = json.dumps(rows, default=json_default)
+        with self._lock:
+            cursor = self._conn.execute(
+                'INSERT INTO spool (payload, created_at) VALUES (?, ?)',
+                (payload, datetime.now().isoformat())
+            )
+            batch_id = cursor.lastrowid
+            if on_complete is not None:
+                self._callbacks[batch_id] = on_complete
+        self._wake.set()
+        logger.info(f"Spooled write batch {batch_id}: "
+                    f"{', '.join(f'{len(table_rows)} {table}' for table, table_rows in rows.items())}")
+        return batch_id
+
+    def pending(self) -> int:
+        """Spooled batches not yet written (including ones waiting for a retry)"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM spool WHERE status = 'pending'").fetchone()[0]
+
+    def failed(self) -> int:
+        """Batches that exhausted their retries and are kept for inspection"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM spool WHERE status = 'failed'").fetchone()[0]
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every batch due for writing has been processed"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while deadline is None or time.monotonic() < deadline:
+            with self._lock:
+                due = self._conn.execute(
+                    "SELECT COUNT(*) FROM spool WHERE status = 'pending' AND next_attempt_at <= ? "
+                    "AND (claimed_by IS NULL OR claimed_by = ?)",
+                    (time.time(), self.owner)
+                ).fetchone()[0]
+                idle = not due and not self._busy
+            if idle:
+                return True
+            self._wake.set()
+            time.sleep(0.05)
+        return False
+
+    def close(self, timeout: Optional[float] = None):
+        """Drain pending batches (bounded by ``exit_timeout``) and stop the worker"""
+        if self._worker is None:
+            return
+        if not self.drain(self.exit_timeout if timeout is None else timeout):
+            logger.warning(f"{self.pending()} write batches still spooled at {self.spool_path}; "
+                           f"they will be replayed by the next run")
+        self._stop.set()
+        self._wake.set()
+        self._worker.join(timeout=5)
+        self._worker = None
+        atexit.unregister(self.close)
+
+    def _release_orphaned_claims(self) -> int:
+        """Return batches claimed by dead processes (or stale claims) to the queue"""
+        with self._lock:
+            claims = self._conn.execute(
+                "SELECT id, claimed_by, claimed_at FROM spool WHERE status = 'pending' AND claimed_by IS NOT NULL"
+            ).fetchall()
+            stale_before = time.time() - self.claim_timeout
+            orphaned = [batch_id for batch_id, owner, claimed_at in claims
+                        if owner == self.owner or not _owner_alive(owner) or (claimed_at or 0) < stale_before]
+            if orphaned:
+                self._conn.executemany('UPDATE spool SET claimed_by = NULL, claimed_at = NULL WHERE id = ?',
+                                       [(batch_id,) for batch_id in orphaned])
+        return len(orphaned)
+
+    def _claim(self) -> Optional[tuple]:
+        """Atomically claim the oldest batch due for writing"""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._conn.execute(
+                    "SELECT id, payload, attempts FROM spool WHERE status = 'pending' AND next_attempt_at <= ? "
+                    "AND (claimed_by IS NULL OR claimed_at < ?) ORDER BY id LIMIT 1",
+                    (time.time(), time.time() - self.claim_timeout)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute('UPDATE spool SET claimed_by = ?, claimed_at = ? WHERE id = ?',
+                                       (self.owner, time.time(), row[0]))
+                    self._busy = True
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return row
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                batch = self._claim()
+            except Exception as e:
+                logger.error(f"Could not read write-behind spool {self.spool_path}: {str(e)}")
+                batch = None
+            if batch is None:
+                self._wake.wait(POLL_SECONDS)
+                self._wake.clear()
+                continue
+            try:
+                self._process(*batch)
+            finally:
+                self._busy = False
+
+    def _postpone(self, batch_id: int):
+        """Put a batch back without using up an attempt: the database was not reached"""
+        delay = self.retry_seconds
+        if self.unavailable_for is not None:
+            try:
+                delay = max(delay, self.unavailable_for())
+            except Exception as e:
+                logger.warning(f"Could not tell when the database is available again: {str(e)}")
+        with self._lock:
+            self._conn.execute(
+                'UPDATE spool SET next_attempt_at = ?, claimed_by = NULL, claimed_at = NULL, last_error = ? '
+                'WHERE id = ?',
+                (time.time() + delay, 'no database client available', batch_id)
+            )
+        logger.info(f"No database client available, spooled batch {batch_id} retried in {delay:.0f}s")
+
+    def _process(self, batch_id: int, payload: str, attempts: int):
+        rows = json.loads(payload)
+        saved: Dict[str, List[Any]] = {}
+        failed: Dict[str, List[Dict[str, Any]]] = rows
+        error = None
+        try:
+            writer = self.writer_factory()
+            if writer is None:
+                self._postpone(batch_id)
+                return
+            for table, table_rows in rows.items():
+                writer.add(table, table_rows)
+            saved = writer.flush()
+            failed = writer.failed
+        except Exception as e:
+            error = str(e)
+
+        done = not failed
+        if done:
+            with self._lock:
+                self._conn.execute('DELETE FROM spool WHERE id = ?', (batch_id,))
+            logger.info(f"Wrote spooled batch {batch_id}")
+        else:
+            attempts += 1
+            done = attempts >= self.max_attempts
+            next_attempt_at = time.time() + self.retry_seconds * (2 ** (attempts - 1))
+            error = error or f"rows failed for {', '.join(failed)}"
+            with self._lock:
+                # Only the rows that were not written stay spooled
+                self._conn.execute(
+                    'UPDATE spool SET payload = ?, attempts = ?, status = ?, next_attempt_at = ?, '
+                    'claimed_by = NULL, claimed_at = NULL, last_error = ? WHERE id = ?',
+                    (json.dumps(failed, default=json_default), attempts, 'failed' if done else 'pending',
+                     next_attempt_at, error, batch_id)
+                )
+            if done:
+                logger.error(f"Giving up on spooled batch {batch_id} after {attempts} attempts: {error}")
+            else:
+                logger.warning(f"Spooled batch {batch_id} not fully written (attempt {attempts}), retrying later: {error}")
+
+        # Callbacks see every attempt, so tables written early are reported even if others retry
+        callback = self._callbacks.pop(batch_id, None) if done else self._callbacks.get(batch_id)
+        if callback is not None:
+            try:
+                callback(saved, failed)
+            except Exception as e:
+                logger.warning(f"Write-behind completion callback for batch {batch_id} failed: {str(e)}")
@@ -0,0 +1,61 @@
+// Client for the long-running Python analytics daemon (functions/analytics_daemon.py).
+// When ANALYTICS_DAEMON_URL is set, API routes send their analytics work here
+// instead of spawning a Python process per request. A null result means the
+// daemon is not configured, unreachable or busy, and the caller should fall
+// back to spawning the script. A request the daemon accepted but did not
+// answer in time is not retried in a new process: the daemon may still be
+// running it, so the caller gets an AnalyticsDaemonError with status 504.
+
+const DAEMON_URL = process.env.ANALYTICS_DAEMON_URL;
+const DAEMON_TIMEOUT_MS = Number(process.env.ANALYTICS_DAEMON_TIMEOUT_MS || 300000);
+
+export class AnalyticsDaemonError extends Error {
+  status: number;
+
+  constructor(message: string, status: number) {
+    super(message);
+    this.name = "AnalyticsDaemonError";
+    this.status = status;
+  }
+}
+
+export async function callAnalyticsDaemon(
+  endpoint: string,
+  body?: unknown
+): Promise<any | null> {
+  if (!DAEMON_URL) return null;
+
+  let response: Response;
+  try {
+    response = await fetch(`${DAEMON_URL.replace(/\/$/, "")}${endpoint}`, {
+      method: body === undefined ? "GET" : "POST",
+      headers: { "Content-Type": "application/json" },
+      body: body === undefined ? undefined : JSON.stringify(body),
+      signal: AbortSignal.timeout(DAEMON_TIMEOUT_MS),
+    });
+  } catch (error) {
+    if (error instanceof Error && error.name === "TimeoutError") {
+      throw new AnalyticsDaemonError(
+        `Analytics daemon did not answer within ${DAEMON_TIMEOUT_MS / 1000}s`,
+        504
+      );
+    }
+    console.warn("Analytics daemon unreachable, spawning Python instead:", error);
+    return null;
+  }
+
+  // Queue full: let this request run in its own process
+  if (response.status === 503) {
+    console.warn("Analytics daemon busy, spawning Python instead");
+    return null;
+  }
+
+  const result = await response.json();
+  if (!response.ok) {
+    throw new AnalyticsDaemonError(
+      result.error || `Analytics daemon error ${response.status}`,
+      response.status
+    );
+  }
+  return result;
+}
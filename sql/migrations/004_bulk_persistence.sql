@@ -0,0 +1,60 @@
+-- ============================================================================
+-- Ethiopia Tourism - Bulk Analytics Persistence
+-- ============================================================================
+-- Single round-trip persistence for an analytics run. The pipeline sends all
+-- forecasts, department insights, reports, alerts and data quality rows of a
+-- run in one payload; they are inserted in one transaction.
+-- ============================================================================
+
+-- Insert the rows of an analytics run.
+--   payload: { "<table>": [ {column: value, ...}, ... ], ... }
+-- Only the analytics output tables below are accepted. Columns missing from
+-- the rows keep their defaults. Returns { "<table>": [inserted ids] }.
+CREATE OR REPLACE FUNCTION persist_analytics_run(payload JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    allowed_tables TEXT[] := ARRAY[
+        'forecasts', 'department_insights', 'analytics_reports', 'alerts', 'data_quality_assessments'
+    ];
+    target_table TEXT;
+    table_rows JSONB;
+    column_list TEXT;
+    inserted_ids JSONB;
+    result JSONB := '{}'::JSONB;
+BEGIN
+    FOR target_table, table_rows IN SELECT key, value FROM jsonb_each(payload) LOOP
+        IF NOT target_table = ANY(allowed_tables) THEN
+            RAISE EXCEPTION 'persist_analytics_run: table % is not allowed', target_table;
+        END IF;
+
+        IF jsonb_typeof(table_rows) <> 'array' OR jsonb_array_length(table_rows) = 0 THEN
+            CONTINUE;
+        END IF;
+
+        -- All rows of a table are built by the same writer, so the first row's keys are the column list
+        SELECT string_agg(quote_ident(column_name), ', ')
+        INTO column_list
+        FROM jsonb_object_keys(table_rows -> 0) AS column_name;
+
+        EXECUTE format(
+            'WITH inserted AS (
+                 INSERT INTO %1$I (%2$s)
+                 SELECT %2$s FROM jsonb_populate_recordset(NULL::%1$I, $1)
+                 RETURNING id
+             )
+             SELECT COALESCE(jsonb_agg(id), ''[]''::JSONB) FROM inserted',
+            target_table, column_list
+        )
+        INTO inserted_ids
+        USING table_rows;
+
+        result := result || jsonb_build_object(target_table, inserted_ids);
+    END LOOP;
+
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- The pipeline authenticates with the service role key
+REVOKE ALL ON FUNCTION persist_analytics_run(JSONB) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION persist_analytics_run(JSONB) TO service_role;
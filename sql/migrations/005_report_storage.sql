@@ -0,0 +1,124 @@
+-- ============================================================================
+-- Ethiopia Tourism - Deduplicated Report Storage
+-- ============================================================================
+-- Analytics report sections are stored as content-addressed blobs (see
+-- functions/report_storage.py). A report row keeps only the references to
+-- its blobs; blobs shared with earlier reports are stored once.
+-- ============================================================================
+
+-- Content-addressed report blobs: nested objects may reference other blobs
+-- as {"$ref": "<hash>"}; numeric arrays are quantized ({"$nd": ...}) and
+-- daily date runs collapsed ({"$dates": ..., "n": ...}).
+CREATE TABLE IF NOT EXISTS report_blobs (
+    hash TEXT PRIMARY KEY,
+    content JSONB NOT NULL,
+    size_bytes INTEGER,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE analytics_reports
+    ADD COLUMN IF NOT EXISTS storage_format TEXT NOT NULL DEFAULT 'inline',
+    ADD COLUMN IF NOT EXISTS content_refs JSONB,
+    -- Previous report this one was stored against (no foreign key: old reports are cleaned up)
+    ADD COLUMN IF NOT EXISTS base_report_id UUID;
+
+ALTER TABLE report_blobs ENABLE ROW LEVEL SECURITY;
+
+-- Blobs are readable by the same admins who can read the reports
+CREATE POLICY "admin_full_access_report_blobs" ON report_blobs
+    FOR ALL TO authenticated
+    USING (
+        EXISTS (
+            SELECT 1 FROM profiles
+            WHERE profiles.id = auth.uid()
+            AND profiles.role = 'admin'
+        )
+    );
+
+-- Bulk persistence (004) learns about report blobs: they are inserted
+-- idempotently, since most blobs of a run already exist.
+CREATE OR REPLACE FUNCTION persist_analytics_run(payload JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    allowed_tables TEXT[] := ARRAY[
+        'forecasts', 'department_insights', 'analytics_reports', 'alerts', 'data_quality_assessments',
+        'report_blobs'
+    ];
+    target_table TEXT;
+    table_rows JSONB;
+    column_list TEXT;
+    insert_suffix TEXT;
+    inserted_ids JSONB;
+    result JSONB := '{}'::JSONB;
+BEGIN
+    -- Blobs first, so reports never reference a blob that is not stored yet
+    FOR target_table, table_rows IN
+        SELECT key, value FROM jsonb_each(payload) ORDER BY key <> 'report_blobs', key
+    LOOP
+        IF NOT target_table = ANY(allowed_tables) THEN
+            RAISE EXCEPTION 'persist_analytics_run: table % is not allowed', target_table;
+        END IF;
+
+        IF jsonb_typeof(table_rows) <> 'array' OR jsonb_array_length(table_rows) = 0 THEN
+            CONTINUE;
+        END IF;
+
+        -- All rows of a table are built by the same writer, so the first row's keys are the column list
+        SELECT string_agg(quote_ident(column_name), ', ')
+        INTO column_list
+        FROM jsonb_object_keys(table_rows -> 0) AS column_name;
+
+        insert_suffix := CASE target_table
+            WHEN 'report_blobs' THEN 'ON CONFLICT (hash) DO NOTHING RETURNING hash AS id'
+            ELSE 'RETURNING id'
+        END;
+
+        EXECUTE format(
+            'WITH inserted AS (
+                 INSERT INTO %1$I (%2$s)
+                 SELECT %2$s FROM jsonb_populate_recordset(NULL::%1$I, $1)
+                 %3$s
+             )
+             SELECT COALESCE(jsonb_agg(id), ''[]''::JSONB) FROM inserted',
+            target_table, column_list, insert_suffix
+        )
+        INTO inserted_ids
+        USING table_rows;
+
+        result := result || jsonb_build_object(target_table, inserted_ids);
+    END LOOP;
+
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Delete blobs no longer reachable from any stored report; returns the number removed.
+-- Blobs inserted within the last day are kept: a write-behind retry can store a run's
+-- blobs on one attempt and its analytics_reports row only on a later one.
+CREATE OR REPLACE FUNCTION prune_report_blobs()
+RETURNS INTEGER AS $$
+DECLARE
+    removed INTEGER;
+BEGIN
+    WITH RECURSIVE reachable(hash) AS (
+        SELECT ref #>> '{}'
+        FROM analytics_reports r,
+             jsonb_path_query(r.content_refs, 'strict $.**."$ref"') AS ref
+        WHERE r.content_refs IS NOT NULL
+        UNION
+        SELECT ref #>> '{}'
+        FROM reachable
+        JOIN report_blobs b ON b.hash = reachable.hash,
+             jsonb_path_query(b.content, 'strict $.**."$ref"') AS ref
+    )
+    DELETE FROM report_blobs
+    WHERE hash NOT IN (SELECT hash FROM reachable WHERE hash IS NOT NULL)
+      AND created_at < NOW() - INTERVAL '1 day';
+
+    GET DIAGNOSTICS removed = ROW_COUNT;
+    RETURN removed;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+REVOKE ALL ON FUNCTION prune_report_blobs() FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION prune_report_blobs() TO service_role;
@@ -0,0 +1,102 @@
+-- ============================================================================
+-- Ethiopia Tourism - Idempotent Forecast and Insight Writes
+-- ============================================================================
+-- Forecasts and department insights are upserted on their natural keys
+-- (see functions/record_hashes.py), so reruns replace a record instead of
+-- adding a duplicate, and rewrites of unchanged content are skipped.
+-- ============================================================================
+
+ALTER TABLE forecasts ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE department_insights ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+-- Keep only the newest copy of each record written by earlier runs
+DELETE FROM forecasts older
+USING forecasts newer
+WHERE older.forecast_type = newer.forecast_type
+  AND older.region_id IS NOT DISTINCT FROM newer.region_id
+  AND older.forecast_period_start = newer.forecast_period_start
+  AND older.forecast_period_end = newer.forecast_period_end
+  AND (older.generated_at, older.id) < (newer.generated_at, newer.id);
+
+DELETE FROM department_insights older
+USING department_insights newer
+WHERE older.department_name = newer.department_name
+  AND older.insight_date = newer.insight_date
+  AND (older.created_at, older.id) < (newer.created_at, newer.id);
+
+-- Forecasts across all regions have no region_id, so NULLs must collide too
+ALTER TABLE forecasts
+    ADD CONSTRAINT forecasts_record_key
+    UNIQUE NULLS NOT DISTINCT (forecast_type, region_id, forecast_period_start, forecast_period_end);
+
+ALTER TABLE department_insights
+    ADD CONSTRAINT department_insights_record_key
+    UNIQUE (department_name, insight_date);
+
+-- Bulk persistence (004, 005) upserts forecasts and insights; a row whose
+-- content hash is unchanged is left untouched (no new row version)
+CREATE OR REPLACE FUNCTION persist_analytics_run(payload JSONB)
+RETURNS JSONB AS $$
+DECLARE
+    allowed_tables TEXT[] := ARRAY[
+        'forecasts', 'department_insights', 'analytics_reports', 'alerts', 'data_quality_assessments',
+        'report_blobs'
+    ];
+    target_table TEXT;
+    table_rows JSONB;
+    column_list TEXT;
+    update_list TEXT;
+    insert_suffix TEXT;
+    inserted_ids JSONB;
+    result JSONB := '{}'::JSONB;
+BEGIN
+    -- Blobs first, so reports never reference a blob that is not stored yet
+    FOR target_table, table_rows IN
+        SELECT key, value FROM jsonb_each(payload) ORDER BY key <> 'report_blobs', key
+    LOOP
+        IF NOT target_table = ANY(allowed_tables) THEN
+            RAISE EXCEPTION 'persist_analytics_run: table % is not allowed', target_table;
+        END IF;
+
+        IF jsonb_typeof(table_rows) <> 'array' OR jsonb_array_length(table_rows) = 0 THEN
+            CONTINUE;
+        END IF;
+
+        -- All rows of a table are built by the same writer, so the first row's keys are the column list
+        SELECT string_agg(quote_ident(column_name), ', '),
+               string_agg(format('%1$I = EXCLUDED.%1$I', column_name), ', ')
+                   FILTER (WHERE column_name <> 'id')
+        INTO column_list, update_list
+        FROM jsonb_object_keys(table_rows -> 0) AS column_name;
+
+        insert_suffix := CASE target_table
+            WHEN 'report_blobs' THEN 'ON CONFLICT (hash) DO NOTHING RETURNING hash AS id'
+            WHEN 'forecasts' THEN format(
+                'ON CONFLICT ON CONSTRAINT forecasts_record_key DO UPDATE SET %s
+                 WHERE forecasts.content_hash IS DISTINCT FROM EXCLUDED.content_hash RETURNING id',
+                update_list)
+            WHEN 'department_insights' THEN format(
+                'ON CONFLICT ON CONSTRAINT department_insights_record_key DO UPDATE SET %s
+                 WHERE department_insights.content_hash IS DISTINCT FROM EXCLUDED.content_hash RETURNING id',
+                update_list)
+            ELSE 'RETURNING id'
+        END;
+
+        EXECUTE format(
+            'WITH inserted AS (
+                 INSERT INTO %1$I (%2$s)
+                 SELECT %2$s FROM jsonb_populate_recordset(NULL::%1$I, $1)
+                 %3$s
+             )
+             SELECT COALESCE(jsonb_agg(id), ''[]''::JSONB) FROM inserted',
+            target_table, column_list, insert_suffix
+        )
+        INTO inserted_ids
+        USING table_rows;
+
+        result := result || jsonb_build_object(target_table, inserted_ids);
+    END LOOP;
+
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
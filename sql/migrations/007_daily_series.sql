@@ -0,0 +1,62 @@
+-- ============================================================================
+-- Ethiopia Tourism - Daily Series Aggregation
+-- ============================================================================
+-- Forecasting reads per-day aggregates of the source tables instead of raw
+-- rows (see functions/daily_series.py). daily_series() groups one source
+-- by day, optionally by one of its dimensions, and returns one row per day
+-- and group: the record count and the sum and mean of the series value.
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION daily_series(
+    series_name TEXT,
+    group_by TEXT DEFAULT NULL,
+    start_date DATE DEFAULT NULL,
+    end_date DATE DEFAULT NULL
+)
+RETURNS TABLE (day DATE, group_key TEXT, records BIGINT, total DOUBLE PRECISION, mean DOUBLE PRECISION) AS $$
+DECLARE
+    source_table TEXT;
+    date_column TEXT;
+    value_expression TEXT;
+    dimensions TEXT[];
+BEGIN
+    -- Keep in sync with DAILY_SERIES in functions/daily_series.py
+    SELECT s.source_table, s.date_column, s.value_expression, s.dimensions
+    INTO source_table, date_column, value_expression, dimensions
+    FROM (VALUES
+        ('arrivals', 'arrivals', 'timestamp', 'passenger_count::float8',
+         ARRAY['destination', 'origin']),
+        ('occupancy', 'occupancy', 'date', 'occupied_rooms::float8 / NULLIF(total_rooms, 0)',
+         ARRAY['region_id', 'hotel_id']),
+        ('revenue', 'occupancy', 'date', 'revenue::float8',
+         ARRAY['region_id', 'hotel_id']),
+        ('visits', 'visits', 'timestamp', 'visitor_count::float8',
+         ARRAY['region_id', 'site_id']),
+        ('registrations', 'tourists', 'created_at', 'NULL::float8',
+         ARRAY['nationality', 'purpose_of_visit'])
+    ) AS s (name, source_table, date_column, value_expression, dimensions)
+    WHERE s.name = series_name;
+
+    IF source_table IS NULL THEN
+        RAISE EXCEPTION 'daily_series: unknown series %', series_name;
+    END IF;
+    IF group_by IS NOT NULL AND NOT group_by = ANY(dimensions) THEN
+        RAISE EXCEPTION 'daily_series: series % cannot be grouped by %', series_name, group_by;
+    END IF;
+
+    RETURN QUERY EXECUTE format(
+        'SELECT %2$I::date, %3$s, COUNT(*), SUM(%4$s), AVG(%4$s)
+         FROM %1$I
+         WHERE ($1 IS NULL OR %2$I >= $1) AND ($2 IS NULL OR %2$I < $2 + 1)
+         GROUP BY 1, 2
+         ORDER BY 2, 1',
+        source_table,
+        date_column,
+        CASE WHEN group_by IS NULL THEN 'NULL::text' ELSE format('%I::text', group_by) END,
+        value_expression
+    )
+    USING start_date, end_date;
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY INVOKER SET search_path = public;
+
+GRANT EXECUTE ON FUNCTION daily_series(TEXT, TEXT, DATE, DATE) TO service_role;